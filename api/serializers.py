@@ -0,0 +1,60 @@
+from django.contrib.auth import get_user_model
+from rest_framework import serializers
+
+from posts.models import Comment, Post
+
+User = get_user_model()
+
+
+class SparseFieldsMixin:
+    """Оставляет только поля из ``?fields=a,b``, если он передан."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get('request')
+        fields = request and request.query_params.get('fields')
+        if fields:
+            wanted = set(fields.split(','))
+            for name in set(self.fields) - wanted:
+                self.fields.pop(name)
+
+
+class CommentSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    author = serializers.SlugRelatedField(slug_field='username',
+                                          read_only=True)
+
+    class Meta:
+        model = Comment
+        fields = ('id', 'post', 'author', 'text', 'created')
+        read_only_fields = ('post',)
+
+
+class PostSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    author = serializers.SlugRelatedField(slug_field='username',
+                                          read_only=True)
+    group = serializers.SlugRelatedField(slug_field='slug', read_only=True)
+
+    class Meta:
+        model = Post
+        fields = ('id', 'text', 'pub_date', 'updated', 'author', 'group',
+                  'image', 'comments_count')
+
+
+class PostDetailSerializer(PostSerializer):
+    comments = CommentSerializer(many=True, read_only=True)
+
+    class Meta(PostSerializer.Meta):
+        fields = PostSerializer.Meta.fields + ('comments',)
+
+
+class ProfileSerializer(SparseFieldsMixin, serializers.Serializer):
+    """Данные author_card.html: см. posts.authors.author_card."""
+
+    username = serializers.CharField(source='user_name.username')
+    full_name = serializers.CharField(source='user_name.get_full_name')
+    posts_count = serializers.IntegerField(source='count')
+    followers_count = serializers.IntegerField(
+        source='counter.followers_count')
+    following_count = serializers.IntegerField(
+        source='counter.following_count')
+    following = serializers.BooleanField()
@@ -0,0 +1,140 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from posts.models import Comment, Follow, Group, Post
+
+User = get_user_model()
+
+
+class ReadApiTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create(username='author',
+                                         first_name='Лев',
+                                         last_name='Толстой')
+        cls.reader = User.objects.create(username='reader')
+        cls.group = Group.objects.create(title='Группа', slug='group',
+                                         description='Описание')
+        cls.posts = [
+            Post.objects.create(text=f'Запись {i}', author=cls.author,
+                                group=cls.group if i % 2 else None)
+            for i in range(15)
+        ]
+        cls.post = cls.posts[-1]
+        for i in range(3):
+            Comment.objects.create(post=cls.post, author=cls.reader,
+                                   text=f'Комментарий {i}')
+        Follow.objects.create(user=cls.reader, author=cls.author)
+        cls.token = Token.objects.create(user=cls.reader)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f'Token {ReadApiTests.token.key}')
+
+    def test_posts_cursor_pagination(self):
+        """Список записей листается курсором без пропусков."""
+        response = self.client.get(reverse('api:posts'))
+        self.assertEqual(response.status_code, 200)
+        ids = [post['id'] for post in response.data['results']]
+        self.assertIsNone(response.data['previous'])
+        response = self.client.get(response.data['next'])
+        ids += [post['id'] for post in response.data['results']]
+        self.assertIsNone(response.data['next'])
+        self.assertEqual(ids, [post.pk for post in reversed(
+            ReadApiTests.posts)])
+
+    def test_invalid_cursor(self):
+        """Неверный курсор даёт 404."""
+        response = self.client.get(reverse('api:posts'), {'cursor': 'x'})
+        self.assertEqual(response.status_code, 404)
+
+    def test_sparse_fields(self):
+        """?fields= оставляет в ответе только запрошенные поля."""
+        response = self.client.get(reverse('api:posts'),
+                                   {'fields': 'id,text'})
+        self.assertEqual(set(response.data['results'][0]), {'id', 'text'})
+
+    def test_list_query_count(self):
+        """Страница записей отдаётся одним запросом после токена."""
+        with self.assertNumQueries(2):
+            self.client.get(reverse('api:posts'))
+
+    def test_post_detail_with_comments(self):
+        """Запись отдаётся вместе с комментариями."""
+        url = reverse('api:post', args=[ReadApiTests.post.pk])
+        with self.assertNumQueries(4):
+            response = self.client.get(url)
+        self.assertEqual(response.data['author'], 'author')
+        self.assertIsNone(response.data['group'])
+        self.assertEqual([c['text'] for c in response.data['comments']],
+                         ['Комментарий 0', 'Комментарий 1',
+                          'Комментарий 2'])
+
+    def test_etag_not_modified(self):
+        """Повторный запрос с If-None-Match получает 304."""
+        url = reverse('api:post', args=[ReadApiTests.post.pk])
+        etag = self.client.get(url)['ETag']
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        Comment.objects.create(post=ReadApiTests.post,
+                               author=ReadApiTests.author, text='Новый')
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_list_etag_not_modified(self):
+        """Неизменная страница ленты получает 304."""
+        url = reverse('api:posts')
+        etag = self.client.get(url)['ETag']
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_group_feed(self):
+        """Лента группы содержит только записи группы."""
+        response = self.client.get(reverse('api:group_posts',
+                                           args=['group']))
+        self.assertTrue(all(post['group'] == 'group'
+                            for post in response.data['results']))
+        response = self.client.get(reverse('api:group_posts',
+                                           args=['missing']))
+        self.assertEqual(response.status_code, 404)
+
+    def test_token_required(self):
+        """Без токена API отвечает 401."""
+        self.client.credentials()
+        self.assertEqual(self.client.get(reverse('api:posts')).status_code,
+                         401)
+
+    def test_follow_feed(self):
+        """Лента подписок читателя содержит записи автора."""
+        response = self.client.get(reverse('api:follow'))
+        self.assertEqual(len(response.data['results']), 10)
+
+    def test_profile(self):
+        """Профиль отдаёт данные карточки автора."""
+        response = self.client.get(reverse('api:profile', args=['author']))
+        self.assertEqual(response.data, {
+            'username': 'author',
+            'full_name': 'Лев Толстой',
+            'posts_count': 15,
+            'followers_count': 1,
+            'following_count': 0,
+            'following': True,
+        })
+        response = self.client.get(reverse('api:profile_posts',
+                                           args=['author']))
+        self.assertEqual(len(response.data['results']), 10)
+
+    def test_search(self):
+        """Поиск возвращает записи, найденные по тексту комментариев."""
+        response = self.client.get(reverse('api:search'),
+                                   {'q': 'комментарии'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['count'], 1)
+        self.assertEqual(response.data['results'][0]['id'],
+                         ReadApiTests.post.pk)
@@ -0,0 +1,145 @@
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from posts.counters import get_user_counter
+from posts.models import Comment, Follow, Group, Post, TimelineEntry
+
+User = get_user_model()
+
+
+class WriteApiTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create(username='author')
+        cls.reader = User.objects.create(username='reader')
+        cls.other = User.objects.create(username='other')
+        cls.group = Group.objects.create(title='Группа', slug='group',
+                                         description='Описание')
+        for user in (cls.author, cls.reader, cls.other):
+            get_user_counter(user)
+        Follow.objects.create(user=cls.reader, author=cls.author)
+
+    def setUp(self):
+        self.client = APIClient()
+        token = Token.objects.create(user=WriteApiTests.author)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
+
+    def test_create_post(self):
+        """Одна запись создаётся через PostForm."""
+        response = self.client.post(reverse('api:posts'), {
+            'text': 'Новая запись', 'group': WriteApiTests.group.pk})
+        self.assertEqual(response.status_code, 201)
+        post = Post.objects.get(pk=response.data['id'])
+        self.assertEqual(post.author, WriteApiTests.author)
+        self.assertEqual(post.group, WriteApiTests.group)
+        response = self.client.post(reverse('api:posts'), {'text': ''})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('text', response.data)
+
+    @override_settings(UPLOAD_MAX_BYTES=2 ** 20)
+    def test_create_post_checks_image(self):
+        """Картинка из API проверяется так же, как из формы."""
+        uploads = {
+            'huge.jpg': (b'\xff' * (2 ** 20 + 1), 'Файл больше 1 МБ.'),
+            'broken.jpg': (b'not an image', None),
+        }
+        for name, (content, error) in uploads.items():
+            with self.subTest(name=name):
+                response = self.client.post(reverse('api:posts'), {
+                    'text': 'Запись с картинкой',
+                    'image': SimpleUploadedFile(name, content)})
+                self.assertEqual(response.status_code, 400)
+                self.assertIn('image', response.data)
+                if error:
+                    self.assertEqual(response.data['image'], [error])
+        self.assertFalse(Post.objects.exists())
+
+    def test_bulk_create_posts(self):
+        """Пачка записей создаётся за постоянное число запросов."""
+        posts = [{'text': f'Запись {i}'} for i in range(50)]
+        with self.assertNumQueries(16):
+            response = self.client.post(reverse('api:posts_bulk'),
+                                        {'posts': posts}, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(response.data), 50)
+        self.assertEqual(Post.objects.count(), 50)
+        self.assertEqual(get_user_counter(WriteApiTests.author).posts_count,
+                         50)
+        self.assertEqual(TimelineEntry.objects.filter(
+            user=WriteApiTests.reader).count(), 50)
+        self.assertEqual([post['id'] for post in response.data],
+                         sorted(Post.objects.values_list('pk', flat=True)))
+
+    def test_bulk_is_all_or_nothing(self):
+        """Ошибка в одной записи отменяет всю пачку."""
+        response = self.client.post(reverse('api:posts_bulk'), {
+            'posts': [{'text': 'Хорошая'}, {'text': ''}]}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['posts'][0], {})
+        self.assertIn('text', response.data['posts'][1])
+        self.assertFalse(Post.objects.exists())
+
+    @override_settings(API_BULK_LIMIT=2)
+    def test_bulk_limit(self):
+        """Пачка больше API_BULK_LIMIT отклоняется."""
+        response = self.client.post(reverse('api:posts_bulk'), {
+            'posts': [{'text': 'Запись'}] * 3}, format='json')
+        self.assertEqual(response.status_code, 400)
+
+    def test_bulk_create_comments(self):
+        """Пачка комментариев обновляет счётчики записей."""
+        first = Post.objects.create(text='Первая',
+                                    author=WriteApiTests.other)
+        second = Post.objects.create(text='Вторая',
+                                     author=WriteApiTests.other)
+        response = self.client.post(reverse('api:comments_bulk'), {
+            'comments': [
+                {'post': first.pk, 'text': 'Раз'},
+                {'post': first.pk, 'text': 'Два'},
+                {'post': second.pk, 'text': 'Три'},
+            ]}, format='json')
+        self.assertEqual(response.status_code, 201)
+        first.refresh_from_db()
+        second.refresh_from_db()
+        self.assertEqual((first.comments_count, second.comments_count),
+                         (2, 1))
+        response = self.client.post(reverse('api:comments_bulk'), {
+            'comments': [{'post': 0, 'text': 'Куда?'}]}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(Comment.objects.count(), 3)
+
+    def test_create_comment(self):
+        """Один комментарий создаётся через CommentForm."""
+        post = Post.objects.create(text='Запись', author=WriteApiTests.other)
+        response = self.client.post(reverse('api:comments', args=[post.pk]),
+                                    {'text': 'Комментарий'})
+        self.assertEqual(response.status_code, 201)
+        post.refresh_from_db()
+        self.assertEqual(post.comments_count, 1)
+
+    def test_follow_and_unfollow_list(self):
+        """Подписка и отписка по списку имён обновляют счётчики."""
+        Post.objects.create(text='Запись', author=WriteApiTests.other)
+        url = reverse('api:follow_users')
+        response = self.client.post(url, {
+            'usernames': ['reader', 'other', 'author']}, format='json')
+        self.assertEqual(sorted(response.data['followed']),
+                         ['other', 'reader'])
+        author = WriteApiTests.author
+        self.assertEqual(get_user_counter(author).following_count, 2)
+        self.assertEqual(
+            get_user_counter(WriteApiTests.other).followers_count, 1)
+        self.assertTrue(TimelineEntry.objects.filter(user=author).exists())
+        response = self.client.delete(url, {'usernames': ['other']},
+                                      format='json')
+        self.assertEqual(response.data['unfollowed'], 1)
+        self.assertEqual(get_user_counter(author).following_count, 1)
+        self.assertFalse(TimelineEntry.objects.filter(user=author).exists())
+        response = self.client.post(url, {'usernames': ['nobody']},
+                                    format='json')
+        self.assertEqual(response.status_code, 400)
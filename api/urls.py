@@ -0,0 +1,26 @@
+from django.urls import path
+
+from . import views
+
+app_name = 'api'
+
+urlpatterns = [
+    path('v1/posts/', views.PostList.as_view(), name='posts'),
+    path('v1/posts/bulk/', views.PostBulkCreate.as_view(),
+         name='posts_bulk'),
+    path('v1/posts/<int:pk>/', views.PostDetail.as_view(), name='post'),
+    path('v1/posts/<int:pk>/comments/', views.CommentCreate.as_view(),
+         name='comments'),
+    path('v1/comments/bulk/', views.CommentBulkCreate.as_view(),
+         name='comments_bulk'),
+    path('v1/groups/<slug:slug>/posts/', views.GroupFeed.as_view(),
+         name='group_posts'),
+    path('v1/search/', views.Search.as_view(), name='search'),
+    path('v1/follow/', views.FollowFeed.as_view(), name='follow'),
+    path('v1/follow/users/', views.FollowUsers.as_view(),
+         name='follow_users'),
+    path('v1/users/<str:username>/', views.Profile.as_view(),
+         name='profile'),
+    path('v1/users/<str:username>/posts/', views.ProfileFeed.as_view(),
+         name='profile_posts'),
+]
@@ -0,0 +1,208 @@
+from functools import partial
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db.models import Prefetch
+from django.shortcuts import get_object_or_404
+from django.utils.cache import patch_vary_headers
+from django.utils.decorators import method_decorator
+from rest_framework import generics, status, views
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+
+from posts import bulk, search, timeline
+from posts.authors import author_card, card_version
+from posts.conditional import make_etag, not_modified, versions
+from posts.forms import CommentForm, PostForm
+from posts.models import Comment, Group, Post
+from yatube.sqlite import serialize_writes
+
+from .pagination import KeysetPagination, SearchPagination
+from .serializers import (CommentSerializer, PostDetailSerializer,
+                          PostSerializer, ProfileSerializer)
+
+User = get_user_model()
+
+
+class ConditionalMixin:
+    """Отвечает 304, если версия данных совпала с If-None-Match.
+
+    Версия считается по уже загруженным объектам, поэтому при совпадении
+    сериализация и рендеринг JSON пропускаются.
+    """
+
+    def conditional(self, request, etag, render):
+        response = not_modified(request, etag) or render()
+        response['ETag'] = etag
+        patch_vary_headers(response, ('Authorization', 'Cookie'))
+        return response
+
+
+def batch(request, key, kind=dict):
+    """Список элементов типа kind из тела пакетного запроса."""
+    items = request.data.get(key)
+    limit = settings.API_BULK_LIMIT
+    if (not isinstance(items, list) or not items
+            or not all(isinstance(item, kind) for item in items)):
+        raise ValidationError({key: 'Ожидается непустой список.'})
+    if len(items) > limit:
+        raise ValidationError({key: f'Не больше {limit} за запрос.'})
+    return items
+
+
+def validate(forms, key):
+    """Проверяет все формы пачки; ошибки отдаются по позициям."""
+    if not all([form.is_valid() for form in forms]):
+        raise ValidationError({key: [form.errors for form in forms]})
+    return [form.save(commit=False) for form in forms]
+
+
+class FeedView(ConditionalMixin, generics.ListAPIView):
+    serializer_class = PostSerializer
+    pagination_class = KeysetPagination
+
+    def list(self, request, *args, **kwargs):
+        posts = self.paginate_queryset(self.get_queryset())
+        etag = make_etag(request, versions(posts))
+        return self.conditional(request, etag, lambda: (
+            self.get_paginated_response(
+                self.get_serializer(posts, many=True).data)))
+
+
+class PostList(FeedView):
+    def get_queryset(self):
+        return Post.objects.for_feed()
+
+    @method_decorator(serialize_writes)
+    def post(self, request):
+        form = PostForm(request.data, files=request.FILES)
+        if not form.is_valid():
+            raise ValidationError(form.errors)
+        post = form.save(commit=False)
+        post.author = request.user
+        post.save()
+        return Response(self.get_serializer(post).data,
+                        status=status.HTTP_201_CREATED)
+
+
+class GroupFeed(FeedView):
+    def get_queryset(self):
+        group = get_object_or_404(Group, slug=self.kwargs['slug'])
+        return group.posts.for_feed()
+
+
+class ProfileFeed(FeedView):
+    def get_queryset(self):
+        author = get_object_or_404(User, username=self.kwargs['username'])
+        return author.posts.for_feed()
+
+
+class FollowFeed(FeedView):
+    def get_queryset(self):
+        return timeline.feed_for(self.request.user)
+
+
+class Search(generics.ListAPIView):
+    serializer_class = PostSerializer
+    pagination_class = SearchPagination
+
+    def get_queryset(self):
+        query = self.request.query_params.get('q', '').strip()
+        return search.search(query) if query else []
+
+
+class PostDetail(ConditionalMixin, generics.RetrieveAPIView):
+    serializer_class = PostDetailSerializer
+    queryset = Post.objects.for_feed().prefetch_related(
+        Prefetch('comments', Comment.objects.select_related('author')))
+
+    def retrieve(self, request, *args, **kwargs):
+        # updated меняется и при новых комментариях, см. posts.cards.touch.
+        post = get_object_or_404(
+            Post.objects.values_list('updated', flat=True),
+            pk=self.kwargs['pk'])
+        return self.conditional(
+            request, make_etag(request, post),
+            partial(super().retrieve, request, *args, **kwargs))
+
+
+class Profile(ConditionalMixin, generics.GenericAPIView):
+    serializer_class = ProfileSerializer
+
+    def get(self, request, username):
+        card = author_card(username, request.user)
+        etag = make_etag(request, card_version(card))
+        return self.conditional(request, etag, lambda: Response(
+            self.get_serializer(card).data))
+
+
+class PostBulkCreate(views.APIView):
+    @method_decorator(serialize_writes)
+    def post(self, request):
+        posts = validate([PostForm(item) for item in batch(request, 'posts')],
+                         'posts')
+        posts = bulk.create_posts(request.user, posts)
+        data = PostSerializer(posts, many=True,
+                              context={'request': request}).data
+        return Response(data, status=status.HTTP_201_CREATED)
+
+
+class CommentCreate(generics.GenericAPIView):
+    serializer_class = CommentSerializer
+
+    @method_decorator(serialize_writes)
+    def post(self, request, pk):
+        post = get_object_or_404(Post, pk=pk)
+        form = CommentForm(request.data)
+        if not form.is_valid():
+            raise ValidationError(form.errors)
+        comment = form.save(commit=False)
+        comment.author = request.user
+        comment.post = post
+        comment.save()
+        return Response(self.get_serializer(comment).data,
+                        status=status.HTTP_201_CREATED)
+
+
+class CommentBulkCreate(views.APIView):
+    @method_decorator(serialize_writes)
+    def post(self, request):
+        items = batch(request, 'comments')
+        posts = Post.objects.in_bulk({item.get('post') for item in items
+                                      if isinstance(item.get('post'), int)})
+        forms = [CommentForm(item) for item in items]
+        for form, item in zip(forms, items):
+            if item.get('post') not in posts:
+                form.add_error(None, 'Нет такой записи.')
+        comments = validate(forms, 'comments')
+        for comment, item in zip(comments, items):
+            comment.post = posts[item['post']]
+        comments = bulk.create_comments(request.user, comments)
+        data = CommentSerializer(comments, many=True,
+                                 context={'request': request}).data
+        return Response(data, status=status.HTTP_201_CREATED)
+
+
+class FollowUsers(views.APIView):
+    """Подписка (POST) и отписка (DELETE) по списку имён."""
+
+    def targets(self, request):
+        usernames = batch(request, 'usernames', kind=str)
+        users = User.objects.filter(username__in=usernames)
+        missing = set(usernames) - {user.username for user in users}
+        if missing:
+            raise ValidationError({'usernames': [
+                f'Нет пользователя {name}.' for name in sorted(missing)]})
+        return list(users)
+
+    @method_decorator(serialize_writes)
+    def post(self, request):
+        follows = bulk.follow_authors(request.user, self.targets(request))
+        return Response({'followed': [entry.author.username
+                                      for entry in follows]},
+                        status=status.HTTP_201_CREATED)
+
+    @method_decorator(serialize_writes)
+    def delete(self, request):
+        deleted = bulk.unfollow_authors(request.user, self.targets(request))
+        return Response({'unfollowed': deleted})
@@ -1,6 +1,7 @@
 from django.contrib import admin
 
-from .models import Post, Group, Comment, Follow
+from . import search
+from .models import Post, Group, Comment, Follow, UserCounter
 
 
 @admin.register(Post)
@@ -10,6 +11,15 @@ class PostAdmin(admin.ModelAdmin):
     list_filter = ('pub_date',)
     empty_value_display = '-пусто-'
 
+    def get_search_results(self, request, queryset, search_term):
+        # Вместо LIKE '%...%' по search_fields ищем по полнотекстовому
+        # индексу; до 1000 самых релевантных записей.
+        if not search_term:
+            return queryset, False
+        found = search.search(search_term)
+        ids = [post.pk for post in found[:1000]]
+        return queryset.filter(pk__in=ids), False
+
 
 @admin.register(Group)
 class GroupAdmin(admin.ModelAdmin):
@@ -28,3 +38,10 @@ class CommentAdmin(admin.ModelAdmin):
 class FollowAdmin(admin.ModelAdmin):
     list_display = ('pk', 'user', 'author')
     empty_value_display = '-пусто-'
+
+
+@admin.register(UserCounter)
+class UserCounterAdmin(admin.ModelAdmin):
+    list_display = ('pk', 'user', 'posts_count', 'followers_count',
+                    'following_count', 'pulled')
+    empty_value_display = '-пусто-'
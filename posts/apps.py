@@ -3,3 +3,11 @@ from django.apps import AppConfig
 
 class PostsConfig(AppConfig):
     name = 'posts'
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+
+        from yatube.sqlite import set_pragmas
+
+        from . import signals  # noqa: F401
+        connection_created.connect(set_pragmas)
@@ -0,0 +1,69 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db.models import BooleanField, Exists, OuterRef, Value
+from django.http import Http404
+
+from . import metrics
+from .counters import get_user_counter
+from .models import Follow, UserCounter
+
+User = get_user_model()
+
+
+def card_key(username, viewer_id):
+    return 'author_card:%s:%s' % (username, viewer_id)
+
+
+def forget(follow):
+    # Читатель сразу видит свою подписку; чужие карточки доживают TTL.
+    if settings.AUTHOR_CARD_TIMEOUT:
+        cache.delete(card_key(follow.author.username, follow.user_id))
+
+
+def _load(username, viewer):
+    if viewer.is_authenticated:
+        following = Exists(Follow.objects.filter(user=viewer,
+                                                 author=OuterRef('pk')))
+    else:
+        following = Value(False, output_field=BooleanField())
+    author = User.objects.select_related('counter').annotate(
+        is_followed=following).filter(username=username).first()
+    if author is None:
+        raise Http404('Нет пользователя %s' % username)
+    try:
+        counter = author.counter
+    except UserCounter.DoesNotExist:
+        counter = get_user_counter(author)
+    return {
+        'user_name': author,
+        'count': counter.posts_count,
+        'counter': counter,
+        'following': author.is_followed,
+    }
+
+
+def author_card(username, viewer):
+    """Всё для author_card.html одним запросом: автор, счётчики, подписка.
+
+    При AUTHOR_CARD_TIMEOUT > 0 результат недолго хранится в кэше
+    отдельно для каждой пары (автор, читатель).
+    """
+    timeout = settings.AUTHOR_CARD_TIMEOUT
+    if not timeout:
+        return _load(username, viewer)
+    key = card_key(username, viewer.pk)
+    card = cache.get(key)
+    metrics.record_cache(card is not None, card is None)
+    if card is None:
+        card = _load(username, viewer)
+        cache.set(key, card, timeout)
+    return card
+
+
+def card_version(card):
+    """Всё, от чего зависит вид карточки автора, для ETag."""
+    counter = card['counter']
+    return (card['user_name'].get_full_name(), card['following'],
+            counter.posts_count, counter.followers_count,
+            counter.following_count)
@@ -0,0 +1,141 @@
+"""Замеры горячих страниц через тестовый клиент на заполненной базе.
+
+Каждый сценарий — один запрос к странице. Время меряется в отдельных
+прогонах без tracemalloc, который сам замедляет код; число SQL-запросов
+и пик выделенной памяти — в одном дополнительном прогоне. Записывающие
+сценарии выполняются в транзакции с откатом, чтобы данные не менялись
+от прогона к прогону.
+"""
+import time
+import tracemalloc
+
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction
+from django.db.models import Count
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from .models import Group, Post
+
+User = get_user_model()
+
+HOST = 'localhost'
+# Адрес не из INTERNAL_IPS, чтобы debug toolbar не попадал в замер.
+REMOTE_ADDR = '192.0.2.1'
+WRITES = ('new_post', 'add_comment')
+# Метрики, по которым ищется регрессия.
+CHECKED = ('p95_ms', 'queries', 'memory_kib')
+
+
+def percentile(values, share):
+    """Значение по методу ближайшего ранга."""
+    ordered = sorted(values)
+    rank = max(int(round(share * len(ordered) + 0.5)) - 1, 0)
+    return ordered[min(rank, len(ordered) - 1)]
+
+
+class Fixture:
+    """Объекты, на которых гоняются сценарии.
+
+    Читатель — пользователь с наибольшим числом подписок, автор —
+    самый популярный, запись — его последняя.
+    """
+
+    def __init__(self):
+        self.reader = User.objects.annotate(
+            total=Count('follower')).order_by('-total', 'pk').first()
+        self.author = User.objects.annotate(
+            total=Count('following')).order_by('-total', 'pk').first()
+        self.group = Group.objects.annotate(
+            total=Count('posts')).order_by('-total', 'pk').first()
+        self.post = Post.objects.filter(author=self.author).order_by(
+            '-pub_date', '-pk').first()
+        if None in (self.reader, self.group, self.post):
+            raise ValueError('В базе нет пользователей, групп или записей')
+
+    def scenarios(self):
+        post_args = [self.author.username, self.post.pk]
+        return {
+            'index': ('get', reverse('posts:index'), None),
+            'group_posts': ('get', reverse('posts:group',
+                                           args=[self.group.slug]), None),
+            'profile': ('get', reverse('posts:profile',
+                                       args=[self.author.username]), None),
+            'post_view': ('get', reverse('posts:post', args=post_args),
+                          None),
+            'follow_index': ('get', reverse('posts:follow_index'), None),
+            'new_post': ('post', reverse('posts:new_post'),
+                         {'text': 'Запись из замера',
+                          'group': self.group.pk}),
+            'add_comment': ('post', reverse('posts:add_comment',
+                                            args=post_args),
+                            {'text': 'Комментарий из замера'}),
+        }
+
+
+def _request(client, name, method, url, data):
+    if name not in WRITES:
+        return getattr(client, method)(url, data)
+    with transaction.atomic():
+        response = getattr(client, method)(url, data)
+        transaction.set_rollback(True)
+    return response
+
+
+def measure(client, name, method, url, data, repeat=20, warmup=2):
+    for _ in range(warmup):
+        response = _request(client, name, method, url, data)
+        if response.status_code >= 400:
+            raise ValueError(f'{name}: ответ {response.status_code}')
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        _request(client, name, method, url, data)
+        timings.append((time.perf_counter() - start) * 1000)
+    tracemalloc.start()
+    try:
+        with CaptureQueriesContext(connection) as queries:
+            _request(client, name, method, url, data)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {
+        'p50_ms': round(percentile(timings, 0.5), 3),
+        'p95_ms': round(percentile(timings, 0.95), 3),
+        'queries': len(queries),
+        'memory_kib': round(peak / 1024, 1),
+    }
+
+
+def run(names=None, repeat=20, warmup=2):
+    fixture = Fixture()
+    client = Client(HTTP_HOST=HOST, REMOTE_ADDR=REMOTE_ADDR)
+    client.force_login(fixture.reader)
+    results = {}
+    for name, (method, url, data) in fixture.scenarios().items():
+        if names and name not in names:
+            continue
+        results[name] = measure(client, name, method, url, data,
+                                repeat, warmup)
+    return results
+
+
+def regressions(results, baseline, threshold):
+    """Метрики, выросшие больше чем в (1 + threshold) раз.
+
+    Число запросов детерминировано, поэтому для него допуска нет.
+    """
+    found = []
+    for name, metrics in results.items():
+        expected = baseline.get(name)
+        if expected is None:
+            continue
+        for metric in CHECKED:
+            allowed = expected[metric]
+            if metric != 'queries':
+                allowed *= 1 + threshold
+            if metrics[metric] > allowed:
+                found.append((name, metric, expected[metric],
+                              metrics[metric]))
+    return found
@@ -0,0 +1,80 @@
+"""Пакетная запись через bulk_create.
+
+bulk_create не вызывает сигналов, поэтому всё, что делают обработчики
+из posts/signals.py, здесь выполняется явно и сразу для всей пачки.
+"""
+from collections import Counter
+
+from django.db import transaction
+
+from . import authors, cards, counters, search, timeline
+from .models import Comment, Follow, Post
+from .pagination import forget_count
+
+
+def _with_pks(model, objs, **lookup):
+    # На SQLite bulk_create не возвращает pk. Внутри транзакции база
+    # заблокирована на запись, поэтому последние len(objs) строк с тем
+    # же автором — только что вставленные.
+    if not objs or objs[0].pk is not None:
+        return objs
+    return list(reversed(model.objects.filter(**lookup).select_related(
+        *[field.name for field in model._meta.concrete_fields
+          if field.is_relation]).order_by('-pk')[:len(objs)]))
+
+
+def create_posts(author, posts):
+    with transaction.atomic():
+        for post in posts:
+            post.author = author
+        posts = _with_pks(Post, Post.objects.bulk_create(posts),
+                          author=author)
+        counters.bump_user(author.pk, 'posts_count', len(posts))
+        if posts:
+            timeline.fan_out(*posts)
+        search.update(*[post.pk for post in posts])
+    forget_count('index', *{'group:%s' % post.group_id for post in posts})
+    return posts
+
+
+def create_comments(author, comments):
+    with transaction.atomic():
+        for comment in comments:
+            comment.author = author
+        comments = _with_pks(Comment, Comment.objects.bulk_create(comments),
+                             author=author)
+        deltas = Counter(comment.post_id for comment in comments)
+        counters.bump_comments_many(deltas)
+        cards.touch(*deltas)
+        search.update(*deltas)
+    return comments
+
+
+def follow_authors(user, targets):
+    """Подписывает на авторов, на которых ещё нет подписки."""
+    with transaction.atomic():
+        existing = set(Follow.objects.filter(
+            user=user, author__in=targets).values_list('author_id',
+                                                       flat=True))
+        follows = Follow.objects.bulk_create([
+            Follow(user=user, author=author) for author in targets
+            if author.pk not in existing and author != user
+        ])
+        author_ids = [entry.author_id for entry in follows]
+        if author_ids:
+            counters.bump_users(author_ids, 'followers_count', 1)
+            counters.bump_user(user.pk, 'following_count', len(author_ids))
+            timeline.pull_popular(*author_ids)
+            timeline.backfill(user.pk, *author_ids)
+    for entry in follows:
+        authors.forget(entry)
+    return follows
+
+
+def unfollow_authors(user, targets):
+    # Отписки редки и малы: удаляем через ORM, сигналы обновят счётчики
+    # и ленту для каждой подписки.
+    with transaction.atomic():
+        deleted, _ = Follow.objects.filter(user=user,
+                                           author__in=targets).delete()
+    return deleted
@@ -0,0 +1,99 @@
+import hashlib
+import math
+import os
+import random
+import time
+
+from django.core.cache import cache, caches
+from django.core.cache.backends.filebased import FileBasedCache
+
+from . import metrics
+
+LOCK_TIMEOUT = 10
+WAIT_STEP = 0.05
+WAIT_STEPS = 40
+
+
+def _expired(delta, expires_at, beta):
+    # Вероятностное раннее истечение (XFetch): чем дольше пересчёт и чем
+    # ближе срок, тем вероятнее, что один из запросов обновит значение
+    # заранее, и записи не истекают у всех воркеров одновременно.
+    jitter = -delta * beta * math.log(1.0 - random.random())
+    return time.time() + jitter >= expires_at
+
+
+def _lock_path(backend, lock_key):
+    name = hashlib.md5(backend.make_key(lock_key).encode()).hexdigest()
+    return os.path.join(backend._dir, name + '.lock')
+
+
+def _acquire(lock_key):
+    """Берёт блокировку пересчёта; True, если её получил этот запрос.
+
+    У FileBasedCache add — это проверка и запись файла двумя шагами, и
+    два воркера могут взять блокировку оба. Для него блокировка — файл,
+    созданный с O_CREAT | O_EXCL; .lock не похож на файлы записей, и
+    clear() с отбраковкой его не трогают. Остальные бэкенды (memcached,
+    redis, locmem, база) делают add атомарно.
+    """
+    backend = caches['default']
+    if not isinstance(backend, FileBasedCache):
+        return cache.add(lock_key, 1, LOCK_TIMEOUT)
+    path = _lock_path(backend, lock_key)
+    os.makedirs(backend._dir, exist_ok=True)
+    for _ in range(2):
+        try:
+            os.close(os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+            return True
+        except FileExistsError:
+            pass
+        # Блокировку воркера, упавшего посреди пересчёта, никто не снимет.
+        try:
+            if time.time() - os.path.getmtime(path) < LOCK_TIMEOUT:
+                return False
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+    return False
+
+
+def _release(lock_key):
+    backend = caches['default']
+    if not isinstance(backend, FileBasedCache):
+        cache.delete(lock_key)
+        return
+    try:
+        os.remove(_lock_path(backend, lock_key))
+    except FileNotFoundError:
+        pass
+
+
+def get_or_compute(key, compute, timeout, beta=1.0):
+    """Значение из общего кэша с защитой от одновременного пересчёта.
+
+    Пересчитывает только тот запрос, который взял блокировку; остальные
+    получают устаревшее значение или ждут, пока его запишут.
+    """
+    entry = cache.get(key)
+    metrics.record_cache(entry is not None, entry is None)
+    if entry is not None and not _expired(entry[1], entry[2], beta):
+        return entry[0]
+    lock_key = key + ':lock'
+    if _acquire(lock_key):
+        try:
+            started = time.time()
+            value = compute()
+            finished = time.time()
+            cache.set(key, (value, finished - started, finished + timeout),
+                      timeout)
+            return value
+        finally:
+            _release(lock_key)
+    if entry is not None:
+        return entry[0]
+    for _ in range(WAIT_STEPS):
+        time.sleep(WAIT_STEP)
+        entry = cache.get(key)
+        if entry is not None:
+            return entry[0]
+    return compute()
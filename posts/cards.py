@@ -0,0 +1,48 @@
+from django.core.cache import cache
+from django.utils import timezone
+from django.utils.safestring import mark_safe
+
+from . import metrics, thumbnails
+from .models import Post
+
+CARD_TEMPLATE = 'posts/includes/post_card.html'
+CARD_TIMEOUT = 60 * 60 * 24
+
+
+def card_key(post, viewer_is_author=False):
+    # updated меняется при правке и новых комментариях, поэтому
+    # устаревшие карточки просто перестают запрашиваться.
+    return 'post_card:%s:%s:%d' % (post.pk, post.updated.isoformat(),
+                                   viewer_is_author)
+
+
+def touch(*post_ids):
+    Post.objects.filter(pk__in=post_ids).update(updated=timezone.now())
+
+
+def forget(post):
+    cache.delete_many([card_key(post, False), card_key(post, True)])
+
+
+def render_cards(posts, context):
+    """Отрисованные карточки записей, прочитанные из кэша одним get_many."""
+    user = context.get('user')
+    keys = [card_key(post, user == post.author) for post in posts]
+    cached = cache.get_many(keys)
+    metrics.record_cache(len(cached), len(keys) - len(cached))
+    template = context.template.engine.get_template(CARD_TEMPLATE)
+    missing = {}
+    for key, post in zip(keys, posts):
+        if key not in cached:
+            with context.push(post=post):
+                cached[key] = template.render(context)
+            # Карточку с заглушкой вместо миниатюры не кэшируем.
+            if thumbnails.is_ready(post):
+                missing[key] = cached[key]
+    if missing:
+        cache.set_many(missing, CARD_TIMEOUT)
+    return [mark_safe(cached[key]) for key in keys]
+
+
+def feed_version(posts):
+    return max((post.updated for post in posts), default=None)
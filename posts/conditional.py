@@ -0,0 +1,71 @@
+import hashlib
+
+from django.shortcuts import render
+from django.utils.cache import (get_conditional_response, patch_cache_control,
+                                patch_vary_headers, quote_etag)
+from django.utils.http import http_date
+
+
+def make_etag(request, *parts):
+    """ETag из версий показанных объектов, без рендеринга страницы.
+
+    В хэш входят полный путь с параметрами и читатель: страница содержит
+    его имя в меню и кнопки, которые видит только он.
+    """
+    digest = hashlib.md5(request.get_full_path().encode())
+    digest.update(repr(request.user.pk).encode())
+    for part in parts:
+        digest.update(repr(part).encode())
+    return quote_etag(digest.hexdigest())
+
+
+def versions(posts):
+    """Пары (pk, updated) для ETag; updated меняется и от комментариев."""
+    return [(post.pk, post.updated) for post in posts]
+
+
+def last_modified(posts):
+    return max((post.updated for post in posts), default=None)
+
+
+def not_modified(request, etag):
+    """Ответ 304 (или 412), если клиент уже видел эту версию, иначе None.
+
+    Проверяется только ETag: Last-Modified — самая свежая из показанных
+    записей, и он не меняется ни от удаления записи, ни от подписки,
+    поэтому If-Modified-Since без If-None-Match отдавал бы устаревшую
+    страницу.
+    """
+    return get_conditional_response(request, etag=etag)
+
+
+def finish(request, response, etag, modified=None, max_age=0):
+    """Проставляет валидаторы и Cache-Control.
+
+    Анонимные страницы одинаковы для всех и могут лежать в общем кэше
+    прокси max_age секунд; страницы читателя — только в его браузере и
+    с обязательной перепроверкой по ETag.
+    """
+    response['ETag'] = etag
+    if modified is not None:
+        response['Last-Modified'] = http_date(modified.timestamp())
+    if request.user.is_authenticated or not max_age:
+        patch_cache_control(response, private=True, no_cache=True)
+    else:
+        patch_cache_control(response, public=True, max_age=max_age)
+    patch_vary_headers(response, ('Cookie',))
+    return response
+
+
+def render_page(request, template_name, context, posts, *parts, max_age=0):
+    """render() с ответом 304 без рендеринга, если версия не изменилась.
+
+    posts — уже загруженные записи страницы, parts — прочие данные,
+    от которых зависит страница.
+    """
+    etag = make_etag(request, versions(posts), *parts)
+    modified = last_modified(posts)
+    response = not_modified(request, etag)
+    if response is None:
+        response = render(request, template_name, context)
+    return finish(request, response, etag, modified, max_age)
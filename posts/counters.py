@@ -0,0 +1,74 @@
+from django.db.models import Count, F, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+
+from .models import Comment, Follow, Post, UserCounter
+
+
+def get_user_counter(user):
+    """Счётчики пользователя; при первом обращении считаются по таблицам."""
+    try:
+        return UserCounter.objects.get(user=user)
+    except UserCounter.DoesNotExist:
+        counter, _ = UserCounter.objects.get_or_create(user=user, defaults={
+            'posts_count': user.posts.count(),
+            'followers_count': user.following.count(),
+            'following_count': user.follower.count(),
+        })
+        return counter
+
+
+def bump_user(user_id, field, delta):
+    bump_users([user_id], field, delta)
+
+
+def bump_users(user_ids, field, delta):
+    UserCounter.objects.filter(user_id__in=user_ids).update(
+        **{field: F(field) + delta})
+
+
+def bump_comments(post_id, delta):
+    Post.objects.filter(pk=post_id).update(
+        comments_count=F('comments_count') + delta)
+
+
+def bump_comments_many(deltas):
+    """Прибавляет {post_id: delta}; одно UPDATE на каждое значение delta."""
+    by_delta = {}
+    for post_id, delta in deltas.items():
+        by_delta.setdefault(delta, []).append(post_id)
+    for delta, post_ids in by_delta.items():
+        Post.objects.filter(pk__in=post_ids).update(
+            comments_count=F('comments_count') + delta)
+
+
+def _live_count(model, field, outer):
+    return Coalesce(Subquery(
+        model.objects.filter(**{field: OuterRef(outer)})
+        .order_by().values(field)
+        .annotate(total=Count('pk')).values('total')
+    ), 0)
+
+
+def repair_post_counters():
+    expected = _live_count(Comment, 'post', 'pk')
+    drifted = Post.objects.annotate(actual=expected).exclude(
+        comments_count=F('actual'))
+    return Post.objects.filter(pk__in=drifted.values('pk')).update(
+        comments_count=_live_count(Comment, 'post', 'pk'))
+
+
+def repair_user_counters():
+    def expected():
+        return {
+            'posts_count': _live_count(Post, 'author', 'user_id'),
+            'followers_count': _live_count(Follow, 'author', 'user_id'),
+            'following_count': _live_count(Follow, 'user', 'user_id'),
+        }
+    drift = Q()
+    for field in expected():
+        drift |= ~Q(**{field: F('actual_' + field)})
+    drifted = UserCounter.objects.annotate(**{
+        'actual_' + field: value for field, value in expected().items()
+    }).filter(drift)
+    return UserCounter.objects.filter(pk__in=drifted.values('pk')).update(
+        **expected())
@@ -1,6 +1,8 @@
 from django import forms
+from django.core.files.uploadedfile import UploadedFile
 from django.utils.translation import gettext_lazy as _
 
+from . import uploads
 from .models import Post, Comment
 
 
@@ -20,6 +22,25 @@ class PostForm(forms.ModelForm):
             'image': _('Загрузить картинку')
         }
 
+    def clean_image(self):
+        image = self.cleaned_data['image']
+        if isinstance(image, UploadedFile):
+            uploads.check_size(image)
+            image = uploads.prepare(image)
+        return image
+
+    def clean(self):
+        upload = self.files.get('image')
+        if upload is not None and 'image' in self.errors:
+            # Файл сверх лимита на диск записан не целиком, и поле
+            # отклоняет его как битую картинку; причина — размер.
+            try:
+                uploads.check_size(upload)
+            except forms.ValidationError as error:
+                del self.errors['image']
+                self.add_error('image', error)
+        return super().clean()
+
 
 class CommentForm(forms.ModelForm):
     class Meta:
@@ -0,0 +1,54 @@
+import json
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from posts import benchmark
+
+
+class Command(BaseCommand):
+    help = ('Замеряет p50/p95 времени ответа, число запросов и память '
+            'горячих страниц; сравнивает с сохранённым базовым замером')
+
+    def add_arguments(self, parser):
+        parser.add_argument('scenarios', nargs='*',
+                            help='Сценарии; по умолчанию все')
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument('--warmup', type=int, default=2)
+        parser.add_argument('--save', metavar='FILE',
+                            help='Записать результаты как базовый замер')
+        parser.add_argument('--baseline', metavar='FILE',
+                            help='Сравнить с базовым замером')
+        parser.add_argument('--threshold', type=float, default=0.25,
+                            help='Допустимый рост времени и памяти, доля')
+
+    def handle(self, *args, **options):
+        if settings.DEBUG:
+            self.stderr.write('DEBUG включён: Django запоминает каждый '
+                              'запрос, цифры будут завышены')
+        try:
+            results = benchmark.run(options['scenarios'], options['repeat'],
+                                    options['warmup'])
+        except ValueError as error:
+            raise CommandError(error)
+        self.stdout.write(f'{"сценарий":<14}{"p50, мс":>10}{"p95, мс":>10}'
+                          f'{"запросов":>10}{"память, КиБ":>14}')
+        for name, metrics in results.items():
+            self.stdout.write(
+                f'{name:<14}{metrics["p50_ms"]:>10.2f}'
+                f'{metrics["p95_ms"]:>10.2f}{metrics["queries"]:>10}'
+                f'{metrics["memory_kib"]:>14.1f}')
+        if options['save']:
+            with open(options['save'], 'w') as baseline:
+                json.dump({'repeat': options['repeat'],
+                           'scenarios': results}, baseline, indent=2,
+                          sort_keys=True)
+        if options['baseline']:
+            with open(options['baseline']) as baseline:
+                expected = json.load(baseline)['scenarios']
+            found = benchmark.regressions(results, expected,
+                                          options['threshold'])
+            for name, metric, before, after in found:
+                self.stderr.write(f'{name}: {metric} {before} -> {after}')
+            if found:
+                raise CommandError(f'Регрессий: {len(found)}')
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from posts.query_plans import check_plans
+
+
+class Command(BaseCommand):
+    help = ('Проверяет EXPLAIN QUERY PLAN запросов лент: ни один не должен '
+            'читать всю таблицу с сортировкой во временном B-дереве')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError('Проверка рассчитана на SQLite')
+        failed = []
+        for name, (plan, bad) in check_plans().items():
+            self.stdout.write(f'{name}: {"FAIL" if bad else "OK"}')
+            for line in plan.splitlines():
+                self.stdout.write(f'    {line}')
+            if bad:
+                failed.append(name)
+        if failed:
+            raise CommandError('Нет подходящего индекса: ' + ', '.join(failed))
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from posts import storage
+from posts.thumbnail_cache import BATCH_SIZE, Cleaner
+
+
+class Command(BaseCommand):
+    help = ('Удаляет миниатюры sorl-thumbnail без исходника, файлы без '
+            'ключа и ключи удалённых файлов')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Только посчитать, что будет удалено')
+        parser.add_argument('--grace', type=int,
+                            default=storage.GRACE_SECONDS,
+                            help='Не трогать файлы без ключа моложе '
+                                 'стольких секунд')
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE,
+                            help='Сколько ключей читать за запрос')
+
+    def handle(self, *args, **options):
+        totals = Cleaner(options['dry_run'], options['grace'],
+                         options['batch_size']).run()
+        verb = 'Будет удалено' if options['dry_run'] else 'Удалено'
+        self.stdout.write(
+            f'{verb} ключей: {totals["keys"]}, файлов: {totals["files"]}, '
+            f'{totals["bytes"] / 2 ** 20:.1f} МБ')
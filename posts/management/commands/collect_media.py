@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+
+from posts import storage
+from posts.models import Post
+
+
+class Command(BaseCommand):
+    help = ('Удаляет картинки и миниатюры, на которые не ссылается '
+            'ни одна запись')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Только показать, что будет удалено')
+        parser.add_argument('--grace', type=int,
+                            default=storage.GRACE_SECONDS,
+                            help='Не трогать файлы моложе стольких секунд')
+
+    def handle(self, *args, **options):
+        images = Post.objects.exclude(image='').exclude(image__isnull=True)
+        names, hashes = set(), set()
+        for name, image_hash in images.values_list(
+                'image', 'image_hash').iterator():
+            names.add(name)
+            hashes.add(image_hash)
+        files = size = 0
+        for backend, name, nbytes in storage.orphans(names, hashes,
+                                                     options['grace']):
+            if options['verbosity'] > 1:
+                self.stdout.write(name)
+            if not options['dry_run']:
+                backend.delete(name)
+            files += 1
+            size += nbytes
+        verb = 'Будет удалено' if options['dry_run'] else 'Удалено'
+        self.stdout.write(f'{verb} файлов: {files}, '
+                          f'{size / 2 ** 20:.1f} МБ')
@@ -0,0 +1,34 @@
+import sys
+import time
+
+from django.core.management.base import BaseCommand
+
+from posts import transfer
+
+
+class Command(BaseCommand):
+    help = ('Выгружает сообщества, пользователей, записи, комментарии и '
+            'подписки в NDJSON, не загружая таблицы в память целиком')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', metavar='FILE',
+                            help='Файл выгрузки; по умолчанию stdout')
+        parser.add_argument('--batch-size', type=int,
+                            default=transfer.BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as output:
+                totals = transfer.export(output, options['batch_size'])
+        else:
+            totals = transfer.export(sys.stdout, options['batch_size'])
+        report(self.stderr, totals, time.perf_counter() - started)
+
+
+def report(stream, totals, elapsed):
+    """Строк по моделям и строк в секунду."""
+    rows = sum(totals.values())
+    details = ', '.join(f'{name}: {count}' for name, count in totals.items())
+    stream.write(f'{details}; {rows} строк за {elapsed:.1f} с, '
+                 f'{rows / max(elapsed, 1e-9):.0f} строк/с')
@@ -0,0 +1,45 @@
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from posts import transfer
+
+from .export_content import report
+
+
+class Command(BaseCommand):
+    help = ('Загружает выгрузку export_content пачками; после сбоя '
+            'продолжает с контрольной точки')
+
+    def add_arguments(self, parser):
+        parser.add_argument('input', metavar='FILE')
+        parser.add_argument('--batch-size', type=int,
+                            default=transfer.BATCH_SIZE)
+        parser.add_argument('--restart', action='store_true',
+                            help='Начать сначала, а не с контрольной точки')
+
+    def handle(self, *args, **options):
+        checkpoint_file = options['input'] + '.checkpoint'
+        start = 0
+        if os.path.exists(checkpoint_file) and not options['restart']:
+            with open(checkpoint_file) as checkpoint:
+                start = int(checkpoint.read())
+            self.stdout.write(f'Продолжаю после строки {start}')
+
+        def save_checkpoint(number):
+            with open(checkpoint_file, 'w') as checkpoint:
+                checkpoint.write(str(number))
+
+        started = time.perf_counter()
+        with open(options['input'], encoding='utf-8') as lines:
+            try:
+                totals = transfer.load(lines, start, options['batch_size'],
+                                       save_checkpoint)
+            except transfer.TransferError as error:
+                raise CommandError(error)
+        report(self.stdout, totals, time.perf_counter() - started)
+        self.stdout.write('Пересчитываю счётчики, ленты и поиск')
+        transfer.finish()
+        if os.path.exists(checkpoint_file):
+            os.remove(checkpoint_file)
@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand
+
+from posts import metrics
+
+
+def _ms(seconds):
+    return seconds * 1000
+
+
+class Command(BaseCommand):
+    help = ('Показывает накопленные всеми процессами замеры запросов '
+            'по каждому view')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--prometheus', action='store_true',
+                            help='Вывести в текстовом формате Prometheus')
+        parser.add_argument('--reset', action='store_true',
+                            help='Обнулить накопленные замеры')
+
+    def handle(self, *args, **options):
+        if options['reset']:
+            metrics.reset()
+            self.stdout.write('Замеры обнулены')
+            return
+        views = metrics.collect()
+        if options['prometheus']:
+            self.stdout.write(metrics.exposition(views), ending='')
+            return
+        self.stdout.write(
+            f'{"view":<28}{"запросов":>9}{"p50, мс":>9}{"p95, мс":>9}'
+            f'{"SQL":>6}{"SQL, мс":>9}{"шаблон, мс":>12}{"кэш":>7}')
+        for view, stats in sorted(views.items()):
+            request = stats['request_seconds']
+            count = request['count']
+            reads = stats['cache_hits'] + stats['cache_misses']
+            hit_rate = (f'{stats["cache_hits"] / reads:.0%}'
+                        if reads else '-')
+            p50, p95 = (
+                _ms(metrics.quantile(request, metrics.TIME_BUCKETS, share))
+                for share in (0.5, 0.95))
+            self.stdout.write(
+                f'{view:<28}{count:>9}{p50:>9g}{p95:>9g}'
+                f'{stats["db_queries"]["sum"] / count:>6.1f}'
+                f'{_ms(stats["db_seconds"]["sum"]) / count:>9.1f}'
+                f'{_ms(stats["template_seconds"]["sum"]) / count:>12.1f}'
+                f'{hit_rate:>7}')
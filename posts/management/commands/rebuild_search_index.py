@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from posts import search
+
+
+class Command(BaseCommand):
+    help = 'Заново строит поисковый индекс по всем записям и комментариям'
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            total = search.get_backend().rebuild()
+        self.stdout.write(f'Проиндексировано записей: {total}')
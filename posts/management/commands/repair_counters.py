@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from posts import counters, timeline
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает счётчики записей, комментариев и подписок'
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            posts = counters.repair_post_counters()
+            users = counters.repair_user_counters()
+            # Исправленное число подписчиков может перевести автора
+            # между раскладкой по лентам и join-ом.
+            timeline.pull_popular()
+            timeline.push_unpopular()
+        self.stdout.write(
+            f'Исправлено записей: {posts}, пользователей: {users}')
@@ -0,0 +1,42 @@
+import random
+
+from django.core.management.base import BaseCommand, CommandError
+
+from posts import seeding
+
+
+class Command(BaseCommand):
+    help = ('Заполняет базу пользователями, сообществами, записями, '
+            'подписками и комментариями для замеров')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--groups', type=int, default=20)
+        parser.add_argument('--posts', type=int, default=20000)
+        parser.add_argument('--comments', type=int, default=50000)
+        parser.add_argument('--follows', type=float, default=30,
+                            help='Среднее число подписок на пользователя')
+        parser.add_argument('--images', type=float, default=0.2,
+                            help='Доля записей с картинкой')
+        parser.add_argument('--alpha', type=float, default=1.2,
+                            help='Показатель степенного закона популярности')
+        parser.add_argument('--seed', type=int, default=0,
+                            help='Зерно генератора для повторяемости')
+        parser.add_argument('--clear', action='store_true',
+                            help='Сначала удалить созданные ранее данные')
+
+    def handle(self, *args, **options):
+        if options['users'] < 1:
+            raise CommandError('Нужен хотя бы один пользователь')
+        if options['clear']:
+            seeding.clear()
+        elif seeding.seed_exists():
+            raise CommandError('Данные уже созданы, запустите с --clear')
+        totals = seeding.seed(
+            options['users'], options['groups'], options['posts'],
+            options['comments'], options['follows'],
+            image_share=options['images'], alpha=options['alpha'],
+            rng=random.Random(options['seed']))
+        self.stdout.write(
+            'Пользователей: {users}, сообществ: {groups}, записей: {posts}, '
+            'подписок: {follows}, комментариев: {comments}'.format(**totals))
@@ -0,0 +1,49 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from posts import thumbnails
+from posts.models import Post
+
+
+def _hash(image_name):
+    with default_storage.open(image_name) as image:
+        return thumbnails.content_hash(image)
+
+
+def _warm(post):
+    pk, image_name, image_hash = post
+    try:
+        image_hash = image_hash or _hash(image_name)
+        created = thumbnails.generate(image_name, image_hash)
+    except Exception as error:
+        return post, None, 'failed', error
+    return post, image_hash, 'created' if created else 'skipped', None
+
+
+class Command(BaseCommand):
+    help = 'Заранее создаёт варианты картинок для всех записей'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=4,
+                            help='Число параллельных потоков')
+
+    def handle(self, *args, **options):
+        posts = Post.objects.exclude(image='').exclude(
+            image__isnull=True).values_list('pk', 'image', 'image_hash')
+        totals = {'created': 0, 'skipped': 0, 'failed': 0}
+        with ThreadPoolExecutor(max_workers=options['workers']) as pool:
+            for post, image_hash, result, error in pool.map(
+                    _warm, posts.iterator()):
+                totals[result] += 1
+                pk, name, old_hash = post
+                if error is not None:
+                    self.stderr.write(f'{name}: {error}')
+                elif image_hash != old_hash:
+                    # Новый updated сбрасывает карточки без картинки в кэше.
+                    Post.objects.filter(pk=pk).update(
+                        image_hash=image_hash, updated=timezone.now())
+        self.stdout.write('Создано: {created}, уже были: {skipped}, '
+                          'ошибок: {failed}'.format(**totals))
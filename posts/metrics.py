@@ -0,0 +1,252 @@
+"""Счётчики времени ответа, SQL, кэша и шаблонов по каждому view.
+
+В отличие от debug toolbar работает при DEBUG = False: для выборки из
+METRICS_SAMPLE_RATE запросов замеряются запросы к базе, отрисовка
+шаблонов и обращения к кэшу, и всё складывается в гистограммы с
+фиксированными границами. Каждый процесс копит свои гистограммы в
+памяти и раз в METRICS_FLUSH_INTERVAL секунд кладёт снимок в общий
+кэш; команда metrics и страница /metrics/ суммируют снимки всех
+процессов.
+"""
+import logging
+import os
+import random
+import socket
+import threading
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+from django.template.backends.django import Template
+
+logger = logging.getLogger(__name__)
+
+WORKERS_KEY = 'metrics:workers'
+SNAPSHOT_TIMEOUT = 60 * 60 * 24
+# Границы корзин гистограмм: секунды для времени, штуки для запросов.
+TIME_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+QUERY_BUCKETS = (1, 2, 5, 10, 20, 50, 100)
+HISTOGRAMS = {
+    'request_seconds': TIME_BUCKETS,
+    'db_seconds': TIME_BUCKETS,
+    'db_queries': QUERY_BUCKETS,
+    'template_seconds': TIME_BUCKETS,
+}
+COUNTERS = ('cache_hits', 'cache_misses')
+
+_local = threading.local()
+_lock = threading.Lock()
+_views = {}
+_flushed_at = 0.0
+_installed = False
+
+
+def worker_id():
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+def _empty():
+    stats = {name: {'buckets': [0] * (len(bounds) + 1), 'sum': 0,
+                    'count': 0}
+             for name, bounds in HISTOGRAMS.items()}
+    stats.update((name, 0) for name in COUNTERS)
+    return stats
+
+
+def _observe(histogram, bounds, value):
+    index = next((i for i, bound in enumerate(bounds) if value <= bound),
+                 len(bounds))
+    histogram['buckets'][index] += 1
+    histogram['sum'] += value
+    histogram['count'] += 1
+
+
+class Recorder:
+    """Замеры одного запроса; к базам подключается через execute_wrapper."""
+
+    def __init__(self):
+        self.queries = []
+        self.template_time = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append((sql, time.perf_counter() - start))
+
+    def __enter__(self):
+        self._stack = ExitStack()
+        for connection in connections.all():
+            self._stack.enter_context(connection.execute_wrapper(self))
+        _local.recorder = self
+        return self
+
+    def __exit__(self, *exc_info):
+        _local.recorder = None
+        self._stack.close()
+
+    @property
+    def db_time(self):
+        return sum(duration for _, duration in self.queries)
+
+
+def current():
+    return getattr(_local, 'recorder', None)
+
+
+def record_cache(hits, misses=0):
+    """Учитывает чтения из кэша; вызывается там, где код читает кэш."""
+    recorder = current()
+    if recorder is not None:
+        recorder.cache_hits += hits
+        recorder.cache_misses += misses
+
+
+def install():
+    """Подключает замер отрисовки шаблонов.
+
+    Template.render бэкенда вызывается один раз на страницу, вложенные
+    {% include %} идут мимо него, поэтому время не считается дважды.
+    """
+    global _installed
+    if _installed:
+        return
+    render = Template.render
+
+    def timed_render(self, context=None, request=None):
+        recorder = current()
+        if recorder is None:
+            return render(self, context, request)
+        start = time.perf_counter()
+        try:
+            return render(self, context, request)
+        finally:
+            recorder.template_time += time.perf_counter() - start
+
+    Template.render = timed_render
+    _installed = True
+
+
+def is_sampled():
+    return random.random() < settings.METRICS_SAMPLE_RATE
+
+
+def observe(view, wall_time, recorder):
+    global _flushed_at
+    with _lock:
+        stats = _views.setdefault(view, _empty())
+        _observe(stats['request_seconds'], TIME_BUCKETS, wall_time)
+        _observe(stats['db_seconds'], TIME_BUCKETS, recorder.db_time)
+        _observe(stats['db_queries'], QUERY_BUCKETS, len(recorder.queries))
+        _observe(stats['template_seconds'], TIME_BUCKETS,
+                 recorder.template_time)
+        stats['cache_hits'] += recorder.cache_hits
+        stats['cache_misses'] += recorder.cache_misses
+        due = time.time() - _flushed_at >= settings.METRICS_FLUSH_INTERVAL
+        if due:
+            _flushed_at = time.time()
+    if due:
+        flush()
+
+
+def log_slow(request, view, wall_time, recorder=None):
+    """Пишет в лог запрос дольше METRICS_SLOW_REQUEST_MS вместе с SQL."""
+    threshold = settings.METRICS_SLOW_REQUEST_MS
+    if threshold is None or wall_time * 1000 < threshold:
+        return
+    lines = [f'{request.method} {request.get_full_path()} ({view}): '
+             f'{wall_time * 1000:.0f} мс']
+    if recorder is None:
+        lines.append('SQL не записан: запрос не попал в выборку')
+    else:
+        lines.append(f'{len(recorder.queries)} запросов к базе, '
+                     f'{recorder.db_time * 1000:.0f} мс')
+        lines.extend(f'{duration * 1000:8.1f} мс  {sql}'
+                     for sql, duration in recorder.queries)
+    logger.warning('\n'.join(lines))
+
+
+def snapshot():
+    with _lock:
+        return {view: {name: (dict(value, buckets=list(value['buckets']))
+                              if isinstance(value, dict) else value)
+                       for name, value in stats.items()}
+                for view, stats in _views.items()}
+
+
+def flush():
+    """Кладёт снимок процесса в общий кэш."""
+    key = f'metrics:{worker_id()}'
+    cache.set(key, snapshot(), SNAPSHOT_TIMEOUT)
+    workers = cache.get(WORKERS_KEY, set())
+    if key not in workers:
+        cache.set(WORKERS_KEY, workers | {key}, SNAPSHOT_TIMEOUT)
+
+
+def collect():
+    """Сумма снимков всех процессов."""
+    total = {}
+    workers = cache.get(WORKERS_KEY, set())
+    for views in cache.get_many(workers).values():
+        for view, stats in views.items():
+            merged = total.setdefault(view, _empty())
+            for name in HISTOGRAMS:
+                merged[name]['sum'] += stats[name]['sum']
+                merged[name]['count'] += stats[name]['count']
+                merged[name]['buckets'] = [
+                    a + b for a, b in zip(merged[name]['buckets'],
+                                          stats[name]['buckets'])]
+            for name in COUNTERS:
+                merged[name] += stats[name]
+    return total
+
+
+def reset():
+    global _flushed_at
+    with _lock:
+        _views.clear()
+        _flushed_at = 0.0
+    cache.delete_many(list(cache.get(WORKERS_KEY, set())) + [WORKERS_KEY])
+
+
+def quantile(histogram, bounds, share):
+    """Верхняя граница корзины, в которую попадает квантиль."""
+    if not histogram['count']:
+        return 0
+    seen = 0
+    for bound, count in zip(bounds + (float('inf'),), histogram['buckets']):
+        seen += count
+        if seen >= share * histogram['count']:
+            return bound
+    return float('inf')
+
+
+def exposition(views):
+    """Текстовый формат Prometheus."""
+    lines = []
+    for name, bounds in HISTOGRAMS.items():
+        metric = f'yatube_{name}'
+        lines.append(f'# TYPE {metric} histogram')
+        for view, stats in sorted(views.items()):
+            histogram = stats[name]
+            seen = 0
+            for bound, count in zip(bounds + ('+Inf',),
+                                    histogram['buckets']):
+                seen += count
+                lines.append(f'{metric}_bucket{{view="{view}",'
+                             f'le="{bound}"}} {seen}')
+            lines.append(f'{metric}_sum{{view="{view}"}} '
+                         f'{round(histogram["sum"], 6)}')
+            lines.append(f'{metric}_count{{view="{view}"}} '
+                         f'{histogram["count"]}')
+    for name in COUNTERS:
+        metric = f'yatube_{name}_total'
+        lines.append(f'# TYPE {metric} counter')
+        lines.extend(f'{metric}{{view="{view}"}} {stats[name]}'
+                     for view, stats in sorted(views.items()))
+    return '\n'.join(lines) + '\n'
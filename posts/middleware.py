@@ -0,0 +1,36 @@
+import time
+
+from django.core.exceptions import MiddlewareNotUsed
+from django.conf import settings
+
+from . import metrics
+
+
+class MetricsMiddleware:
+    """Замеры каждого запроса для posts/metrics.py.
+
+    Время ответа меряется всегда, чтобы не пропустить медленный запрос;
+    SQL, шаблоны и кэш — только у запросов из выборки.
+    """
+
+    def __init__(self, get_response):
+        if not settings.METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        metrics.install()
+        self.get_response = get_response
+
+    def __call__(self, request):
+        recorder = metrics.Recorder() if metrics.is_sampled() else None
+        start = time.perf_counter()
+        if recorder is None:
+            response = self.get_response(request)
+        else:
+            with recorder:
+                response = self.get_response(request)
+        wall_time = time.perf_counter() - start
+        match = getattr(request, 'resolver_match', None)
+        view = match.view_name if match else 'unresolved'
+        if recorder is not None:
+            metrics.observe(view, wall_time, recorder)
+        metrics.log_slow(request, view, wall_time, recorder)
+        return response
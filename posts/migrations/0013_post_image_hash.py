@@ -0,0 +1,18 @@
+# Generated by Django 2.2.28 on 2026-10-18 02:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0012_post_updated'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='image_hash',
+            field=models.CharField(blank=True, editable=False, help_text='SHA-256 содержимого картинки, имя каталога с её вариантами', max_length=64, verbose_name='Хэш картинки'),
+        ),
+    ]
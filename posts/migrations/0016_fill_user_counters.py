@@ -0,0 +1,45 @@
+from django.conf import settings
+from django.db import migrations, models
+
+BATCH_SIZE = 500
+
+
+def _count(model, field):
+    rows = model.objects.filter(**{field: models.OuterRef('pk')}).order_by(
+        ).values(field).annotate(total=models.Count('pk')).values('total')
+    return models.functions.Coalesce(models.Subquery(rows), 0)
+
+
+def fill_user_counters(apps, schema_editor):
+    # Без строки счётчика автор считался бы мелким при любом числе
+    # подписчиков, и его записи раскладывались бы по всем лентам.
+    app_label, model_name = settings.AUTH_USER_MODEL.split('.')
+    User = apps.get_model(app_label, model_name)
+    Post = apps.get_model('posts', 'Post')
+    Follow = apps.get_model('posts', 'Follow')
+    UserCounter = apps.get_model('posts', 'UserCounter')
+    users = User.objects.filter(counter__isnull=True).annotate(
+        posts_total=_count(Post, 'author'),
+        followers_total=_count(Follow, 'author'),
+        following_total=_count(Follow, 'user'),
+    ).values_list('pk', 'posts_total', 'followers_total', 'following_total')
+    UserCounter.objects.bulk_create([
+        UserCounter(user_id=pk, posts_count=posts_count,
+                    followers_count=followers_count,
+                    following_count=following_count)
+        for pk, posts_count, followers_count, following_count
+        in users.iterator()
+    ], batch_size=BATCH_SIZE)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('posts', '0015_post_image_storage'),
+    ]
+
+    operations = [
+        migrations.RunPython(fill_user_counters,
+                             migrations.RunPython.noop),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 2.2.28 on 2026-10-18 03:57
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def mark_pulled(apps, schema_editor):
+    UserCounter = apps.get_model('posts', 'UserCounter')
+    UserCounter.objects.filter(
+        followers_count__gt=settings.TIMELINE_FANOUT_LIMIT).update(
+            pulled=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0016_fill_user_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='usercounter',
+            name='pulled',
+            field=models.BooleanField(db_index=True, default=False, help_text='Записи автора не раскладываются по лентам подписчиков', verbose_name='Читается join-ом'),
+        ),
+        migrations.RunPython(mark_pulled, migrations.RunPython.noop),
+    ]
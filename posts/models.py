@@ -1,6 +1,8 @@
 from django.contrib.auth import get_user_model
 from django.db import models
 
+from .storage import content_storage
+
 User = get_user_model()
 
 
@@ -18,11 +20,20 @@ class Group(models.Model):
         return self.title
 
 
+class PostQuerySet(models.QuerySet):
+    def for_feed(self):
+        return self.select_related('author', 'group')
+
+
 class Post(models.Model):
     text = models.TextField(verbose_name='Текст', help_text='Введите текст')
     pub_date = models.DateTimeField(verbose_name='Дата опубликования',
                                     help_text='Введите дату опубликования',
                                     auto_now_add=True)
+    updated = models.DateTimeField(verbose_name='Дата изменения',
+                                   help_text='Меняется при правке записи '
+                                             'и новых комментариях',
+                                   auto_now=True)
     author = models.ForeignKey(User, verbose_name='Автор',
                                help_text='Укажите автора',
                                on_delete=models.CASCADE,
@@ -33,11 +44,29 @@ class Post(models.Model):
                               on_delete=models.SET_NULL,
                               related_name='posts')
     image = models.ImageField(upload_to='posts/', blank=True, null=True,
+                              storage=content_storage,
                               verbose_name='Картинка к посту',
                               help_text='Загрузить картинку')
+    image_hash = models.CharField(verbose_name='Хэш картинки',
+                                  help_text='SHA-256 содержимого картинки, '
+                                            'имя каталога с её вариантами',
+                                  max_length=64, blank=True, editable=False)
+    comments_count = models.IntegerField(verbose_name='Комментариев',
+                                         help_text='Число комментариев',
+                                         default=0, editable=False)
+
+    objects = PostQuerySet.as_manager()
 
     class Meta:
         ordering = ['-pub_date']
+        indexes = [
+            models.Index(fields=['-pub_date', '-id'],
+                         name='post_date_idx'),
+            models.Index(fields=['group', '-pub_date', '-id'],
+                         name='post_group_date_idx'),
+            models.Index(fields=['author', '-pub_date', '-id'],
+                         name='post_author_date_idx'),
+        ]
 
     def __str__(self):
         return self.text[:15]
@@ -61,6 +90,11 @@ class Comment(models.Model):
                                    help_text="Автоматически заполняется"
                                              "сегодняшней датой")
 
+    class Meta:
+        ordering = ['created']
+        indexes = [models.Index(fields=['post', 'created'],
+                                name='comment_post_created_idx')]
+
 
 class Follow(models.Model):
     user = models.ForeignKey(User,
@@ -77,3 +111,42 @@ class Follow(models.Model):
     class Meta:
         constraints = [models.UniqueConstraint(fields=['user', 'author'],
                                                name='unique_follow')]
+        indexes = [models.Index(fields=['author', 'user'],
+                                name='follow_author_user_idx')]
+
+
+class UserCounter(models.Model):
+    user = models.OneToOneField(User,
+                                on_delete=models.CASCADE,
+                                related_name='counter',
+                                verbose_name='Пользователь',
+                                help_text='Владелец счётчиков')
+    posts_count = models.IntegerField(verbose_name='Записей', default=0)
+    followers_count = models.IntegerField(verbose_name='Подписчиков',
+                                          default=0, db_index=True)
+    following_count = models.IntegerField(verbose_name='Подписок',
+                                          default=0)
+    pulled = models.BooleanField(
+        verbose_name='Читается join-ом', default=False, db_index=True,
+        help_text='Записи автора не раскладываются по лентам подписчиков')
+
+
+class TimelineEntry(models.Model):
+    user = models.ForeignKey(User,
+                             on_delete=models.CASCADE,
+                             related_name='timeline',
+                             verbose_name='Читатель',
+                             help_text='Чья это лента')
+    post = models.ForeignKey(Post,
+                             on_delete=models.CASCADE,
+                             related_name='timeline_entries',
+                             verbose_name='Запись',
+                             help_text='Запись в ленте')
+    pub_date = models.DateTimeField(verbose_name='Дата опубликования',
+                                    help_text='Копия даты записи')
+
+    class Meta:
+        constraints = [models.UniqueConstraint(fields=['user', 'post'],
+                                               name='unique_timeline_entry')]
+        indexes = [models.Index(fields=['user', '-pub_date'],
+                                name='timeline_user_date_idx')]
@@ -0,0 +1,254 @@
+import base64
+import binascii
+import json
+
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Q
+
+from yatube.replicas import PRIMARY
+
+from . import caching
+
+POSTS_PER_PAGE = 10
+# Начиная с этой страницы ссылка «Следующая» ведёт на курсор,
+# чтобы глубокие страницы не считались через OFFSET.
+PAGE_NUMBER_LIMIT = 5
+FEED_ORDERING = ('-pub_date', '-id')
+# Сколько секунд хранить число записей ленты и с какого размера таблицы
+# вместо COUNT(*) брать оценку из статистики СУБД.
+COUNT_TIMEOUT = 60 * 5
+APPROXIMATE_COUNT_AFTER = 100000
+# Сколько номеров страниц показывать вокруг текущей и по краям.
+PAGES_ON_EACH_SIDE = 2
+PAGES_ON_ENDS = 1
+COMMENTS_PER_PAGE = 20
+COMMENT_ORDERINGS = {
+    'old': ('created', 'id'),
+    'new': ('-created', '-id'),
+}
+
+
+class InvalidCursor(Exception):
+    pass
+
+
+class CursorPage:
+    is_cursor = True
+
+    def __init__(self, object_list, cursor, next_cursor, previous_cursor):
+        self.object_list = object_list
+        self.cursor = cursor
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __repr__(self):
+        return '<Cursor page %s>' % (self.cursor or 'first')
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class KeysetPaginator:
+    """Постраничный вывод по ключу сортировки вместо OFFSET."""
+
+    def __init__(self, object_list, per_page, ordering=FEED_ORDERING):
+        self.object_list = object_list
+        self.per_page = int(per_page)
+        self.ordering = tuple(ordering)
+        self.fields = [name.lstrip('-') for name in self.ordering]
+
+    def encode_cursor(self, direction, obj):
+        values = [getattr(obj, name) for name in self.fields]
+        payload = json.dumps([direction, values], default=str)
+        token = base64.urlsafe_b64encode(payload.encode())
+        return token.decode().rstrip('=')
+
+    def decode_cursor(self, cursor):
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            direction, values = json.loads(
+                base64.urlsafe_b64decode(padded.encode()).decode())
+            if direction not in ('n', 'p') or len(values) != len(self.fields):
+                raise InvalidCursor(cursor)
+            opts = self.object_list.model._meta
+            values = [opts.get_field(name).to_python(value)
+                      for name, value in zip(self.fields, values)]
+        except (TypeError, ValueError, binascii.Error, ValidationError):
+            raise InvalidCursor(cursor)
+        return direction, values
+
+    def _seek(self, values, backwards):
+        condition = Q()
+        for index, field in enumerate(self.ordering):
+            descending = field.startswith('-') != backwards
+            lookup = '%s__%s' % (self.fields[index],
+                                 'lt' if descending else 'gt')
+            step = Q(**{lookup: values[index]})
+            for name, value in zip(self.fields[:index], values[:index]):
+                step &= Q(**{name: value})
+            condition |= step
+        return condition
+
+    def page(self, cursor=None):
+        queryset = self.object_list.order_by(*self.ordering)
+        if not cursor:
+            items = list(queryset[:self.per_page + 1])
+            has_next, has_previous = len(items) > self.per_page, False
+            items = items[:self.per_page]
+        else:
+            direction, values = self.decode_cursor(cursor)
+            backwards = direction == 'p'
+            queryset = queryset.filter(self._seek(values, backwards))
+            if backwards:
+                queryset = queryset.reverse()
+            items = list(queryset[:self.per_page + 1])
+            overflow = len(items) > self.per_page
+            items = items[:self.per_page]
+            if backwards:
+                items.reverse()
+                has_next, has_previous = True, overflow
+            else:
+                has_next, has_previous = overflow, True
+        next_cursor = previous_cursor = None
+        if items and has_next:
+            next_cursor = self.encode_cursor('n', items[-1])
+        if items and has_previous:
+            previous_cursor = self.encode_cursor('p', items[0])
+        return CursorPage(items, cursor, next_cursor, previous_cursor)
+
+    def get_page(self, cursor=None):
+        try:
+            return self.page(cursor)
+        except InvalidCursor:
+            return self.page()
+
+
+def estimate_count(queryset):
+    """Число строк таблицы по статистике СУБД или None.
+
+    Годится только для запросов без фильтров: статистика знает размер
+    таблицы, а не выборки.
+    """
+    if queryset.query.where:
+        return None
+    table = queryset.model._meta.db_table
+    connection = connections[queryset.db]
+    if connection.vendor == 'sqlite':
+        # sqlite_stat1 появляется после ANALYZE; первое число — строки.
+        sql = 'SELECT stat FROM sqlite_stat1 WHERE tbl = %s LIMIT 1'
+    elif connection.vendor == 'postgresql':
+        sql = 'SELECT reltuples::bigint FROM pg_class WHERE relname = %s'
+    else:
+        return None
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [table])
+            row = cursor.fetchone()
+    except Exception:
+        return None
+    if row is None:
+        return None
+    return int(str(row[0]).split()[0])
+
+
+def count_key(name):
+    return 'feed_count:%s' % name
+
+
+def forget_count(*names):
+    cache.delete_many([count_key(name) for name in names])
+
+
+def feed_count(queryset, name):
+    """Число записей ленты из общего кэша.
+
+    Больше APPROXIMATE_COUNT_AFTER строк не пересчитываются: берётся
+    оценка СУБД, для ссылок на страницы её точности хватает. Считается
+    всегда на default: отстающая реплика сразу после forget_count
+    закэшировала бы заниженное число и отрезала последнюю страницу.
+    """
+    queryset = queryset.using(PRIMARY)
+
+    def compute():
+        estimate = estimate_count(queryset)
+        if estimate is not None and estimate >= APPROXIMATE_COUNT_AFTER:
+            return estimate
+        return queryset.count()
+    return caching.get_or_compute(count_key(name), compute, COUNT_TIMEOUT)
+
+
+def page_window(page, on_each_side=PAGES_ON_EACH_SIDE,
+                on_ends=PAGES_ON_ENDS):
+    """Номера страниц для ссылок; None на месте пропуска."""
+    last = page.paginator.num_pages
+    shown = set(range(1, min(on_ends, last) + 1))
+    shown |= set(range(max(last - on_ends + 1, 1), last + 1))
+    shown |= set(range(max(page.number - on_each_side, 1),
+                       min(page.number + on_each_side, last) + 1))
+    window, previous = [], 0
+    for number in sorted(shown):
+        if number - previous > 1:
+            window.append(None)
+        window.append(number)
+        previous = number
+    return window
+
+
+def paginate(request, object_list, per_page=POSTS_PER_PAGE, count=None):
+    """Возвращает пару (paginator, page) для ленты записей.
+
+    Запросы с ``?cursor=`` обслуживаются KeysetPaginator, остальные —
+    обычным Paginator, как и раньше. ``count`` — готовое число записей
+    или функция, возвращающая его; без него Paginator сделает COUNT(*).
+    """
+    object_list = object_list.order_by(*FEED_ORDERING)
+    cursor = request.GET.get('cursor')
+    if cursor:
+        paginator = KeysetPaginator(object_list, per_page)
+        return paginator, paginator.get_page(cursor)
+    paginator = Paginator(object_list, per_page)
+    if count is not None:
+        # Paginator.count — cached_property: заранее записанное значение
+        # избавляет от COUNT(*) без подкласса Paginator.
+        paginator.__dict__['count'] = count() if callable(count) else count
+    page = paginator.get_page(request.GET.get('page'))
+    page.window = page_window(page)
+    if not page.object_list:
+        # Оценка числа записей бывает больше настоящего, и страницы за
+        # концом ленты пусты: ссылке «дальше» с них вести некуда.
+        page.has_next = lambda: False
+    elif page.number >= PAGE_NUMBER_LIMIT and page.has_next():
+        page.next_cursor = KeysetPaginator(
+            object_list, per_page).encode_cursor('n', page[-1])
+    return paginator, page
+
+
+def comment_page(post, params):
+    """Порция комментариев записи по курсору; возвращает (order, page).
+
+    ``?order=new`` выводит сначала новые, по умолчанию — старые.
+    """
+    order = params.get('order')
+    if order not in COMMENT_ORDERINGS:
+        order = 'old'
+    paginator = KeysetPaginator(post.comments.select_related('author'),
+                                COMMENTS_PER_PAGE, COMMENT_ORDERINGS[order])
+    return order, paginator.get_page(params.get('cursor'))
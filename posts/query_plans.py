@@ -0,0 +1,50 @@
+import re
+
+from django.contrib.auth import get_user_model
+
+from . import timeline
+from .models import Comment, Follow, Post, TimelineEntry
+from .pagination import FEED_ORDERING, POSTS_PER_PAGE
+
+User = get_user_model()
+
+FULL_SCAN = re.compile(r'\bSCAN (TABLE )?\w+\s*$')
+TEMP_SORT = 'USE TEMP B-TREE'
+
+
+def feed_queries(user_id=1, group_id=1, post_id=1):
+    """Запросы, которыми страницы posts/views.py читают базу."""
+    reader = User(pk=user_id)
+    feed = Post.objects.for_feed().order_by(*FEED_ORDERING)
+    return {
+        'index': feed[:POSTS_PER_PAGE],
+        'group_posts': feed.filter(group_id=group_id)[:POSTS_PER_PAGE],
+        'profile': feed.filter(author_id=user_id)[:POSTS_PER_PAGE],
+        'follow_index': timeline.feed_for(reader).order_by(
+            *FEED_ORDERING)[:POSTS_PER_PAGE],
+        'post_comments': Comment.objects.filter(post_id=post_id),
+        'follow_exists': Follow.objects.filter(user_id=user_id,
+                                               author_id=user_id),
+        'followers': Follow.objects.filter(
+            author_id=user_id).values('user_id'),
+        'timeline': TimelineEntry.objects.filter(
+            user_id=user_id).order_by('-pub_date'),
+    }
+
+
+def is_bad_plan(plan):
+    """Полный просмотр таблицы вместе с сортировкой во временном B-дереве."""
+    lines = plan.splitlines()
+    return (any(FULL_SCAN.search(line) for line in lines)
+            and any(TEMP_SORT in line for line in lines))
+
+
+def check_plans(**ids):
+    """Возвращает словарь {имя запроса: (план, плохой ли план)}."""
+    return {
+        name: (plan, is_bad_plan(plan))
+        for name, plan in (
+            (name, queryset.explain())
+            for name, queryset in feed_queries(**ids).items()
+        )
+    }
@@ -0,0 +1,211 @@
+"""Полнотекстовый поиск по записям и комментариям к ним.
+
+Документ записи — её текст и тексты комментариев, прогнанные через
+стеммер, поэтому «кошками» находит «кошки». Backend выбирается
+настройкой SEARCH_BACKEND.
+"""
+from django.conf import settings
+from django.db import connection
+from django.db.models import Q
+from django.utils.module_loading import import_string
+
+from .models import Comment, Post
+from .pagination import FEED_ORDERING
+from .stemmer import WORD, stem, stem_text
+
+BATCH_SIZE = 300
+
+
+def get_backend():
+    return import_string(settings.SEARCH_BACKEND)()
+
+
+def update(*post_ids):
+    """Переиндексирует записи: вызывается из сигналов и пакетной записи."""
+    get_backend().update(post_ids)
+
+
+def remove(*post_ids):
+    get_backend().remove(post_ids)
+
+
+def comment_added(comment):
+    """Дописывает в документ записи только новый комментарий."""
+    get_backend().add_comment(comment.post_id, stem_text(comment.text))
+
+
+def comment_removed(comment):
+    get_backend().remove_comment(comment.post_id, stem_text(comment.text))
+
+
+def search(query):
+    return get_backend().search(query)
+
+
+def terms(query):
+    return [stem(word) for word in WORD.findall(query)]
+
+
+def _documents(post_ids):
+    comments = {}
+    for post_id, text in Comment.objects.filter(
+            post_id__in=post_ids).values_list('post_id', 'text'):
+        comments.setdefault(post_id, []).append(text)
+    return [
+        (pk, stem_text(text), stem_text(' '.join(comments.get(pk, ()))))
+        for pk, text in Post.objects.filter(
+            pk__in=post_ids).values_list('pk', 'text')
+    ]
+
+
+class FtsResults:
+    """Найденные записи по убыванию релевантности, для Paginator."""
+
+    def __init__(self, backend, match):
+        self.backend = backend
+        self.match = match
+
+    def count(self):
+        return self.backend.count(self.match)
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, key):
+        if not isinstance(key, slice):
+            return self[key:key + 1][0]
+        ids = self.backend.ranked_ids(self.match, key.start or 0,
+                                      key.stop - (key.start or 0))
+        posts = Post.objects.for_feed().in_bulk(ids)
+        return [posts[pk] for pk in ids if pk in posts]
+
+
+class FtsBackend:
+    """Инвертированный индекс на SQLite FTS5.
+
+    Таблица создаётся миграцией 0014; rowid строки индекса — pk записи.
+    Комментарии весят меньше текста самой записи.
+    """
+
+    table = 'posts_search'
+    weights = (1.0, 0.3)
+
+    def _execute(self, sql, params=()):
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            return cursor.fetchall()
+
+    def remove(self, post_ids):
+        for start in range(0, len(post_ids), BATCH_SIZE):
+            batch = post_ids[start:start + BATCH_SIZE]
+            self._execute(
+                f'DELETE FROM {self.table} WHERE rowid IN '
+                f'({", ".join(["%s"] * len(batch))})', batch)
+
+    def update(self, post_ids):
+        documents = _documents(post_ids)
+        self.remove(post_ids)
+        # Одна многострочная вставка вместо executemany: обёртки курсора
+        # (debug toolbar) не умеют показывать executemany.
+        for start in range(0, len(documents), BATCH_SIZE):
+            batch = documents[start:start + BATCH_SIZE]
+            self._execute(
+                f'INSERT INTO {self.table} (rowid, text, comments) VALUES '
+                + ', '.join(['(%s, %s, %s)'] * len(batch)),
+                [value for document in batch for value in document])
+
+    def _comments(self, post_id):
+        rows = self._execute(
+            f'SELECT comments FROM {self.table} WHERE rowid = %s',
+            [post_id])
+        return rows[0][0] if rows else None
+
+    def add_comment(self, post_id, stems):
+        # FTS5 перестраивает токены одной строки, комментарии записи
+        # заново не читаются и не стеммятся.
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'UPDATE {self.table} SET comments = comments || %s '
+                f'WHERE rowid = %s', [' ' + stems, post_id])
+            updated = cursor.rowcount
+        if not updated:
+            self.update([post_id])
+
+    def remove_comment(self, post_id, stems):
+        document = self._comments(post_id)
+        if document is None:
+            return
+        words, removed = document.split(), stems.split()
+        for start in range(len(words) - len(removed) + 1):
+            if words[start:start + len(removed)] == removed:
+                del words[start:start + len(removed)]
+                break
+        self._execute(
+            f'UPDATE {self.table} SET comments = %s WHERE rowid = %s',
+            [' '.join(words), post_id])
+
+    def clear(self):
+        self._execute(f'DELETE FROM {self.table}')
+
+    def rebuild(self):
+        self.clear()
+        total, last = 0, 0
+        while True:
+            ids = list(Post.objects.filter(pk__gt=last).order_by(
+                'pk').values_list('pk', flat=True)[:BATCH_SIZE])
+            if not ids:
+                return total
+            self.update(ids)
+            total += len(ids)
+            last = ids[-1]
+
+    def search(self, query):
+        # Каждое слово — отдельная фраза в кавычках с поиском по префиксу,
+        # так что операторы FTS5 из запроса пользователя не работают.
+        match = ' '.join('"%s"*' % term.replace('"', '""')
+                         for term in terms(query))
+        return FtsResults(self, match) if match else []
+
+    def count(self, match):
+        return self._execute(
+            f'SELECT count(*) FROM {self.table} WHERE {self.table} MATCH %s',
+            [match])[0][0]
+
+    def ranked_ids(self, match, offset, limit):
+        weights = ', '.join(str(weight) for weight in self.weights)
+        rows = self._execute(
+            f'SELECT rowid FROM {self.table} WHERE {self.table} MATCH %s '
+            f'ORDER BY bm25({self.table}, {weights}), rowid DESC '
+            f'LIMIT %s OFFSET %s', [match, limit, offset])
+        return [row[0] for row in rows]
+
+
+class ScanBackend:
+    """Запасной вариант без индекса для других СУБД: LIKE по основам."""
+
+    def update(self, post_ids):
+        pass
+
+    def remove(self, post_ids):
+        pass
+
+    def add_comment(self, post_id, stems):
+        pass
+
+    def remove_comment(self, post_id, stems):
+        pass
+
+    def rebuild(self):
+        return 0
+
+    def search(self, query):
+        words = terms(query)
+        if not words:
+            return []
+        condition = Q()
+        for word in words:
+            condition &= (Q(text__icontains=word)
+                          | Q(comments__text__icontains=word))
+        return Post.objects.for_feed().filter(
+            pk__in=Post.objects.filter(condition).values('pk')
+        ).order_by(*FEED_ORDERING)
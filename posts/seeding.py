@@ -0,0 +1,126 @@
+"""Генератор больших наборов данных для замеров производительности.
+
+Всё пишется через posts/bulk.py, поэтому счётчики, ленты подписок и
+поисковый индекс получаются такими же, как при обычной работе сайта.
+Популярность авторов распределена по степенному закону: немногие
+авторы пишут большую часть записей и собирают большинство подписчиков.
+"""
+import io
+import random
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image
+
+from . import bulk, thumbnails
+from .models import Comment, Group, Post, UserCounter
+
+User = get_user_model()
+
+PREFIX = 'bench-'
+IMAGE_VARIANTS = 8
+WORDS = ('кошка', 'собака', 'город', 'утро', 'вечер', 'море', 'поезд',
+         'книга', 'музыка', 'погода', 'работа', 'дорога', 'новость',
+         'фотография', 'праздник', 'весна', 'зима', 'лето', 'осень', 'друг')
+
+
+def popularity(count, alpha):
+    """Веса 1 / rank^alpha для count участников."""
+    return [1 / (rank + 1) ** alpha for rank in range(count)]
+
+
+def sentence(rng, length=12):
+    return ' '.join(rng.choice(WORDS) for _ in range(length)).capitalize()
+
+
+def seed_exists():
+    return User.objects.filter(username__startswith=PREFIX).exists()
+
+
+def clear():
+    Group.objects.filter(slug__startswith=PREFIX).delete()
+    User.objects.filter(username__startswith=PREFIX).delete()
+    for i in range(IMAGE_VARIANTS):
+        default_storage.delete(f'posts/{PREFIX}{i}.jpg')
+    cache.clear()
+
+
+def _images(rng):
+    """Несколько одинаковых по размеру картинок разного цвета."""
+    images = []
+    for i in range(IMAGE_VARIANTS):
+        color = tuple(rng.randrange(256) for _ in range(3))
+        buffer = io.BytesIO()
+        Image.new('RGB', (960, 339), color).save(buffer, 'JPEG')
+        content = ContentFile(buffer.getvalue())
+        name = default_storage.save(f'posts/{PREFIX}{i}.jpg', content)
+        images.append((name, thumbnails.content_hash(content)))
+    return images
+
+
+def _pick(rng, population, weights, count):
+    """Не больше count разных элементов, выбранных с весами."""
+    return list({id(item): item for item in rng.choices(
+        population, weights, k=count)}.values())
+
+
+def seed(users, groups, posts, comments, follows, image_share=0.2,
+         alpha=1.2, rng=None):
+    """Создаёт пользователей, группы, записи, подписки и комментарии.
+
+    follows — среднее число подписок на пользователя. Возвращает число
+    созданных объектов каждого вида.
+    """
+    rng = rng or random.Random()
+    User.objects.bulk_create([
+        User(username=f'{PREFIX}{i}', first_name='Автор', last_name=str(i))
+        for i in range(users)
+    ])
+    people = list(User.objects.filter(
+        username__startswith=PREFIX).order_by('pk'))
+    UserCounter.objects.bulk_create([
+        UserCounter(user=user) for user in people])
+    Group.objects.bulk_create([
+        Group(title=f'Сообщество {i}', slug=f'{PREFIX}{i}',
+              description=sentence(rng))
+        for i in range(groups)
+    ])
+    communities = list(Group.objects.filter(slug__startswith=PREFIX))
+    # Примерно каждая вторая запись — вне сообществ.
+    targets = communities + [None] * len(communities) or [None]
+    weights = popularity(len(people), alpha)
+    images = _images(rng) if image_share and posts else []
+
+    by_author = {}
+    for author in rng.choices(people, weights, k=posts):
+        image, image_hash = ('', '')
+        if images and rng.random() < image_share:
+            image, image_hash = rng.choice(images)
+        by_author.setdefault(author, []).append(Post(
+            text=sentence(rng),
+            group=rng.choice(targets),
+            image=image, image_hash=image_hash))
+    created = [post for author, batch in by_author.items()
+               for post in bulk.create_posts(author, batch)]
+
+    follow_total = 0
+    for user in people:
+        count = min(int(rng.expovariate(1 / follows)) if follows else 0,
+                    len(people) - 1)
+        authors = _pick(rng, people, weights, count)
+        follow_total += len(bulk.follow_authors(user, authors))
+
+    by_commenter = {}
+    if created:
+        for _ in range(comments):
+            by_commenter.setdefault(rng.choice(people), []).append(Comment(
+                post=rng.choice(created), text=sentence(rng, 6)))
+    comment_total = sum(len(bulk.create_comments(author, batch))
+                        for author, batch in by_commenter.items())
+
+    cache.clear()
+    return {'users': len(people), 'groups': len(communities),
+            'posts': len(created), 'follows': follow_total,
+            'comments': comment_total}
@@ -0,0 +1,84 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from . import (authors, cards, counters, search, storage, thumbnails,
+               timeline)
+from .models import Comment, Follow, Post
+from .pagination import forget_count
+
+
+@receiver(post_save, sender=Post)
+def post_created(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        counters.bump_user(instance.author_id, 'posts_count', 1)
+        timeline.fan_out(instance)
+        forget_count('index')
+    if not raw:
+        # Смену сообщества при правке старое сообщество узнает по TTL.
+        forget_count('group:%s' % instance.group_id)
+        search.update(instance.pk)
+
+
+@receiver(pre_save, sender=Post)
+def post_image_hashed(sender, instance, raw=False, **kwargs):
+    image = instance.image
+    if raw:
+        return
+    if not image:
+        instance.image_hash = ''
+    elif not image._committed:
+        # Хранилище уже хэширует файл ради имени: сохраняем его здесь, а
+        # не в FileField.pre_save, и берём хэш из имени, не читая снова.
+        image.save(image.name, image.file, save=False)
+        instance.image_hash = storage.name_hash(image.name)
+
+
+@receiver(post_save, sender=Post)
+def post_image_saved(sender, instance, raw=False, **kwargs):
+    image, image_hash = instance.image, instance.image_hash
+    if image and image_hash and not raw:
+        transaction.on_commit(
+            lambda: thumbnails.schedule(image.name, image_hash))
+
+
+@receiver(post_delete, sender=Post)
+def post_deleted(sender, instance, **kwargs):
+    counters.bump_user(instance.author_id, 'posts_count', -1)
+    cards.forget(instance)
+    forget_count('index', 'group:%s' % instance.group_id)
+    search.remove(instance.pk)
+
+
+@receiver(post_save, sender=Comment)
+def comment_created(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        counters.bump_comments(instance.post_id, 1)
+        cards.touch(instance.post_id)
+        search.comment_added(instance)
+
+
+@receiver(post_delete, sender=Comment)
+def comment_deleted(sender, instance, **kwargs):
+    counters.bump_comments(instance.post_id, -1)
+    cards.touch(instance.post_id)
+    search.comment_removed(instance)
+
+
+@receiver(post_save, sender=Follow)
+def follow_created(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        counters.bump_user(instance.author_id, 'followers_count', 1)
+        counters.bump_user(instance.user_id, 'following_count', 1)
+        timeline.pull_popular(instance.author_id)
+        timeline.backfill(instance.user_id, instance.author_id)
+        authors.forget(instance)
+
+
+@receiver(post_delete, sender=Follow)
+def follow_deleted(sender, instance, **kwargs):
+    counters.bump_user(instance.author_id, 'followers_count', -1)
+    counters.bump_user(instance.user_id, 'following_count', -1)
+    timeline.prune(instance.user_id, instance.author_id)
+    timeline.push_unpopular(instance.author_id)
+    authors.forget(instance)
@@ -0,0 +1,102 @@
+"""Стеммер Snowball для русского языка.
+
+Повторяет алгоритм https://snowballstem.org/algorithms/russian/stemmer.html;
+слова не на кириллице возвращаются в нижнем регистре без изменений.
+"""
+import re
+
+VOWELS = 'аеиоуыэюя'
+WORD = re.compile(r'\w+')
+
+PERFECTIVE_GERUND = (('в', 'вши', 'вшись'),
+                     ('ив', 'ивши', 'ившись', 'ыв', 'ывши', 'ывшись'))
+REFLEXIVE = ((), ('ся', 'сь'))
+ADJECTIVE = ((), ('ее', 'ие', 'ые', 'ое', 'ими', 'ыми', 'ей', 'ий', 'ый',
+                  'ой', 'ем', 'им', 'ым', 'ом', 'его', 'ого', 'ему', 'ому',
+                  'их', 'ых', 'ую', 'юю', 'ая', 'яя', 'ою', 'ею'))
+PARTICIPLE = (('ем', 'нн', 'вш', 'ющ', 'щ'), ('ивш', 'ывш', 'ующ'))
+VERB = (('ла', 'на', 'ете', 'йте', 'ли', 'й', 'л', 'ем', 'н', 'ло', 'но',
+         'ет', 'ют', 'ны', 'ть', 'ешь', 'нно'),
+        ('ила', 'ыла', 'ена', 'ейте', 'уйте', 'ите', 'или', 'ыли', 'ей',
+         'уй', 'ил', 'ыл', 'им', 'ым', 'ен', 'ило', 'ыло', 'ено', 'ят',
+         'ует', 'уют', 'ит', 'ыт', 'ены', 'ить', 'ыть', 'ишь', 'ую', 'ю'))
+NOUN = ((), ('а', 'ев', 'ов', 'ие', 'ье', 'е', 'иями', 'ями', 'ами', 'еи',
+             'ии', 'и', 'ией', 'ей', 'ой', 'ий', 'й', 'иям', 'ям', 'ием',
+             'ем', 'ам', 'ом', 'о', 'у', 'ах', 'иях', 'ях', 'ы', 'ь', 'ию',
+             'ью', 'ю', 'ия', 'ья', 'я'))
+SUPERLATIVE = ((), ('ейш', 'ейше'))
+DERIVATIONAL = ((), ('ост', 'ость'))
+
+
+def _after_vowel_pair(word, start):
+    """Начало области после первой пары «гласная, согласная»."""
+    for i in range(start + 1, len(word)):
+        if word[i] not in VOWELS and word[i - 1] in VOWELS:
+            return i + 1
+    return len(word)
+
+
+def _strip(word, limit, groups):
+    """Снимает самое длинное окончание группы, лежащее после limit.
+
+    Окончания первой группы снимаются, только если перед ними «а» или
+    «я», тоже лежащие после limit.
+    """
+    preceded, plain = groups
+    for ending in sorted(preceded + plain, key=len, reverse=True):
+        start = len(word) - len(ending)
+        if start < limit or not word.endswith(ending):
+            continue
+        if ending in plain:
+            return word[:start]
+        if start - 1 >= limit and word[start - 1] in 'ая':
+            return word[:start]
+        return None
+    return None
+
+
+def _inflection(word, rv):
+    """Шаг 1: деепричастие или возвратная частица, затем окончание."""
+    stripped = _strip(word, rv, PERFECTIVE_GERUND)
+    if stripped is not None:
+        return stripped
+    word = _strip(word, rv, REFLEXIVE) or word
+    adjective = _strip(word, rv, ADJECTIVE)
+    if adjective is not None:
+        return _strip(adjective, rv, PARTICIPLE) or adjective
+    for groups in (VERB, NOUN):
+        stripped = _strip(word, rv, groups)
+        if stripped is not None:
+            return stripped
+    return word
+
+
+def _tidy(word, rv):
+    """Шаг 4: «нн» → «н», превосходная степень, мягкий знак."""
+    if word.endswith('нн') and len(word) - 2 >= rv:
+        return word[:-1]
+    superlative = _strip(word, rv, SUPERLATIVE)
+    if superlative is not None:
+        if superlative.endswith('нн') and len(superlative) - 2 >= rv:
+            return superlative[:-1]
+        return superlative
+    if word.endswith('ь') and len(word) - 1 >= rv:
+        return word[:-1]
+    return word
+
+
+def stem(word):
+    word = word.lower().replace('ё', 'е')
+    if not re.fullmatch('[а-я]+', word):
+        return word
+    rv = next((i + 1 for i, c in enumerate(word) if c in VOWELS), len(word))
+    r2 = _after_vowel_pair(word, _after_vowel_pair(word, 0))
+    word = _inflection(word, rv)
+    if word.endswith('и') and len(word) - 1 >= rv:
+        word = word[:-1]
+    word = _strip(word, r2, DERIVATIONAL) or word
+    return _tidy(word, rv)
+
+
+def stem_text(text):
+    return ' '.join(stem(word) for word in WORD.findall(text))
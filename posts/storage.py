@@ -0,0 +1,85 @@
+"""Хранилище картинок записей, адресуемое содержимым.
+
+Файл называется по SHA-256 своего содержимого: posts/ab/ab12….jpg.
+Повторная загрузка той же картинки получает то же имя, и второй файл
+не пишется; миниатюры в thumbnails/<хэш>/ тоже общие. На один файл
+может ссылаться несколько записей, поэтому файлы не удаляются вместе с
+записью: неиспользуемые собирает команда collect_media.
+"""
+import os
+import posixpath
+import time
+
+from django.core.files.base import File
+from django.core.files.storage import FileSystemStorage, default_storage
+from django.utils.deconstruct import deconstructible
+
+from . import thumbnails
+
+# Файлы и миниатюры моложе этого не удаляются: запись, которая на них
+# сошлётся, может быть ещё не сохранена.
+GRACE_SECONDS = 60 * 60
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    def save(self, name, content, max_length=None):
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+        digest = thumbnails.content_hash(content)
+        directory, filename = posixpath.split(name)
+        extension = os.path.splitext(filename)[1].lower()
+        name = posixpath.join(directory, digest[:2], digest + extension)
+        if self.exists(name):
+            # Свежее время изменения не даёт collect_media удалить файл,
+            # пока запись со ссылкой на него сохраняется.
+            os.utime(self.path(name))
+            return name
+        return super().save(name, content, max_length)
+
+
+content_storage = ContentAddressedStorage()
+
+
+def name_hash(name):
+    """Хэш содержимого из имени, которое дал ContentAddressedStorage."""
+    return os.path.splitext(posixpath.basename(name))[0]
+
+
+def walk(storage, path):
+    """Имена всех файлов под path, каталог за каталогом."""
+    directories, files = storage.listdir(path)
+    for filename in files:
+        yield posixpath.join(path, filename)
+    for directory in directories:
+        yield from walk(storage, posixpath.join(path, directory))
+
+
+def _is_old(storage, name, now, grace):
+    return storage.get_modified_time(name).timestamp() <= now - grace
+
+
+def orphans(names, hashes, grace=GRACE_SECONDS):
+    """(хранилище, имя, байты) файлов, не нужных ни одной записи.
+
+    names — имена Post.image, hashes — их Post.image_hash. Картинки
+    ищутся в posts/ хранилища content_storage, миниатюры — в каталогах
+    thumbnails/<хэш>/; каталог миниатюр удаляется только целиком.
+    """
+    now = time.time()
+    if content_storage.exists('posts'):
+        for name in walk(content_storage, 'posts'):
+            if name not in names and _is_old(content_storage, name, now,
+                                             grace):
+                yield content_storage, name, content_storage.size(name)
+    if not default_storage.exists('thumbnails'):
+        return
+    for image_hash in default_storage.listdir('thumbnails')[0]:
+        if image_hash in hashes:
+            continue
+        variants = list(walk(default_storage,
+                             posixpath.join('thumbnails', image_hash)))
+        if all(_is_old(default_storage, name, now, grace)
+               for name in variants):
+            for name in variants:
+                yield default_storage, name, default_storage.size(name)
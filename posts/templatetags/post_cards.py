@@ -0,0 +1,60 @@
+from django import template
+from django.core.cache.utils import make_template_fragment_key
+
+from posts import caching, cards, thumbnails
+
+register = template.Library()
+
+
+def _posts(page):
+    # Обходим object_list, а не сам Page: Page при обходе превращает
+    # QuerySet в список.
+    return list(getattr(page, 'object_list', page))
+
+
+@register.simple_tag(takes_context=True)
+def post_cards(context, page):
+    return cards.render_cards(_posts(page), context)
+
+
+@register.simple_tag
+def feed_version(page):
+    return cards.feed_version(_posts(page))
+
+
+@register.simple_tag
+def post_picture(post):
+    return thumbnails.picture(post)
+
+
+class FeedCacheNode(template.Node):
+    def __init__(self, nodelist, timeout, fragment_name, vary_on):
+        self.nodelist = nodelist
+        self.timeout = timeout
+        self.fragment_name = fragment_name
+        self.vary_on = vary_on
+
+    def render(self, context):
+        timeout = int(self.timeout.resolve(context))
+        vary_on = [var.resolve(context) for var in self.vary_on]
+        key = make_template_fragment_key('feed.' + self.fragment_name,
+                                         vary_on)
+        return caching.get_or_compute(
+            key, lambda: self.nodelist.render(context), timeout)
+
+
+@register.tag
+def feed_cache(parser, token):
+    """Как {% cache %}, но с защитой от одновременного пересчёта.
+
+    {% feed_cache [timeout] [fragment_name] [var1] [var2] .. %}
+    """
+    nodelist = parser.parse(('endfeed_cache',))
+    parser.delete_first_token()
+    tokens = token.split_contents()
+    if len(tokens) < 3:
+        raise template.TemplateSyntaxError(
+            '%r tag requires at least 2 arguments.' % tokens[0])
+    return FeedCacheNode(nodelist, parser.compile_filter(tokens[1]),
+                         tokens[2],
+                         [parser.compile_filter(t) for t in tokens[3:]])
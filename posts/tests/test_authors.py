@@ -0,0 +1,59 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.http import Http404
+from django.test import TestCase, override_settings
+
+from posts.authors import author_card
+from posts.counters import get_user_counter
+from posts.models import Follow, Post
+
+User = get_user_model()
+
+
+class AuthorCardTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create(username='author',
+                                         first_name='Лев',
+                                         last_name='Толстой')
+        cls.reader = User.objects.create(username='reader')
+        Post.objects.create(text='Запись', author=cls.author)
+        Follow.objects.create(user=cls.reader, author=cls.author)
+        get_user_counter(cls.author)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_card_in_one_query(self):
+        """Карточка автора собирается одним запросом."""
+        with self.assertNumQueries(1):
+            card = author_card('author', AuthorCardTests.reader)
+        self.assertEqual(card['user_name'], AuthorCardTests.author)
+        self.assertEqual(card['user_name'].get_full_name(), 'Лев Толстой')
+        self.assertEqual(card['count'], 1)
+        self.assertEqual(card['counter'].followers_count, 1)
+        self.assertTrue(card['following'])
+
+    def test_anonymous_viewer(self):
+        """Для анонима подписка всегда ложна."""
+        card = author_card('author', AnonymousUser())
+        self.assertFalse(card['following'])
+        self.assertEqual(card['counter'].following_count, 0)
+
+    def test_unknown_author(self):
+        """Несуществующий автор даёт 404."""
+        with self.assertRaises(Http404):
+            author_card('nobody', AuthorCardTests.reader)
+
+    @override_settings(AUTHOR_CARD_TIMEOUT=60)
+    def test_cached_per_viewer(self):
+        """Карточка кэшируется и сбрасывается при подписке читателя."""
+        author_card('author', AuthorCardTests.reader)
+        with self.assertNumQueries(0):
+            author_card('author', AuthorCardTests.reader)
+        Follow.objects.filter(user=AuthorCardTests.reader).delete()
+        card = author_card('author', AuthorCardTests.reader)
+        self.assertFalse(card['following'])
+        self.assertEqual(card['counter'].followers_count, 0)
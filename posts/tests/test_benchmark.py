@@ -0,0 +1,91 @@
+import json
+import random
+import shutil
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db.models import Count
+from django.test import TestCase, override_settings
+
+from posts import benchmark, seeding
+from posts.models import Comment, Follow, Post, UserCounter
+
+MEDIA_ROOT = tempfile.mkdtemp(dir=tempfile.gettempdir())
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class BenchmarkTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.totals = seeding.seed(users=30, groups=3, posts=200,
+                                  comments=100, follows=5, image_share=0.5,
+                                  rng=random.Random(1))
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def test_seed_is_consistent(self):
+        """Сгенерированные данные согласованы со счётчиками."""
+        self.assertEqual(Post.objects.count(), 200)
+        self.assertEqual(Comment.objects.count(), 100)
+        self.assertEqual(Follow.objects.count(),
+                         BenchmarkTests.totals['follows'])
+        for counter in UserCounter.objects.select_related('user'):
+            self.assertEqual(counter.posts_count,
+                             counter.user.posts.count())
+            self.assertEqual(counter.followers_count,
+                             counter.user.following.count())
+        self.assertTrue(Post.objects.exclude(image='').exclude(
+            image_hash='').exists())
+
+    def test_popularity_is_skewed(self):
+        """Первые авторы пишут большую часть записей."""
+        top = Post.objects.values('author').annotate(
+            total=Count('pk')).order_by('-total')[:3]
+        self.assertGreater(sum(row['total'] for row in top), 100)
+
+    def test_seed_twice_requires_clear(self):
+        """Повторное заполнение без --clear запрещено."""
+        with self.assertRaises(CommandError):
+            call_command('seed_data', users=5, stdout=StringIO())
+
+    def test_writes_are_rolled_back(self):
+        """Замер записывающих сценариев не меняет данные."""
+        results = benchmark.run(repeat=2, warmup=1)
+        self.assertEqual(set(results), {
+            'index', 'group_posts', 'profile', 'post_view', 'follow_index',
+            'new_post', 'add_comment'})
+        self.assertEqual(Post.objects.count(), 200)
+        self.assertEqual(Comment.objects.count(), 100)
+        for metrics in results.values():
+            self.assertGreater(metrics['queries'], 0)
+            self.assertLessEqual(metrics['p50_ms'], metrics['p95_ms'])
+
+    def test_baseline_regression(self):
+        """Рост числа запросов относительно базового замера — ошибка."""
+        with tempfile.NamedTemporaryFile('w+', suffix='.json') as baseline:
+            call_command('benchmark', 'index', repeat=2, warmup=1,
+                         save=baseline.name, stdout=StringIO(),
+                         stderr=StringIO())
+            data = json.load(baseline)
+            data['scenarios']['index']['queries'] -= 1
+            baseline.seek(0)
+            baseline.truncate()
+            json.dump(data, baseline)
+            baseline.flush()
+            with self.assertRaisesMessage(CommandError, 'Регрессий: 1'):
+                call_command('benchmark', 'index', repeat=2, warmup=1,
+                             baseline=baseline.name, threshold=100,
+                             stdout=StringIO(), stderr=StringIO())
+
+    def test_regressions_tolerance(self):
+        """Время и память сравниваются с допуском, запросы — точно."""
+        before = {'index': {'p95_ms': 10, 'queries': 3, 'memory_kib': 100}}
+        after = {'index': {'p95_ms': 12, 'queries': 3, 'memory_kib': 130}}
+        self.assertEqual(benchmark.regressions(after, before, 0.25),
+                         [('index', 'memory_kib', 100, 130)])
@@ -0,0 +1,135 @@
+import os
+import shutil
+import tempfile
+import threading
+import time
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.cache.backends.filebased import FileBasedCache
+from django.test import SimpleTestCase, override_settings
+
+from posts import caching
+
+LOCMEM = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'caching-tests',
+    }
+}
+
+CACHE_DIR = tempfile.mkdtemp(dir=tempfile.gettempdir())
+FILEBASED = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': CACHE_DIR,
+    }
+}
+
+
+def compute_concurrently(compute, workers=8):
+    results = []
+
+    def worker():
+        results.append(caching.get_or_compute('feed', compute, 60))
+
+    threads = [threading.Thread(target=worker) for _ in range(workers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+@override_settings(CACHES=LOCMEM)
+class GetOrComputeTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.calls = 0
+
+    def slow_compute(self):
+        self.calls += 1
+        time.sleep(0.2)
+        return 'значение'
+
+    def test_concurrent_misses_compute_once(self):
+        """Одновременные промахи пересчитывают значение один раз."""
+        results = compute_concurrently(self.slow_compute)
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(results, ['значение'] * 8)
+
+    def test_stale_value_served_while_locked(self):
+        """Пока другой запрос пересчитывает, отдаётся старое значение."""
+        cache.set('feed', ('старое', 1.0, time.time() - 1), 60)
+        cache.add('feed:lock', 1)
+        self.assertEqual(
+            caching.get_or_compute('feed', self.slow_compute, 60), 'старое')
+        self.assertEqual(self.calls, 0)
+
+    def test_fresh_value_not_recomputed(self):
+        """Свежее значение берётся из кэша."""
+        cache.set('feed', ('свежее', 0.0, time.time() + 60), 60)
+        self.assertEqual(
+            caching.get_or_compute('feed', self.slow_compute, 60), 'свежее')
+        self.assertEqual(self.calls, 0)
+
+    def test_early_expiration_near_deadline(self):
+        """Значение с долгим пересчётом обновляется до истечения срока."""
+        cache.set('feed', ('старое', 1000.0, time.time() + 1), 60)
+        self.assertEqual(
+            caching.get_or_compute('feed', self.slow_compute, 60),
+            'значение')
+        self.assertEqual(self.calls, 1)
+
+
+@override_settings(CACHES=FILEBASED)
+class FileBasedLockTests(SimpleTestCase):
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(CACHE_DIR, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        cache.clear()
+        self.calls = 0
+        # clear() удаляет только записи, файл блокировки остаётся.
+        self.addCleanup(caching._release, 'feed:lock')
+
+    def slow_compute(self):
+        self.calls += 1
+        time.sleep(0.2)
+        return 'значение'
+
+    def lock_path(self):
+        return caching._lock_path(cache, 'feed:lock')
+
+    def test_concurrent_misses_compute_once(self):
+        """Файловый кэш тоже пересчитывает значение один раз."""
+        results = compute_concurrently(self.slow_compute, workers=16)
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(results, ['значение'] * 16)
+        self.assertFalse(os.path.exists(self.lock_path()))
+
+    def test_lock_does_not_rely_on_add(self):
+        """Второй воркер не берёт блокировку, даже если add его пустил."""
+        # Так кэш видят два воркера, проверившие ключ до записи друг друга.
+        with mock.patch.object(FileBasedCache, 'has_key', return_value=False):
+            self.assertTrue(cache.add('feed:lock', 1))
+            self.assertTrue(cache.add('feed:lock', 1))
+            self.assertTrue(caching._acquire('feed:lock'))
+            self.assertFalse(caching._acquire('feed:lock'))
+
+    def test_held_lock_serves_stale_value(self):
+        """Пока файл блокировки свежий, пересчёта нет."""
+        cache.set('feed', ('старое', 1.0, time.time() - 1), 60)
+        self.assertTrue(caching._acquire('feed:lock'))
+        self.assertEqual(
+            caching.get_or_compute('feed', self.slow_compute, 60), 'старое')
+        self.assertEqual(self.calls, 0)
+
+    def test_abandoned_lock_taken_over(self):
+        """Блокировку старше LOCK_TIMEOUT забирает следующий запрос."""
+        self.assertTrue(caching._acquire('feed:lock'))
+        expired = time.time() - caching.LOCK_TIMEOUT - 1
+        os.utime(self.lock_path(), (expired, expired))
+        self.assertTrue(caching._acquire('feed:lock'))
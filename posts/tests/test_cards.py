@@ -0,0 +1,81 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.cards import card_key
+from posts.models import Group, Post
+
+User = get_user_model()
+
+
+class PostCardCacheTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create(username='author')
+        cls.reader = User.objects.create(username='reader')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-group',
+            description='Группа для теста'
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.post = Post.objects.create(text='Исходный текст',
+                                        author=PostCardCacheTests.author,
+                                        group=PostCardCacheTests.group)
+        self.author_client = Client()
+        self.author_client.force_login(PostCardCacheTests.author)
+        self.reader_client = Client()
+        self.reader_client.force_login(PostCardCacheTests.reader)
+
+    def test_cards_served_from_cache(self):
+        """Карточка записи берётся из кэша при повторном показе."""
+        url = reverse('posts:group', args=['test-group'])
+        self.reader_client.get(url)
+        key = card_key(self.post)
+        self.assertIn('Исходный текст', cache.get(key))
+        cache.set(key, 'карточка из кэша')
+        self.assertContains(self.reader_client.get(url), 'карточка из кэша')
+
+    def test_author_gets_own_card_variant(self):
+        """Автор видит карточку с кнопкой редактирования."""
+        url = reverse('posts:group', args=['test-group'])
+        edit_url = reverse('posts:post_edit',
+                           args=['author', self.post.pk])
+        self.assertNotContains(self.reader_client.get(url), edit_url)
+        self.assertContains(self.author_client.get(url), edit_url)
+
+    def test_index_fragment_varies_by_viewer(self):
+        """Главная, закэшированная автором, не отдаёт кнопку другим."""
+        url = reverse('posts:index')
+        edit_url = reverse('posts:post_edit',
+                           args=['author', self.post.pk])
+        self.assertContains(self.author_client.get(url), edit_url)
+        self.assertNotContains(self.reader_client.get(url), edit_url)
+        self.assertNotContains(Client().get(url), edit_url)
+
+    def test_edit_invalidates_card(self):
+        """Правка записи сразу видна в лентах."""
+        for url in (reverse('posts:index'),
+                    reverse('posts:group', args=['test-group'])):
+            self.reader_client.get(url)
+        self.author_client.post(
+            reverse('posts:post_edit', args=['author', self.post.pk]),
+            data={'text': 'Новый текст', 'group': PostCardCacheTests.group.pk})
+        for url in (reverse('posts:index'),
+                    reverse('posts:group', args=['test-group'])):
+            with self.subTest(url=url):
+                self.assertContains(self.reader_client.get(url),
+                                    'Новый текст')
+
+    def test_comment_invalidates_card(self):
+        """Новый комментарий сразу меняет счётчик на карточке."""
+        url = reverse('posts:index')
+        self.reader_client.get(url)
+        self.reader_client.post(
+            reverse('posts:add_comment', args=['author', self.post.pk]),
+            data={'text': 'Комментарий'})
+        self.assertContains(self.reader_client.get(url), 'Комментариев: 1')
@@ -0,0 +1,84 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db.models.query import QuerySet
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.models import Comment, Post
+from posts.pagination import COMMENTS_PER_PAGE
+
+User = get_user_model()
+
+
+class CommentPaginationTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create(username='author')
+        cls.post = Post.objects.create(text='Тестовый пост', author=cls.author)
+        readers = [User.objects.create(username=f'reader-{i}')
+                   for i in range(3)]
+        for i in range(COMMENTS_PER_PAGE * 2 + 5):
+            Comment.objects.create(post=cls.post, author=readers[i % 3],
+                                   text=f'Комментарий {i}')
+        cls.expected = list(cls.post.comments.order_by('created', 'id'))
+        cls.post_url = reverse('posts:post', args=['author', cls.post.pk])
+        cls.comments_url = reverse('posts:comments',
+                                   args=['author', cls.post.pk])
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+
+    def test_post_page_shows_first_comments(self):
+        """Страница записи выводит первую порцию комментариев."""
+        response = self.client.get(self.post_url)
+        page = response.context['comment_page']
+        self.assertEqual(list(page), self.expected[:COMMENTS_PER_PAGE])
+        self.assertIsInstance(response.context['comments'], QuerySet)
+        self.assertContains(response, 'Показать ещё')
+
+    def test_cursor_walk_returns_every_comment_once(self):
+        """Переход по «Показать ещё» выдаёт все комментарии по разу."""
+        response = self.client.get(self.post_url)
+        page = response.context['comment_page']
+        seen = list(page)
+        while page.has_next():
+            response = self.client.get(self.comments_url,
+                                       {'cursor': page.next_cursor})
+            page = response.context['comment_page']
+            seen.extend(page)
+        self.assertEqual(seen, self.expected)
+        self.assertNotContains(response, 'Показать ещё')
+
+    def test_newest_first_order(self):
+        """?order=new выводит сначала новые комментарии."""
+        response = self.client.get(self.post_url, {'order': 'new'})
+        page = response.context['comment_page']
+        self.assertEqual(list(page),
+                         self.expected[::-1][:COMMENTS_PER_PAGE])
+
+    def test_fragment_query_budget(self):
+        """Авторы комментариев не читаются отдельным запросом на каждого."""
+        with self.assertNumQueries(2):
+            self.client.get(self.comments_url)
+
+    def test_json_follows_next_link(self):
+        """JSON-ответ содержит ссылку на следующую порцию."""
+        url, seen = f'{self.comments_url}?format=json', []
+        while url:
+            data = self.client.get(url).json()
+            seen.extend(item['id'] for item in data['comments'])
+            url = data['next']
+        self.assertEqual(seen, [comment.pk for comment in self.expected])
+
+    def test_invalid_cursor_returns_first_page(self):
+        """Испорченный курсор даёт первую порцию."""
+        response = self.client.get(self.comments_url, {'cursor': 'мусор'})
+        self.assertEqual(list(response.context['comment_page']),
+                         self.expected[:COMMENTS_PER_PAGE])
+
+    def test_unknown_post_returns_404(self):
+        """Комментарии чужой или несуществующей записи — 404."""
+        url = reverse('posts:comments', args=['reader-0', self.post.pk])
+        self.assertEqual(self.client.get(url).status_code, 404)
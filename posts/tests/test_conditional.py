@@ -0,0 +1,116 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.counters import get_user_counter
+from posts.models import Comment, Follow, Post
+from posts.pagination import POSTS_PER_PAGE
+
+User = get_user_model()
+
+
+class ConditionalGetTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create(username='author')
+        cls.reader = User.objects.create(username='reader')
+        cls.post = Post.objects.create(text='Запись', author=cls.author)
+        get_user_counter(cls.author)
+
+    def setUp(self):
+        cache.clear()
+        self.guest = Client()
+        self.reader = Client()
+        self.reader.force_login(ConditionalGetTests.reader)
+
+    def revalidate(self, client, url):
+        etag = client.get(url)['ETag']
+        return client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+    def test_unchanged_pages_not_modified(self):
+        """Неизменная страница отдаётся ответом 304 без шаблона."""
+        post = ConditionalGetTests.post
+        urls = [
+            reverse('posts:index'),
+            reverse('posts:profile', args=['author']),
+            reverse('posts:post', args=['author', post.pk]),
+            reverse('posts:follow_index'),
+        ]
+        for url in urls:
+            with self.subTest(url=url):
+                response = self.revalidate(self.reader, url)
+                self.assertEqual(response.status_code, 304)
+                self.assertEqual(response.content, b'')
+                self.assertIsNone(response.context)
+
+    def test_new_comment_changes_etag(self):
+        """Новый комментарий меняет версию страницы записи."""
+        url = reverse('posts:post', args=['author',
+                                          ConditionalGetTests.post.pk])
+        etag = self.reader.get(url)['ETag']
+        Comment.objects.create(post=ConditionalGetTests.post,
+                               author=ConditionalGetTests.reader,
+                               text='Комментарий')
+        response = self.reader.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_follow_changes_etag(self):
+        """Подписка меняет версию страницы профиля."""
+        url = reverse('posts:profile', args=['author'])
+        etag = self.reader.get(url)['ETag']
+        Follow.objects.create(user=ConditionalGetTests.reader,
+                              author=ConditionalGetTests.author)
+        response = self.reader.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_if_modified_since_alone_not_trusted(self):
+        """Без ETag страница не считается неизменной по Last-Modified."""
+        url = reverse('posts:index')
+        older = Post.objects.create(text='Старая запись',
+                                    author=ConditionalGetTests.author)
+        Post.objects.filter(pk=ConditionalGetTests.post.pk).update(
+            updated=older.updated)
+        modified = self.guest.get(url)['Last-Modified']
+        # Самая свежая запись остаётся, Last-Modified не меняется.
+        Post.objects.filter(pk=older.pk).delete()
+        response = self.guest.get(url, HTTP_IF_MODIFIED_SINCE=modified)
+        self.assertEqual(response.status_code, 200)
+
+    def test_follow_index_etag_covers_total_and_follows(self):
+        """ETag ленты подписок меняется от удаления записи и подписки."""
+        url = reverse('posts:follow_index')
+        Follow.objects.create(user=ConditionalGetTests.reader,
+                              author=ConditionalGetTests.author)
+        for i in range(POSTS_PER_PAGE):
+            Post.objects.create(text=f'Запись {i}',
+                                author=ConditionalGetTests.author)
+        etag = self.reader.get(url)['ETag']
+        # Самая старая запись на второй странице, первая не меняется.
+        Post.objects.filter(pk=ConditionalGetTests.post.pk).delete()
+        response = self.reader.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        Follow.objects.create(user=ConditionalGetTests.reader,
+                              author=User.objects.create(username='quiet'))
+        response = self.reader.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 200)
+
+    def test_etag_differs_per_reader(self):
+        """Гость и читатель получают разные версии одной страницы."""
+        url = reverse('posts:index')
+        etag = self.reader.get(url)['ETag']
+        response = self.guest.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_cache_control(self):
+        """Гостевые страницы публичны, страницы читателя приватны."""
+        url = reverse('posts:index')
+        response = self.guest.get(url)
+        self.assertIn('public', response['Cache-Control'])
+        self.assertIn('max-age=20', response['Cache-Control'])
+        self.assertIn('Cookie', response['Vary'])
+        self.assertIn('Last-Modified', response)
+        response = self.reader.get(url)
+        self.assertIn('private', response['Cache-Control'])
+        self.assertIn('no-cache', response['Cache-Control'])
@@ -0,0 +1,92 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.counters import get_user_counter
+from posts.models import Comment, Follow, Post, UserCounter
+
+User = get_user_model()
+
+
+class CountersTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create(username='author')
+        cls.reader = User.objects.create(username='reader')
+        cls.post = Post.objects.create(text='Тестовый пост',
+                                       author=cls.author)
+
+    def setUp(self):
+        self.author_client = Client()
+        self.author_client.force_login(CountersTests.author)
+        self.reader_client = Client()
+        self.reader_client.force_login(CountersTests.reader)
+
+    def test_counter_initialized_from_tables(self):
+        """Счётчик без записи в базе считается по таблицам."""
+        counter = get_user_counter(CountersTests.author)
+        self.assertEqual(counter.posts_count, 1)
+        self.assertEqual(counter.followers_count, 0)
+
+    def test_new_post_increments_posts_count(self):
+        """Новая запись увеличивает счётчик записей автора."""
+        get_user_counter(CountersTests.author)
+        self.author_client.post(reverse('posts:new_post'),
+                                data={'text': 'Ещё одна запись'})
+        self.assertEqual(get_user_counter(CountersTests.author).posts_count,
+                         2)
+        Post.objects.filter(text='Ещё одна запись').delete()
+        self.assertEqual(get_user_counter(CountersTests.author).posts_count,
+                         1)
+
+    def test_add_comment_increments_comments_count(self):
+        """Комментарий увеличивает счётчик комментариев записи."""
+        post = CountersTests.post
+        self.reader_client.post(
+            reverse('posts:add_comment', args=['author', post.pk]),
+            data={'text': 'Комментарий'})
+        post.refresh_from_db()
+        self.assertEqual(post.comments_count, 1)
+        Comment.objects.filter(post=post).delete()
+        post.refresh_from_db()
+        self.assertEqual(post.comments_count, 0)
+
+    def test_follow_and_unfollow_update_counts(self):
+        """Подписка и отписка меняют счётчики обоих пользователей."""
+        get_user_counter(CountersTests.author)
+        get_user_counter(CountersTests.reader)
+        self.reader_client.get(reverse('posts:profile_follow',
+                                       args=['author']))
+        self.assertEqual(
+            get_user_counter(CountersTests.author).followers_count, 1)
+        self.assertEqual(
+            get_user_counter(CountersTests.reader).following_count, 1)
+        self.reader_client.get(reverse('posts:profile_unfollow',
+                                       args=['author']))
+        self.assertEqual(
+            get_user_counter(CountersTests.author).followers_count, 0)
+        self.assertEqual(
+            get_user_counter(CountersTests.reader).following_count, 0)
+
+    def test_repair_counters_fixes_drift(self):
+        """Команда repair_counters исправляет расхождения."""
+        get_user_counter(CountersTests.author)
+        UserCounter.objects.filter(user=CountersTests.author).update(
+            posts_count=42, followers_count=7)
+        Post.objects.filter(pk=CountersTests.post.pk).update(
+            comments_count=3)
+        Follow.objects.bulk_create([
+            Follow(user=CountersTests.reader, author=CountersTests.author)])
+        out = StringIO()
+        call_command('repair_counters', stdout=out)
+        counter = get_user_counter(CountersTests.author)
+        self.assertEqual(counter.posts_count, 1)
+        self.assertEqual(counter.followers_count, 1)
+        CountersTests.post.refresh_from_db()
+        self.assertEqual(CountersTests.post.comments_count, 0)
+        self.assertIn('Исправлено записей: 1, пользователей: 1',
+                      out.getvalue())
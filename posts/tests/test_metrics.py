@@ -0,0 +1,100 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts import metrics
+from posts.models import Post
+
+User = get_user_model()
+
+
+@override_settings(METRICS_SAMPLE_RATE=1, METRICS_FLUSH_INTERVAL=0,
+                   METRICS_SLOW_REQUEST_MS=None)
+class MetricsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create(username='author', is_staff=True)
+        cls.post = Post.objects.create(text='Запись', author=cls.user)
+
+    def setUp(self):
+        cache.clear()
+        metrics.reset()
+        self.client = Client()
+
+    def test_views_are_measured(self):
+        """Каждый view получает время, запросы, шаблон и кэш."""
+        self.client.get(reverse('posts:index'))
+        self.client.get(reverse('posts:index'))
+        stats = metrics.collect()['posts:index']
+        self.assertEqual(stats['request_seconds']['count'], 2)
+        self.assertGreater(stats['db_queries']['sum'], 0)
+        self.assertGreater(stats['template_seconds']['sum'], 0)
+        self.assertLess(stats['template_seconds']['sum'],
+                        stats['request_seconds']['sum'])
+        self.assertGreater(stats['cache_hits'], 0)
+        self.assertGreater(stats['cache_misses'], 0)
+
+    @override_settings(METRICS_SAMPLE_RATE=0)
+    def test_unsampled_requests_not_recorded(self):
+        """Запросы вне выборки не попадают в гистограммы."""
+        self.client.get(reverse('posts:index'))
+        self.assertEqual(metrics.collect(), {})
+
+    @override_settings(METRICS_SLOW_REQUEST_MS=0)
+    def test_slow_request_logged_with_sql(self):
+        """Медленный запрос пишется в лог вместе с его SQL."""
+        with self.assertLogs('posts.metrics', 'WARNING') as logs:
+            self.client.get(reverse('posts:profile', args=['author']))
+        self.assertIn('/author/ (posts:profile)', logs.output[0])
+        self.assertIn('SELECT', logs.output[0])
+
+    def test_metrics_endpoint(self):
+        """Страница /metrics/ отдаёт гистограммы в формате Prometheus."""
+        self.client.get(reverse('posts:index'))
+        response = self.client.get(reverse('posts:metrics'),
+                                   REMOTE_ADDR='10.0.0.1')
+        self.assertEqual(response.status_code, 404)
+        self.client.force_login(MetricsTests.user)
+        response = self.client.get(reverse('posts:metrics'),
+                                   REMOTE_ADDR='10.0.0.1')
+        self.assertContains(
+            response,
+            'yatube_request_seconds_count{view="posts:index"} 1')
+        self.assertContains(response, '# TYPE yatube_db_queries histogram')
+
+    def test_metrics_endpoint_ignores_internal_ips(self):
+        """Адрес из INTERNAL_IPS сам по себе не открывает /metrics/."""
+        response = self.client.get(reverse('posts:metrics'),
+                                   REMOTE_ADDR='127.0.0.1')
+        self.assertEqual(response.status_code, 404)
+
+    @override_settings(METRICS_TOKEN='secret')
+    def test_metrics_endpoint_token(self):
+        """Сборщик с METRICS_TOKEN получает метрики без входа на сайт."""
+        url = reverse('posts:metrics')
+        response = self.client.get(url, HTTP_AUTHORIZATION='Bearer wrong')
+        self.assertEqual(response.status_code, 404)
+        response = self.client.get(url, HTTP_AUTHORIZATION='Bearer secret')
+        self.assertEqual(response.status_code, 200)
+
+    def test_command(self):
+        """Команда metrics выводит сводку и обнуляет замеры."""
+        self.client.get(reverse('posts:index'))
+        out = StringIO()
+        call_command('metrics', stdout=out)
+        self.assertIn('posts:index', out.getvalue())
+        call_command('metrics', reset=True, stdout=StringIO())
+        self.assertEqual(metrics.collect(), {})
+
+    def test_quantile(self):
+        """Квантиль — верхняя граница корзины."""
+        histogram = {'buckets': [0, 5, 4, 1] + [0] * 7, 'count': 10}
+        self.assertEqual(
+            metrics.quantile(histogram, metrics.TIME_BUCKETS, 0.5), 0.01)
+        self.assertEqual(
+            metrics.quantile(histogram, metrics.TIME_BUCKETS, 0.95), 0.05)
@@ -0,0 +1,137 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from posts.models import Post
+from posts.pagination import (PAGE_NUMBER_LIMIT, POSTS_PER_PAGE,
+                              KeysetPaginator, count_key, estimate_count,
+                              feed_count)
+
+User = get_user_model()
+
+
+class KeysetPaginationTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create(username='test-user')
+        Post.objects.bulk_create([
+            Post(text=f'Тестовый пост {i}', author=cls.user)
+            for i in range(POSTS_PER_PAGE * PAGE_NUMBER_LIMIT + 5)
+        ])
+        # Одинаковая дата у всех записей проверяет сортировку по id.
+        Post.objects.update(pub_date=timezone.now())
+        cls.expected = list(Post.objects.order_by('-pub_date', '-id'))
+
+    def setUp(self):
+        # bulk_create не вызывает сигналов, сбрасывающих число записей.
+        cache.clear()
+        self.client = Client()
+
+    def test_cursor_walk_returns_every_post_once(self):
+        """Переход по курсорам выдаёт все записи ровно один раз."""
+        paginator = KeysetPaginator(Post.objects.all(), POSTS_PER_PAGE)
+        page = paginator.page()
+        seen = list(page)
+        while page.has_next():
+            page = paginator.page(page.next_cursor)
+            seen.extend(page)
+        self.assertEqual(seen, KeysetPaginationTests.expected)
+
+    def test_previous_cursor_returns_previous_page(self):
+        """Курсор «назад» возвращает предыдущую страницу."""
+        paginator = KeysetPaginator(Post.objects.all(), POSTS_PER_PAGE)
+        first = paginator.page()
+        second = paginator.page(first.next_cursor)
+        back = paginator.page(second.previous_cursor)
+        self.assertEqual(list(back), list(first))
+        self.assertFalse(back.has_previous())
+        self.assertTrue(back.has_next())
+
+    def test_invalid_cursor_returns_first_page(self):
+        """Некорректный курсор открывает первую страницу."""
+        response = self.client.get(reverse('posts:index'),
+                                   {'cursor': 'not-a-cursor'})
+        self.assertEqual(list(response.context['page']),
+                         KeysetPaginationTests.expected[:POSTS_PER_PAGE])
+
+    def test_shallow_pages_keep_page_numbers(self):
+        """Неглубокие страницы открываются по номеру без курсора."""
+        response = self.client.get(reverse('posts:index'), {'page': 2})
+        page = response.context['page']
+        self.assertEqual(page.number, 2)
+        self.assertFalse(hasattr(page, 'next_cursor'))
+        self.assertContains(response, '?page=3')
+
+    def test_deep_page_switches_to_cursor(self):
+        """С последней неглубокой страницы дальше ведёт курсор."""
+        url = reverse('posts:index')
+        response = self.client.get(url, {'page': PAGE_NUMBER_LIMIT})
+        page = response.context['page']
+        self.assertContains(response, f'?cursor={page.next_cursor}')
+        response = self.client.get(url, {'cursor': page.next_cursor})
+        start = POSTS_PER_PAGE * PAGE_NUMBER_LIMIT
+        self.assertEqual(list(response.context['page']),
+                         KeysetPaginationTests.expected[start:])
+
+    def test_profile_accepts_cursor(self):
+        """Лента профиля продолжается по курсору."""
+        url = reverse('posts:profile', args=[KeysetPaginationTests.user])
+        response = self.client.get(url, {'page': PAGE_NUMBER_LIMIT})
+        page = response.context['page']
+        response = self.client.get(url, {'cursor': page.next_cursor})
+        start = POSTS_PER_PAGE * PAGE_NUMBER_LIMIT
+        self.assertEqual(list(response.context['page']),
+                         KeysetPaginationTests.expected[start:])
+
+    def test_overestimated_count_past_end(self):
+        """Страница за концом ленты при завышенной оценке пуста и конечна."""
+        cache.set(count_key('index'), (10 ** 5, 0.0, time.time() + 60), 60)
+        response = self.client.get(reverse('posts:index'),
+                                   {'page': PAGE_NUMBER_LIMIT + 100})
+        self.assertEqual(response.status_code, 200)
+        page = response.context['page']
+        self.assertEqual(list(page), [])
+        self.assertFalse(page.has_next())
+        self.assertFalse(hasattr(page, 'next_cursor'))
+        self.assertContains(response, 'aria-disabled="true">Следующая')
+
+    def test_page_links_are_windowed(self):
+        """Ссылки на страницы выводятся окном с пропусками."""
+        response = self.client.get(reverse('posts:index'))
+        self.assertEqual(response.context['page'].window,
+                         [1, 2, 3, None, PAGE_NUMBER_LIMIT + 1])
+        self.assertContains(response, '&hellip;')
+        self.assertNotContains(response, f'?page={PAGE_NUMBER_LIMIT}"')
+
+    def test_index_count_is_cached(self):
+        """Число записей главной страницы берётся из кэша."""
+        self.client.get(reverse('posts:index'))
+        Post.objects.filter(pk=KeysetPaginationTests.expected[0].pk).update(
+            text='Без сигналов')
+        with self.assertNumQueries(0):
+            count = feed_count(Post.objects.all(), 'index')
+        self.assertEqual(count, len(KeysetPaginationTests.expected))
+        self.assertIsNotNone(cache.get(count_key('index')))
+
+    def test_new_post_resets_count(self):
+        """Новая запись сбрасывает закэшированное число записей."""
+        self.client.get(reverse('posts:index'))
+        Post.objects.create(text='Ещё одна', author=KeysetPaginationTests.user)
+        response = self.client.get(reverse('posts:index'))
+        self.assertEqual(response.context['paginator'].count,
+                         len(KeysetPaginationTests.expected) + 1)
+
+    def test_estimate_count_from_statistics(self):
+        """Оценка числа строк берётся из статистики ANALYZE."""
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+        self.assertEqual(estimate_count(Post.objects.all()),
+                         len(KeysetPaginationTests.expected))
+        self.assertIsNone(estimate_count(
+            Post.objects.filter(author=KeysetPaginationTests.user)))
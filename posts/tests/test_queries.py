@@ -0,0 +1,62 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.counters import get_user_counter
+from posts.models import Comment, Follow, Group, Post
+
+User = get_user_model()
+
+
+class FeedQueryBudgetTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create(username='author')
+        cls.reader = User.objects.create(username='reader')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-group',
+            description='Группа для теста'
+        )
+        for i in range(10):
+            post = Post.objects.create(
+                text=f'Тестовый пост {i}',
+                author=cls.author,
+                group=cls.group
+            )
+            Comment.objects.create(post=post, author=cls.reader,
+                                   text=f'Комментарий {i}')
+        Follow.objects.create(user=cls.reader, author=cls.author)
+        get_user_counter(cls.author)
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(FeedQueryBudgetTests.reader)
+
+    def test_feed_query_budget(self):
+        """Страница ленты строится за фиксированное число запросов."""
+        # Сессия и пользователь занимают два запроса на каждой странице,
+        # главная при пустом кэше ещё читает статистику таблицы, а лента
+        # подписок — список авторов для ETag.
+        budgets = {
+            reverse('posts:index'): 5,
+            reverse('posts:group', args=['test-group']): 5,
+            reverse('posts:profile', args=['author']): 4,
+            reverse('posts:follow_index'): 5,
+        }
+        for url, budget in budgets.items():
+            with self.subTest(url=url):
+                with self.assertNumQueries(budget):
+                    self.client.get(url)
+
+    def test_post_view_query_budget(self):
+        """Страница записи строится за фиксированное число запросов."""
+        post = Post.objects.latest('pk')
+        # Авторы комментариев читаются тем же запросом, что и комментарии.
+        Comment.objects.create(post=post, author=FeedQueryBudgetTests.author,
+                               text='Ответ автора')
+        with self.assertNumQueries(5):
+            self.client.get(reverse('posts:post', args=['author', post.pk]))
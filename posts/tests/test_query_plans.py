@@ -0,0 +1,39 @@
+from unittest import skipUnless
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+
+from posts.models import Group, Post
+from posts.query_plans import check_plans, is_bad_plan
+
+User = get_user_model()
+
+
+@skipUnless(connection.vendor == 'sqlite', 'EXPLAIN QUERY PLAN из SQLite')
+class QueryPlanTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create(username='test-user')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-group',
+            description='Группа для теста'
+        )
+        cls.post = Post.objects.create(text='Тестовый пост',
+                                       author=cls.user, group=cls.group)
+
+    def test_feed_queries_use_indexes(self):
+        """Запросы лент не сортируют всю таблицу во временном B-дереве."""
+        plans = check_plans(user_id=QueryPlanTests.user.pk,
+                            group_id=QueryPlanTests.group.pk,
+                            post_id=QueryPlanTests.post.pk)
+        for name, (plan, bad) in plans.items():
+            with self.subTest(query=name):
+                self.assertFalse(bad, plan)
+
+    def test_bad_plan_detected(self):
+        """Сортировка без индекса распознаётся как плохой план."""
+        plan = Post.objects.order_by('text').explain()
+        self.assertTrue(is_bad_plan(plan))
@@ -0,0 +1,112 @@
+import os
+import sqlite3
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connections
+from django.test import Client, TransactionTestCase, override_settings
+from django.urls import reverse
+
+from posts.counters import get_user_counter
+from posts.models import Post
+from yatube.replicas import PIN_COOKIE, ReplicaRouter
+
+User = get_user_model()
+
+REPLICA = 'replica'
+
+
+@override_settings(REPLICA_DATABASES=[REPLICA])
+class ReplicaRoutingTests(TransactionTestCase):
+    databases = {'default', REPLICA}
+
+    @classmethod
+    def setUpClass(cls):
+        descriptor, cls.replica_file = tempfile.mkstemp(suffix='.sqlite3')
+        os.close(descriptor)
+        connections.databases[REPLICA] = dict(
+            connections.databases['default'], NAME=cls.replica_file,
+            TEST={})
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        connections[REPLICA].close()
+        del connections[REPLICA]
+        del connections.databases[REPLICA]
+        os.remove(cls.replica_file)
+
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create(username='author')
+        self.reader = User.objects.create(username='reader')
+        for user in (self.author, self.reader):
+            get_user_counter(user)
+        self.old = Post.objects.create(text='Старая запись',
+                                       author=self.author)
+        self.replicate()
+        self.new = Post.objects.create(text='Новая запись',
+                                       author=self.author)
+        self.client = Client()
+        self.client.force_login(self.reader)
+
+    def replicate(self):
+        """Копия default в файл реплики, как после репликации."""
+        connections[REPLICA].close()
+        primary = connections['default']
+        primary.ensure_connection()
+        replica = sqlite3.connect(self.replica_file)
+        primary.connection.backup(replica)
+        replica.close()
+
+    def shown(self, response):
+        return list(response.context['page'].object_list)
+
+    def test_feeds_read_from_replica(self):
+        """Ленты читаются с реплики, которая ещё не знает новую запись."""
+        urls = [
+            reverse('posts:index'),
+            reverse('posts:profile', args=['author']),
+        ]
+        for url in urls:
+            with self.subTest(url=url):
+                self.assertEqual(self.shown(self.client.get(url)),
+                                 [self.old])
+        response = self.client.get(
+            reverse('posts:post', args=['author', self.new.pk]))
+        self.assertEqual(response.status_code, 404)
+
+    def test_feed_count_read_from_primary(self):
+        """Число записей ленты не берётся с отстающей реплики."""
+        response = self.client.get(reverse('posts:index'))
+        self.assertEqual(self.shown(response), [self.old])
+        self.assertEqual(response.context['paginator'].count, 2)
+
+    def test_other_views_read_primary(self):
+        """Страница редактирования читает с основной базы."""
+        self.client.force_login(self.author)
+        response = self.client.get(
+            reverse('posts:post_edit', args=['author', self.new.pk]))
+        self.assertEqual(response.status_code, 200)
+
+    def test_writer_is_pinned_to_primary(self):
+        """Автор комментария несколько секунд читает с основной базы."""
+        response = self.client.post(
+            reverse('posts:add_comment', args=['author', self.new.pk]),
+            {'text': 'Комментарий'})
+        self.assertIn(PIN_COOKIE, response.cookies)
+        response = self.client.get(reverse('posts:index'))
+        self.assertEqual(self.shown(response), [self.new, self.old])
+        other = Client()
+        other.force_login(self.author)
+        response = other.get(reverse('posts:index'))
+        self.assertEqual(self.shown(response), [self.old])
+
+    def test_writes_go_to_primary(self):
+        """Запись всегда идёт в default, миграции — только в default."""
+        router = ReplicaRouter()
+        self.assertEqual(router.db_for_write(Post), 'default')
+        self.assertFalse(router.allow_migrate(REPLICA, 'posts'))
+        self.assertTrue(router.allow_migrate('default', 'posts'))
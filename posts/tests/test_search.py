@@ -0,0 +1,114 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts import search
+from posts.models import Comment, Post
+from posts.stemmer import stem
+
+User = get_user_model()
+
+
+class StemmerTests(TestCase):
+    def test_word_forms_share_stem(self):
+        """Формы одного слова сводятся к одной основе."""
+        for forms in (('кошка', 'кошки', 'кошками'),
+                      ('вечерний', 'вечерние', 'вечернего'),
+                      ('ёжик', 'ежики')):
+            with self.subTest(forms=forms):
+                self.assertEqual(len({stem(form) for form in forms}), 1)
+
+    def test_latin_words_untouched(self):
+        """Слова не на кириллице только приводятся к нижнему регистру."""
+        self.assertEqual(stem('Django'), 'django')
+
+
+class SearchTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create(username='author')
+        cls.cats = Post.objects.create(text='Мои кошки любят спать',
+                                       author=cls.user)
+        cls.dogs = Post.objects.create(text='Собака лает на кошку',
+                                       author=cls.user)
+        cls.other = Post.objects.create(text='Про погоду', author=cls.user)
+
+    def setUp(self):
+        self.client = Client()
+
+    def found(self, query):
+        return list(search.search(query)[:10])
+
+    def test_stemmed_and_ranked(self):
+        """Поиск находит другие формы слова и ранжирует по релевантности."""
+        self.assertEqual(set(self.found('кошками')),
+                         {SearchTests.cats, SearchTests.dogs})
+        self.assertEqual(self.found('кошки спать'), [SearchTests.cats])
+
+    def test_index_follows_edits_and_deletes(self):
+        """Индекс обновляется при правке и удалении записи."""
+        post = Post.objects.get(pk=SearchTests.other.pk)
+        post.text = 'Про кошку и погоду'
+        post.save()
+        self.assertIn(post, self.found('кошка'))
+        post.delete()
+        self.assertNotIn(post, self.found('погода'))
+
+    def test_comments_are_searchable(self):
+        """Запись находится по тексту комментария к ней."""
+        comment = Comment.objects.create(post=SearchTests.other,
+                                         author=SearchTests.user,
+                                         text='Отличные фотографии')
+        self.assertEqual(self.found('фотография'), [SearchTests.other])
+        comment.delete()
+        self.assertEqual(self.found('фотография'), [])
+
+    def test_comments_indexed_incrementally(self):
+        """Комментарий дописывается в индекс без чтения остальных."""
+        backend = search.get_backend()
+        first = Comment.objects.create(post=SearchTests.cats,
+                                       author=SearchTests.user,
+                                       text='Рыжая кошка')
+        with CaptureQueriesContext(connection) as queries:
+            Comment.objects.create(post=SearchTests.cats,
+                                   author=SearchTests.user,
+                                   text='Серая кошка')
+        self.assertFalse([query for query in queries
+                          if query['sql'].startswith('SELECT')
+                          and 'posts_comment' in query['sql']])
+        first.delete()
+        incremental = backend._comments(SearchTests.cats.pk)
+        backend.update([SearchTests.cats.pk])
+        self.assertEqual(incremental.split(),
+                         backend._comments(SearchTests.cats.pk).split())
+
+    def test_query_syntax_is_escaped(self):
+        """Операторы FTS5 в запросе не ломают поиск."""
+        self.assertEqual(self.found('кошки" OR NOT *'), [])
+
+    def test_search_page(self):
+        """Страница поиска выводит найденные записи с пагинацией."""
+        for i in range(12):
+            Post.objects.create(text=f'Кошка номер {i}',
+                                author=SearchTests.user)
+        response = self.client.get(reverse('posts:search'), {'q': 'кошка'})
+        self.assertEqual(response.context['paginator'].count, 14)
+        self.assertEqual(len(response.context['page']), 10)
+        self.assertContains(response, '?q=%D0%BA%D0%BE%D1%88%D0%BA%D0%B0'
+                                      '&amp;page=2')
+
+    def test_rebuild_command(self):
+        """Команда rebuild_search_index восстанавливает индекс."""
+        with connection.cursor() as cursor:
+            cursor.execute('DELETE FROM posts_search')
+        self.assertEqual(self.found('погода'), [])
+        out = StringIO()
+        call_command('rebuild_search_index', stdout=out)
+        self.assertIn('Проиндексировано записей: 3', out.getvalue())
+        self.assertEqual(self.found('погода'), [SearchTests.other])
@@ -0,0 +1,139 @@
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import OperationalError, connection, connections
+from django.test import (Client, RequestFactory, TestCase,
+                         TransactionTestCase, override_settings)
+from django.urls import reverse
+
+from posts.counters import get_user_counter
+from posts.models import Comment, Follow, Post
+from yatube.sqlite import serialize_writes, set_pragmas
+
+User = get_user_model()
+
+
+class SqlitePragmaTests(TestCase):
+    @override_settings(SQLITE_PRAGMAS={'cache_size': -4096})
+    def test_pragmas_applied_on_connect(self):
+        """PRAGMA из SQLITE_PRAGMAS выполняются на новом соединении."""
+        set_pragmas(sender=None, connection=connection)
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA cache_size')
+            self.assertEqual(cursor.fetchone()[0], -4096)
+
+
+@override_settings(WRITE_RETRIES=3, WRITE_RETRY_DELAY=0)
+class WriteRetryTests(TestCase):
+    def setUp(self):
+        self.request = RequestFactory().post('/')
+
+    def test_locked_write_is_retried(self):
+        """«database is locked» повторяется, пока запись не пройдёт."""
+        view = mock.Mock(side_effect=[
+            OperationalError('database is locked'),
+            OperationalError('database is locked'),
+            'ok',
+        ])
+        self.assertEqual(serialize_writes(view)(self.request), 'ok')
+        self.assertEqual(view.call_count, 3)
+
+    def test_retries_are_limited(self):
+        """После WRITE_RETRIES повторов ошибка пробрасывается."""
+        view = mock.Mock(side_effect=OperationalError('database is locked'))
+        with self.assertRaises(OperationalError):
+            serialize_writes(view)(self.request)
+        self.assertEqual(view.call_count, 4)
+
+    def test_other_errors_not_retried(self):
+        """Другие ошибки базы не повторяются."""
+        view = mock.Mock(side_effect=OperationalError('no such table'))
+        with self.assertRaises(OperationalError):
+            serialize_writes(view)(self.request)
+        self.assertEqual(view.call_count, 1)
+
+    def test_retry_rolls_back_partial_write(self):
+        """Повтор не оставляет записей от упавшей попытки."""
+        author = User.objects.create(username='author')
+        attempts = []
+
+        def view(request):
+            Post.objects.create(text='Запись', author=author)
+            attempts.append(1)
+            if len(attempts) == 1:
+                raise OperationalError('database is locked')
+            return 'ok'
+
+        serialize_writes(view)(self.request)
+        self.assertEqual(Post.objects.count(), 1)
+
+
+class WriteLockScopeTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(username='author')
+        self.client = Client()
+        self.client.force_login(self.user)
+
+    def locks_taken(self, request):
+        with mock.patch('yatube.sqlite._write_lock') as lock:
+            request()
+        return lock.__enter__.call_count
+
+    def test_form_pages_skip_write_lock(self):
+        """Показ формы и перенаправление анонима идут без блокировки."""
+        url = reverse('posts:new_post')
+        self.assertEqual(self.locks_taken(lambda: self.client.get(url)), 0)
+        self.assertEqual(self.locks_taken(lambda: Client().post(url)), 0)
+        self.assertEqual(self.locks_taken(
+            lambda: self.client.post(url, {'text': 'Запись'})), 1)
+
+
+class ConcurrentWriteTests(TransactionTestCase):
+    THREADS = 8
+    REQUESTS = 10
+
+    def setUp(self):
+        self.author = User.objects.create(username='author')
+        self.readers = [User.objects.create(username=f'reader{i}')
+                        for i in range(self.THREADS)]
+        for user in [self.author] + self.readers:
+            get_user_counter(user)
+        self.post = Post.objects.create(text='Запись', author=self.author)
+        # Вход пишет сессию в базу, поэтому клиенты готовятся заранее.
+        self.clients = []
+        for reader in self.readers:
+            client = Client()
+            client.force_login(reader)
+            self.clients.append(client)
+
+    def burst(self, client):
+        statuses = []
+        try:
+            for i in range(self.REQUESTS):
+                statuses.append(client.post(
+                    reverse('posts:add_comment',
+                            args=['author', self.post.pk]),
+                    {'text': f'Комментарий {i}'}).status_code)
+                statuses.append(client.post(reverse('posts:new_post'), {
+                    'text': f'Новая запись {i}'}).status_code)
+            statuses.append(client.get(
+                reverse('posts:profile_follow', args=['author'])).status_code)
+        finally:
+            connections.close_all()
+        return statuses
+
+    def test_write_burst_from_threads(self):
+        """Одновременные записи из потоков проходят без ошибок."""
+        with ThreadPoolExecutor(max_workers=self.THREADS) as pool:
+            results = list(pool.map(self.burst, self.clients))
+        self.assertEqual({status for statuses in results
+                          for status in statuses}, {302})
+        total = self.THREADS * self.REQUESTS
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.comments_count, total)
+        self.assertEqual(Comment.objects.count(), total)
+        self.assertEqual(Post.objects.count(), total + 1)
+        self.assertEqual(Follow.objects.count(), self.THREADS)
+        self.assertEqual(get_user_counter(self.author).followers_count,
+                         self.THREADS)
@@ -0,0 +1,109 @@
+import os
+import shutil
+import tempfile
+from io import BytesIO, StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from PIL import Image
+
+from posts import thumbnails
+from posts.models import Post
+from posts.storage import content_storage
+
+User = get_user_model()
+MEDIA_ROOT = tempfile.mkdtemp(dir=tempfile.gettempdir())
+# Картинка и все её миниатюры.
+FILES_PER_IMAGE = 1 + len(thumbnails.WIDTHS) * len(thumbnails.FORMATS)
+
+
+def make_image(color=(200, 30, 30)):
+    buffer = BytesIO()
+    Image.new('RGB', (96, 34), color=color).save(buffer, 'PNG')
+    return ContentFile(buffer.getvalue(), name='picture.png')
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, THUMBNAIL_WORKERS=0)
+class ContentAddressedStorageTests(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        self.user = User.objects.create(username='author')
+
+    def create(self, color=(200, 30, 30)):
+        post = Post.objects.create(text='Запись с картинкой',
+                                   author=self.user, image=make_image(color))
+        # В TestCase транзакция не фиксируется, и on_commit не срабатывает.
+        thumbnails.generate(post.image.name, post.image_hash)
+        return post
+
+    def collect(self, *args):
+        output = StringIO()
+        call_command('collect_media', '--grace=0', *args, stdout=output)
+        return output.getvalue()
+
+    def test_name_is_content_hash(self):
+        """Картинка сохраняется под хэшем своего содержимого."""
+        post = self.create()
+        digest = post.image_hash
+        self.assertEqual(post.image.name,
+                         f'posts/{digest[:2]}/{digest}.png')
+
+    def test_image_hashed_once(self):
+        """Загруженная картинка читается для хэша один раз."""
+        with mock.patch.object(thumbnails, 'content_hash',
+                               wraps=thumbnails.content_hash) as hashed:
+            post = Post.objects.create(text='Запись с картинкой',
+                                       author=self.user, image=make_image())
+        self.assertEqual(hashed.call_count, 1)
+        self.assertEqual(post.image_hash,
+                         thumbnails.content_hash(make_image()))
+
+    def test_same_image_stored_once(self):
+        """Одинаковые картинки разных записей — один файл."""
+        first, second = self.create(), self.create()
+        self.assertEqual(first.image.name, second.image.name)
+        directory = os.path.dirname(content_storage.path(first.image.name))
+        self.assertEqual(len(os.listdir(directory)), 1)
+
+    def test_collect_removes_only_orphans(self):
+        """collect_media удаляет картинку и миниатюры удалённой записи."""
+        kept, shared = self.create(), self.create()
+        removed = self.create(color=(10, 200, 10))
+        name, image_hash = removed.image.name, removed.image_hash
+        removed.delete()
+        shared.delete()
+        self.assertIn(f'Удалено файлов: {FILES_PER_IMAGE},', self.collect())
+        self.assertFalse(content_storage.exists(name))
+        self.assertFalse(default_storage.exists(
+            thumbnails.ready_name(image_hash)))
+        self.assertTrue(content_storage.exists(kept.image.name))
+        self.assertTrue(default_storage.exists(
+            thumbnails.ready_name(kept.image_hash)))
+
+    def test_collect_dry_run_keeps_files(self):
+        """С --dry-run collect_media ничего не удаляет."""
+        post = self.create()
+        name = post.image.name
+        post.delete()
+        self.assertIn(f'Будет удалено файлов: {FILES_PER_IMAGE},',
+                      self.collect('--dry-run'))
+        self.assertTrue(content_storage.exists(name))
+
+    def test_collect_skips_fresh_files(self):
+        """Файлы моложе --grace не удаляются."""
+        post = self.create()
+        name = post.image.name
+        post.delete()
+        output = StringIO()
+        call_command('collect_media', stdout=output)
+        self.assertIn('Удалено файлов: 0,', output.getvalue())
+        self.assertTrue(content_storage.exists(name))
@@ -0,0 +1,69 @@
+import shutil
+import tempfile
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from sorl.thumbnail import default, get_thumbnail
+from sorl.thumbnail.models import KVStore
+
+from posts.tests.test_storage import make_image
+
+MEDIA_ROOT = tempfile.mkdtemp(dir=tempfile.gettempdir())
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class ThumbnailCacheTests(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        cache.clear()
+        self.storage = default.storage
+        self.source = self.storage.save('posts/source.png', make_image())
+        # Без upscale sorl не масштабирует, а только пересохраняет.
+        self.thumbnail = get_thumbnail(self.source, '200x200',
+                                       upscale=False)
+
+    def clean(self, *args):
+        output = StringIO()
+        call_command('clean_thumbnail_cache', *args, stdout=output)
+        return output.getvalue()
+
+    def test_live_thumbnails_kept(self):
+        """Миниатюры существующих картинок не удаляются."""
+        keys = KVStore.objects.count()
+        self.assertIn('Удалено ключей: 0, файлов: 0,', self.clean())
+        self.assertTrue(self.thumbnail.exists())
+        self.assertEqual(KVStore.objects.count(), keys)
+
+    def test_thumbnails_of_deleted_source_removed(self):
+        """Миниатюры и ключи удалённой картинки удаляются."""
+        self.storage.delete(self.source)
+        # Ключи исходника, списка миниатюр и самой миниатюры.
+        self.assertIn('Удалено ключей: 3, файлов: 1,', self.clean())
+        self.assertFalse(self.thumbnail.exists())
+        self.assertFalse(KVStore.objects.exists())
+
+    def test_dry_run_keeps_everything(self):
+        """С --dry-run ничего не удаляется, но всё подсчитывается."""
+        self.storage.delete(self.source)
+        self.assertIn('Будет удалено ключей: 3, файлов: 1,',
+                      self.clean('--dry-run'))
+        self.assertTrue(self.thumbnail.exists())
+        self.assertEqual(KVStore.objects.count(), 3)
+
+    def test_unknown_files_removed_after_grace(self):
+        """Файл в cache/ без ключа удаляется, только если он старый."""
+        name = self.storage.save('cache/ab/cd/lost.jpg',
+                                 ContentFile(b'x' * 2048))
+        self.assertIn('файлов: 0,', self.clean())
+        self.assertTrue(self.storage.exists(name))
+        self.assertIn('файлов: 1,', self.clean('--grace=0'))
+        self.assertFalse(self.storage.exists(name))
+        self.assertTrue(self.thumbnail.exists())
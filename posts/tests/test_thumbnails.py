@@ -0,0 +1,124 @@
+import os
+import shutil
+import tempfile
+from io import BytesIO, StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+
+from posts import thumbnails
+from posts.models import Post
+
+User = get_user_model()
+MEDIA_ROOT = tempfile.mkdtemp(dir=tempfile.gettempdir())
+
+
+def make_image(size=(1200, 800)):
+    buffer = BytesIO()
+    Image.new('RGB', size, color=(200, 30, 30)).save(buffer, 'PNG')
+    return ContentFile(buffer.getvalue(), name='picture.png')
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, THUMBNAIL_WORKERS=0)
+class ThumbnailTests(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create(username='author')
+        self.post = Post.objects.create(text='Запись с картинкой',
+                                        author=self.user,
+                                        image=make_image())
+        self.client = Client()
+
+    def test_image_hash_on_upload(self):
+        """При загрузке картинки сохраняется хэш её содержимого."""
+        self.assertEqual(self.post.image_hash,
+                         thumbnails.content_hash(make_image()))
+        self.post.image = None
+        self.post.save()
+        self.assertEqual(self.post.image_hash, '')
+
+    def test_generate_all_variants(self):
+        """Создаются все ширины в JPEG и WebP с пропорциями карточки."""
+        image_hash = self.post.image_hash
+        self.assertFalse(thumbnails.generate(self.post.image.name,
+                                             image_hash))
+        for width in thumbnails.WIDTHS:
+            for ext in thumbnails.FORMATS:
+                name = thumbnails.variant_name(image_hash, width, ext)
+                with default_storage.open(name) as variant:
+                    self.assertEqual(Image.open(variant).size,
+                                     (width, round(width * thumbnails.RATIO)))
+
+    def test_concurrent_generate_keeps_names(self):
+        """Два воркера над одной картинкой не плодят копий с суффиксом."""
+        image_hash = self.post.image_hash
+        exists, checked = default_storage.exists, set()
+
+        def raced(name):
+            # Второй воркер не видит вариант, который первый вот-вот
+            # запишет, но только при первой проверке имени.
+            if name in checked:
+                return exists(name)
+            checked.add(name)
+            return False
+
+        with mock.patch.object(default_storage, 'exists', side_effect=raced):
+            thumbnails.generate(self.post.image.name, image_hash)
+        directory = default_storage.path(f'thumbnails/{image_hash}')
+        self.assertEqual(
+            sorted(os.listdir(directory)),
+            sorted(f'{width}.{ext}' for width in thumbnails.WIDTHS
+                   for ext in thumbnails.FORMATS))
+
+    def test_card_has_srcset(self):
+        """Карточка отдаёт варианты через srcset."""
+        response = self.client.get(reverse('posts:index'))
+        image_hash = self.post.image_hash
+        self.assertContains(response, '<picture>')
+        self.assertContains(response, 'image/webp')
+        for width in thumbnails.WIDTHS:
+            name = thumbnails.variant_name(image_hash, width, 'webp')
+            self.assertContains(response,
+                                f'{default_storage.url(name)} {width}w')
+
+    @override_settings(THUMBNAIL_WORKERS=1)
+    def test_placeholder_until_variants_ready(self):
+        """Пока вариантов нет, карточка показывает заглушку."""
+        image_hash = self.post.image_hash
+        name = thumbnails.ready_name(image_hash)
+        default_storage.delete(name)
+        # Варианты «уже в очереди», поэтому запрос их не создаёт.
+        thumbnails._pending.add(image_hash)
+        try:
+            response = self.client.get(reverse('posts:index'))
+        finally:
+            thumbnails._pending.discard(image_hash)
+        self.assertContains(response, 'padding-top: 35.3%')
+        self.assertFalse(default_storage.exists(name))
+        thumbnails.generate(self.post.image.name, image_hash)
+        response = self.client.get(reverse('posts:profile', args=['author']))
+        self.assertContains(response, default_storage.url(name))
+
+    def test_warm_thumbnails_command(self):
+        """Команда warm_thumbnails заполняет хэш и создаёт варианты."""
+        Post.objects.update(image_hash='')
+        out = StringIO()
+        call_command('warm_thumbnails', stdout=out)
+        self.post.refresh_from_db()
+        self.assertIn('ошибок: 0', out.getvalue())
+        self.assertEqual(self.post.image_hash,
+                         thumbnails.content_hash(make_image()))
+        self.assertTrue(default_storage.exists(
+            thumbnails.ready_name(self.post.image_hash)))
@@ -0,0 +1,130 @@
+from django.contrib.auth import get_user_model
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts import timeline
+from posts.counters import get_user_counter
+from posts.models import Follow, Post, TimelineEntry
+from posts.pagination import POSTS_PER_PAGE
+
+User = get_user_model()
+
+
+class TimelineTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create(username='author')
+        cls.reader = User.objects.create(username='reader')
+        cls.old_post = Post.objects.create(text='Старая запись',
+                                           author=cls.author)
+
+    def setUp(self):
+        self.reader_client = Client()
+        self.reader_client.force_login(TimelineTests.reader)
+
+    def follow(self):
+        self.reader_client.get(reverse('posts:profile_follow',
+                                       args=['author']))
+
+    def feed(self):
+        response = self.reader_client.get(reverse('posts:follow_index'))
+        return list(response.context['page'])
+
+    def test_follow_backfills_timeline(self):
+        """Подписка переносит записи автора в ленту читателя."""
+        self.follow()
+        self.assertTrue(TimelineEntry.objects.filter(
+            user=TimelineTests.reader, post=TimelineTests.old_post).exists())
+        self.assertEqual(self.feed(), [TimelineTests.old_post])
+
+    def test_new_post_fans_out(self):
+        """Новая запись попадает в ленты подписчиков."""
+        self.follow()
+        post = Post.objects.create(text='Новая запись',
+                                   author=TimelineTests.author)
+        self.assertEqual(self.feed(), [post, TimelineTests.old_post])
+
+    def test_unfollow_prunes_timeline(self):
+        """Отписка убирает записи автора из ленты."""
+        self.follow()
+        self.reader_client.get(reverse('posts:profile_unfollow',
+                                       args=['author']))
+        self.assertFalse(TimelineEntry.objects.filter(
+            user=TimelineTests.reader).exists())
+        self.assertEqual(self.feed(), [])
+
+    @override_settings(TIMELINE_LENGTH=10)
+    def test_timeline_is_capped(self):
+        """Лента не вырастает больше TIMELINE_LENGTH с запасом в 10%."""
+        self.follow()
+        for i in range(12):
+            Post.objects.create(text=f'Запись {i}',
+                                author=TimelineTests.author)
+        entries = TimelineEntry.objects.filter(user=TimelineTests.reader)
+        self.assertLessEqual(entries.count(), 11)
+        self.assertFalse(entries.filter(
+            post=TimelineTests.old_post).exists())
+
+    @override_settings(TIMELINE_FANOUT_LIMIT=0)
+    def test_popular_author_is_pulled(self):
+        """Записи популярного автора читаются без раскладки по лентам."""
+        get_user_counter(TimelineTests.author)
+        Follow.objects.create(user=TimelineTests.reader,
+                              author=TimelineTests.author)
+        post = Post.objects.create(text='Новая запись',
+                                   author=TimelineTests.author)
+        self.assertFalse(TimelineEntry.objects.exists())
+        self.assertEqual(list(timeline.feed_for(TimelineTests.reader)),
+                         [post, TimelineTests.old_post])
+
+    def follow_by(self, *names):
+        for name in names:
+            user, _ = User.objects.get_or_create(username=name)
+            Follow.objects.create(user=user, author=TimelineTests.author)
+
+    def unfollow_by(self, *names):
+        Follow.objects.filter(user__username__in=names).delete()
+
+    @override_settings(TIMELINE_FANOUT_LIMIT=2, TIMELINE_FANOUT_MARGIN=1)
+    def test_mode_switches_with_margin(self):
+        """У порога автор не переключается на каждой подписке."""
+        get_user_counter(TimelineTests.author)
+        self.follow()
+        self.follow_by('second', 'third')
+        self.assertFalse(timeline.is_pushed(TimelineTests.author))
+        self.unfollow_by('third')
+        self.assertFalse(timeline.is_pushed(TimelineTests.author))
+        self.follow_by('third')
+        self.unfollow_by('third', 'second')
+        self.assertTrue(timeline.is_pushed(TimelineTests.author))
+
+    @override_settings(TIMELINE_FANOUT_LIMIT=1, TIMELINE_FANOUT_MARGIN=0)
+    def test_pulled_posts_kept_after_switch_to_push(self):
+        """После возврата в ленты в них есть страница pull-записей."""
+        get_user_counter(TimelineTests.author)
+        self.follow()
+        self.follow_by('other')
+        posts = [Post.objects.create(text=f'Запись для многих {i}',
+                                     author=TimelineTests.author)
+                 for i in range(POSTS_PER_PAGE + 1)]
+        self.unfollow_by('other')
+        self.assertTrue(timeline.is_pushed(TimelineTests.author))
+        self.assertEqual(
+            list(timeline.feed_for(TimelineTests.reader)[:POSTS_PER_PAGE]),
+            posts[:0:-1])
+        # Только страница свежих записей и старая запись из backfill.
+        self.assertEqual(TimelineEntry.objects.filter(
+            user=TimelineTests.reader).count(), POSTS_PER_PAGE + 1)
+
+    @override_settings(TIMELINE_FANOUT_LIMIT=1)
+    def test_limit_applies_without_lazy_counter(self):
+        """Порог действует, даже если счётчик автора ещё не читали."""
+        author = User.objects.create(username='popular')
+        for name in ('first', 'second'):
+            Follow.objects.create(user=User.objects.create(username=name),
+                                  author=author)
+        self.assertFalse(timeline.is_pushed(author))
+        Post.objects.create(text='Новая запись', author=author)
+        self.assertFalse(TimelineEntry.objects.filter(
+            post__author=author).exists())
@@ -0,0 +1,140 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+
+from posts import search, transfer
+from posts.counters import get_user_counter
+from posts.models import Comment, Follow, Group, Post, TimelineEntry
+
+User = get_user_model()
+
+
+class TransferTests(TestCase):
+    def setUp(self):
+        self.author = User.objects.create(username='author',
+                                          first_name='Лев')
+        self.reader = User.objects.create(username='reader')
+        for user in (self.author, self.reader):
+            get_user_counter(user)
+        self.group = Group.objects.create(title='Группа', slug='group',
+                                          description='Описание')
+        for i in range(25):
+            Post.objects.create(text=f'Запись про кошку {i}',
+                                author=self.author,
+                                group=self.group if i % 2 else None)
+        self.post = Post.objects.order_by('pk').first()
+        Post.objects.filter(pk=self.post.pk).update(image='posts/cat.jpg',
+                                                    image_hash='abc')
+        for i in range(3):
+            Comment.objects.create(post=self.post, author=self.reader,
+                                   text=f'Комментарий {i}')
+        Follow.objects.create(user=self.reader, author=self.author)
+        self.pub_dates = dict(Post.objects.values_list('pk', 'pub_date'))
+
+    def dump(self, batch_size=transfer.BATCH_SIZE):
+        output = StringIO()
+        transfer.export(output, batch_size)
+        return output.getvalue().splitlines(keepends=True)
+
+    def wipe(self):
+        User.objects.all().delete()
+        Group.objects.all().delete()
+        self.assertFalse(Post.objects.exists())
+
+    def assert_restored(self):
+        post = Post.objects.get(pk=self.post.pk)
+        self.assertEqual(post.author.username, 'author')
+        self.assertEqual(post.author.first_name, 'Лев')
+        self.assertEqual(str(post.image), 'posts/cat.jpg')
+        self.assertEqual(post.comments_count, 3)
+        self.assertEqual(dict(Post.objects.values_list('pk', 'pub_date')),
+                         self.pub_dates)
+        self.assertEqual(Group.objects.get().posts.count(), 12)
+        reader = User.objects.get(username='reader')
+        self.assertFalse(reader.has_usable_password())
+        self.assertEqual(TimelineEntry.objects.filter(user=reader).count(),
+                         25)
+        author = User.objects.get(username='author')
+        counter = get_user_counter(author)
+        self.assertEqual((counter.posts_count, counter.followers_count),
+                         (25, 1))
+        self.assertEqual(len(search.search('кошка')[:100]), 25)
+
+    def test_export_streams_in_keyset_batches(self):
+        """Выгрузка читает каждую таблицу пачками по pk."""
+        # Группа, 2 пользователя, 25 записей, 3 комментария, 1 подписка:
+        # по пачке на каждые 10 строк и пустая пачка в конце.
+        with self.assertNumQueries(2 + 2 + 4 + 2 + 2):
+            lines = self.dump(batch_size=10)
+        self.assertEqual(len(lines), 32)
+        self.assertEqual([json.loads(line)['model'] for line in lines[:4]],
+                         ['group', 'user', 'user', 'post'])
+
+    def test_round_trip(self):
+        """Загрузка выгрузки восстанавливает данные и производные."""
+        lines = self.dump()
+        self.wipe()
+        totals = transfer.load(lines, batch_size=7)
+        transfer.finish()
+        self.assertEqual(totals, {'group': 1, 'user': 2, 'post': 25,
+                                  'comment': 3, 'follow': 1})
+        self.assert_restored()
+
+    def test_resume_from_checkpoint(self):
+        """После сбоя загрузка продолжается с контрольной точки."""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'dump.ndjson')
+            call_command('export_content', output=path, stderr=StringIO())
+            self.wipe()
+
+            def crash(number):
+                if number > 10:
+                    raise RuntimeError('сбой')
+                with open(path + '.checkpoint', 'w') as checkpoint:
+                    checkpoint.write(str(number))
+
+            with open(path) as lines, self.assertRaises(RuntimeError):
+                transfer.load(lines, batch_size=5, checkpoint=crash)
+            out = StringIO()
+            call_command('import_content', path, batch_size=5, stdout=out)
+            self.assertIn('Продолжаю после строки', out.getvalue())
+            self.assertIn('строк/с', out.getvalue())
+            self.assertFalse(os.path.exists(path + '.checkpoint'))
+        self.assert_restored()
+
+    def test_reimport_is_idempotent(self):
+        """Повторная загрузка не создаёт дублей."""
+        lines = self.dump()
+        transfer.load(lines)
+        transfer.finish()
+        self.assertEqual(Post.objects.count(), 25)
+        self.assertEqual(Comment.objects.count(), 3)
+        self.assertEqual(Follow.objects.count(), 1)
+
+    def test_pk_collision_stops_import(self):
+        """Чужая запись с тем же pk не перезаписывается и не теряется."""
+        lines = self.dump()
+        self.wipe()
+        stranger = User.objects.create(username='stranger')
+        local = Post.objects.create(pk=self.post.pk, text='Местная запись',
+                                    author=stranger)
+        with self.assertRaises(transfer.TransferError):
+            transfer.load(lines)
+        local.refresh_from_db()
+        self.assertEqual(local.text, 'Местная запись')
+        self.assertNotEqual(local.pub_date, self.pub_dates[self.post.pk])
+        self.assertFalse(Comment.objects.exists())
+
+    def test_import_command_reports_collision(self):
+        """import_content сообщает о занятом pk ошибкой команды."""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'dump.ndjson')
+            call_command('export_content', output=path, stderr=StringIO())
+            Post.objects.filter(pk=self.post.pk).update(text='Правка')
+            with self.assertRaisesMessage(CommandError, 'уже занят'):
+                call_command('import_content', path, stdout=StringIO())
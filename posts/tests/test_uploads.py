@@ -0,0 +1,99 @@
+import shutil
+import tempfile
+from io import BytesIO
+
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+
+from posts.models import Post
+from posts.uploads import LimitedUploadHandler
+
+User = get_user_model()
+MEDIA_ROOT = tempfile.mkdtemp(dir=tempfile.gettempdir())
+ORIENTATION = 0x0112
+
+
+def make_upload(size=(400, 200), fmt='JPEG', name='photo.jpg', **params):
+    buffer = BytesIO()
+    Image.new('RGB', size, color=(30, 120, 200)).save(buffer, fmt, **params)
+    return SimpleUploadedFile(name, buffer.getvalue())
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, THUMBNAIL_WORKERS=0)
+class UploadTests(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        self.user = User.objects.create(username='author')
+        self.client = Client()
+        self.client.force_login(self.user)
+
+    def publish(self, upload):
+        return self.client.post(reverse('posts:new_post'),
+                                {'text': 'Запись с картинкой',
+                                 'image': upload})
+
+    def stored(self):
+        post = Post.objects.get()
+        with post.image.open() as file:
+            image = Image.open(file)
+            image.load()
+        return post, image
+
+    @override_settings(UPLOAD_MAX_SIDE=100)
+    def test_large_image_is_downscaled(self):
+        """Картинка больше UPLOAD_MAX_SIDE уменьшается при загрузке."""
+        self.publish(make_upload((400, 200)))
+        post, image = self.stored()
+        self.assertEqual(image.size, (100, 50))
+        self.assertTrue(post.image.name.endswith('.jpg'))
+
+    def test_orientation_applied_and_exif_stripped(self):
+        """Поворот из EXIF применяется, сам EXIF не сохраняется."""
+        exif = Image.Exif()
+        exif[ORIENTATION] = 6
+        self.publish(make_upload((40, 20), exif=exif.tobytes()))
+        _, image = self.stored()
+        self.assertEqual(image.size, (20, 40))
+        self.assertEqual(dict(image.getexif()), {})
+
+    def test_other_formats_stored_as_jpeg(self):
+        """Картинка в непривычном формате сохраняется в JPEG."""
+        self.publish(make_upload(fmt='BMP', name='scan.bmp'))
+        post, image = self.stored()
+        self.assertEqual(image.format, 'JPEG')
+        self.assertTrue(post.image.name.endswith('.jpg'))
+
+    @override_settings(UPLOAD_MAX_PIXELS=2 * 10 ** 6)
+    def test_too_many_pixels_rejected(self):
+        """Картинка больше UPLOAD_MAX_PIXELS не принимается."""
+        response = self.publish(make_upload((1500, 1500)))
+        self.assertFormError(response, 'form', 'image',
+                             'Картинка больше 2 мегапикселей.')
+        self.assertFalse(Post.objects.exists())
+
+    @override_settings(UPLOAD_MAX_BYTES=2 ** 20)
+    def test_too_large_file_rejected(self):
+        """Файл больше UPLOAD_MAX_BYTES не принимается."""
+        upload = SimpleUploadedFile('huge.jpg', b'\xff' * (2 ** 20 + 1))
+        response = self.publish(upload)
+        self.assertFormError(response, 'form', 'image',
+                             'Файл больше 1 МБ.')
+        self.assertFalse(Post.objects.exists())
+
+    @override_settings(UPLOAD_MAX_BYTES=10)
+    def test_handler_stops_writing_after_limit(self):
+        """Сверх лимита загрузка не пишется на диск, но размер известен."""
+        handler = LimitedUploadHandler()
+        handler.new_file('image', 'photo.jpg', 'image/jpeg', None)
+        for start in range(0, 40, 8):
+            handler.receive_data_chunk(b'x' * 8, start)
+        upload = handler.file_complete(40)
+        self.assertEqual(upload.size, 40)
+        self.assertEqual(upload.read(), b'x' * 8)
@@ -0,0 +1,127 @@
+"""Уборка кэша sorl-thumbnail: файлов в cache/ и его хранилища ключей.
+
+Свои варианты картинок сайт режет в posts/thumbnails.py, но sorl
+остаётся в INSTALLED_APPS, и от него в базе и на диске копятся
+миниатюры картинок, которых уже нет. Ключи читаются из таблицы sorl
+пачками по ключу, файлы — каталог за каталогом, поэтому память не
+растёт с размером кэша.
+
+Работать параллельно с сайтом безопасно: удаляются только миниатюры
+исчезнувших исходников, для которых sorl уже ничего не создаст, и
+файлы без ключа старше grace секунд — sorl сохраняет ключ сразу после
+файла.
+"""
+import posixpath
+import time
+
+from sorl.thumbnail import default
+from sorl.thumbnail.conf import settings as sorl_settings
+from sorl.thumbnail.helpers import deserialize
+from sorl.thumbnail.images import ImageFile, deserialize_image_file
+from sorl.thumbnail.kvstores.base import add_prefix, del_prefix
+from sorl.thumbnail.models import KVStore
+
+from .storage import GRACE_SECONDS
+
+BATCH_SIZE = 500
+
+
+def entries(identity, batch_size=BATCH_SIZE):
+    """(ключ без префикса, значение) записей sorl одного вида."""
+    prefix = add_prefix('', identity)
+    last = prefix
+    while True:
+        rows = list(KVStore.objects.filter(
+            key__startswith=prefix, key__gt=last).order_by('key')
+            .values_list('key', 'value')[:batch_size])
+        if not rows:
+            return
+        for key, value in rows:
+            yield del_prefix(key), value
+        last = rows[-1][0]
+
+
+def directories(storage, path):
+    """(каталог, имена файлов) для path и всех вложенных каталогов."""
+    subdirectories, files = storage.listdir(path)
+    yield path, files
+    for name in subdirectories:
+        yield from directories(storage, posixpath.join(path, name))
+
+
+class Cleaner:
+    """Один проход уборки; в totals — сколько удалено или будет удалено."""
+
+    def __init__(self, dry_run=False, grace=GRACE_SECONDS,
+                 batch_size=BATCH_SIZE):
+        self.dry_run = dry_run
+        self.grace = grace
+        self.batch_size = batch_size
+        self.kvstore = default.kvstore
+        self.dropped = set()
+        self.totals = {'keys': 0, 'files': 0, 'bytes': 0}
+
+    def drop(self, key, identity='image'):
+        self.dropped.add((key, identity))
+        self.totals['keys'] += 1
+        if not self.dry_run:
+            self.kvstore._delete(key, identity)
+
+    def remove(self, storage, name):
+        self.totals['files'] += 1
+        self.totals['bytes'] += storage.size(name)
+        if not self.dry_run:
+            storage.delete(name)
+
+    def stale_sources(self):
+        """Миниатюры и ключи исходников, которых больше нет."""
+        for key, value in entries('thumbnails', self.batch_size):
+            source = self.kvstore._get(key)
+            if source is not None and source.exists():
+                continue
+            for thumbnail_key in deserialize(value):
+                thumbnail = self.kvstore._get(thumbnail_key)
+                if thumbnail is None:
+                    continue
+                if thumbnail.exists():
+                    self.remove(thumbnail.storage, thumbnail.name)
+                self.drop(thumbnail_key)
+            if source is not None:
+                self.drop(key)
+            self.drop(key, 'thumbnails')
+
+    def missing_files(self):
+        """Ключи картинок, файлы которых удалены."""
+        for key, value in entries('image', self.batch_size):
+            if (key, 'image') in self.dropped:
+                continue
+            if not deserialize_image_file(value).exists():
+                self.drop(key)
+
+    def unknown_files(self, now):
+        """Файлы в cache/, о которых хранилище ключей не знает."""
+        storage = default.storage
+        if not storage.exists(sorl_settings.THUMBNAIL_PREFIX):
+            return
+        for path, files in directories(
+                storage, sorl_settings.THUMBNAIL_PREFIX.rstrip('/')):
+            if not files:
+                continue
+            names = {ImageFile(posixpath.join(path, name), storage).key:
+                     posixpath.join(path, name) for name in files}
+            known = set(KVStore.objects.filter(
+                key__in=[add_prefix(key) for key in names]).values_list(
+                    'key', flat=True))
+            for key, name in names.items():
+                if add_prefix(key) in known:
+                    continue
+                modified = storage.get_modified_time(name).timestamp()
+                if modified <= now - self.grace:
+                    self.remove(storage, name)
+
+    def run(self):
+        now = time.time()
+        self.stale_sources()
+        self.missing_files()
+        self.unknown_files(now)
+        return self.totals
@@ -0,0 +1,161 @@
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps, features
+
+logger = logging.getLogger(__name__)
+
+# Пропорции карточки 960x339; ширины — для srcset.
+RATIO = 339 / 960
+WIDTHS = (480, 960, 1440)
+FALLBACK_WIDTH = 960
+SIZES = '(max-width: 576px) 100vw, 960px'
+FORMATS = {
+    'jpg': {'format': 'JPEG', 'quality': 82, 'optimize': True,
+            'progressive': True},
+}
+if features.check('webp'):
+    FORMATS['webp'] = {'format': 'WEBP', 'quality': 78, 'method': 4}
+
+_executor = None
+_pending = set()
+_lock = threading.Lock()
+
+
+def content_hash(file):
+    digest = hashlib.sha256()
+    for chunk in file.chunks():
+        digest.update(chunk)
+    file.seek(0)
+    return digest.hexdigest()
+
+
+def variant_name(image_hash, width, ext):
+    # Имя зависит только от содержимого исходника, поэтому файл по нему
+    # никогда не меняется и кэшируется навсегда.
+    return 'thumbnails/%s/%d.%s' % (image_hash, width, ext)
+
+
+def ready_name(image_hash):
+    # Этот вариант сохраняется последним и служит признаком готовности.
+    return variant_name(image_hash, FALLBACK_WIDTH, 'jpg')
+
+
+def _variants():
+    fallback = (FALLBACK_WIDTH, 'jpg')
+    pairs = [(width, ext) for width in WIDTHS for ext in FORMATS]
+    pairs.remove(fallback)
+    return pairs + [fallback]
+
+
+def _write(name, data):
+    """Кладёт вариант точно под именем name.
+
+    default_storage.save при гонке двух воркеров дописал бы к имени
+    случайный суффикс, и лишняя копия осталась бы на диске навсегда.
+    Файл пишется во временный рядом и переименовывается: os.replace
+    атомарен, читатель видит либо прежний вариант, либо новый целиком.
+    """
+    path = default_storage.path(name)
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    with tempfile.NamedTemporaryFile(dir=directory, suffix='.tmp',
+                                     delete=False) as temporary:
+        temporary.write(data)
+    try:
+        os.chmod(temporary.name,
+                 default_storage.file_permissions_mode or 0o644)
+        os.replace(temporary.name, path)
+    except OSError:
+        os.remove(temporary.name)
+        raise
+
+
+def generate(image_name, image_hash):
+    """Создаёт все варианты картинки; возвращает False, если они уже есть."""
+    if default_storage.exists(ready_name(image_hash)):
+        return False
+    with default_storage.open(image_name) as source:
+        image = Image.open(source)
+        image = image.convert('RGB')
+    for width, ext in _variants():
+        name = variant_name(image_hash, width, ext)
+        if default_storage.exists(name):
+            continue
+        variant = ImageOps.fit(image, (width, round(width * RATIO)),
+                               Image.LANCZOS)
+        buffer = BytesIO()
+        variant.save(buffer, **FORMATS[ext])
+        _write(name, buffer.getvalue())
+    return True
+
+
+def _run(image_name, image_hash):
+    try:
+        generate(image_name, image_hash)
+    except Exception:
+        logger.exception('Не удалось создать миниатюры для %s', image_name)
+    finally:
+        with _lock:
+            _pending.discard(image_hash)
+
+
+def _get_executor():
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.THUMBNAIL_WORKERS,
+                thread_name_prefix='thumbnails')
+        return _executor
+
+
+def schedule(image_name, image_hash):
+    """Ставит варианты в очередь; без воркеров создаёт их сразу."""
+    with _lock:
+        if image_hash in _pending:
+            return
+        _pending.add(image_hash)
+    if not settings.THUMBNAIL_WORKERS:
+        _run(image_name, image_hash)
+    else:
+        _get_executor().submit(_run, image_name, image_hash)
+
+
+def is_ready(post):
+    if not post.image or not post.image_hash:
+        return True
+    return default_storage.exists(ready_name(post.image_hash))
+
+
+def srcset(image_hash, ext):
+    return ', '.join(
+        '%s %dw' % (default_storage.url(variant_name(image_hash, width, ext)),
+                    width)
+        for width in WIDTHS
+    )
+
+
+def picture(post):
+    """Данные для <picture> или None, пока варианты создаются в фоне."""
+    if not post.image or not post.image_hash:
+        return None
+    if not is_ready(post):
+        schedule(post.image.name, post.image_hash)
+        # Без воркеров варианты уже созданы внутри schedule().
+        if not is_ready(post):
+            return None
+    return {
+        'src': default_storage.url(ready_name(post.image_hash)),
+        'srcset': srcset(post.image_hash, 'jpg'),
+        'webp_srcset': ('webp' in FORMATS
+                        and srcset(post.image_hash, 'webp')),
+        'sizes': SIZES,
+    }
@@ -0,0 +1,129 @@
+from django.conf import settings
+from django.db.models import Count, Q
+
+from .counters import get_user_counter
+from .models import Follow, Post, TimelineEntry, UserCounter
+from .pagination import POSTS_PER_PAGE
+
+BATCH_SIZE = 500
+
+
+def _pull_authors():
+    """Авторы, чьи записи читаются join-ом, а не из ленты."""
+    return UserCounter.objects.filter(pulled=True).values('user_id')
+
+
+def pull_popular(*author_ids):
+    """Переводит на join авторов, переросших TIMELINE_FANOUT_LIMIT.
+
+    Без author_ids проверяются все авторы. Записи этих авторов уже
+    лежат в лентах, поэтому переход ничего не перекладывает.
+    """
+    counters = UserCounter.objects.filter(
+        pulled=False, followers_count__gt=settings.TIMELINE_FANOUT_LIMIT)
+    if author_ids:
+        counters = counters.filter(user_id__in=author_ids)
+    counters.update(pulled=True)
+
+
+def push_unpopular(*author_ids):
+    """Возвращает в ленты авторов, опустившихся ниже порога с запасом.
+
+    Условное UPDATE выигрывает только один запрос, и записи раскладывает
+    он один.
+    """
+    limit = (settings.TIMELINE_FANOUT_LIMIT
+             - settings.TIMELINE_FANOUT_MARGIN)
+    counters = UserCounter.objects.filter(pulled=True,
+                                          followers_count__lte=limit)
+    if author_ids:
+        counters = counters.filter(user_id__in=author_ids)
+    for user_id in list(counters.values_list('user_id', flat=True)):
+        if UserCounter.objects.filter(user_id=user_id, pulled=True).update(
+                pulled=False):
+            catch_up(user_id)
+
+
+def is_pushed(author):
+    # Счётчик, которого ещё нет, считается по таблицам: без строки автор
+    # выпал бы из _pull_authors при любом числе подписчиков.
+    counter = get_user_counter(author)
+    if (not counter.pulled
+            and counter.followers_count > settings.TIMELINE_FANOUT_LIMIT):
+        pull_popular(author.pk)
+        return False
+    return not counter.pulled
+
+
+def trim(user_ids):
+    """Обрезает ленты, выросшие больше TIMELINE_LENGTH с запасом в 10%."""
+    length = settings.TIMELINE_LENGTH
+    overflowing = TimelineEntry.objects.filter(
+        user_id__in=user_ids
+    ).values('user_id').annotate(total=Count('pk')).filter(
+        total__gt=length + length // 10
+    ).values_list('user_id', flat=True)
+    for user_id in list(overflowing):
+        entries = TimelineEntry.objects.filter(user_id=user_id)
+        oldest_kept = entries.order_by('-pub_date', '-pk').values_list(
+            'pub_date', flat=True)[length - 1]
+        entries.filter(pub_date__lt=oldest_kept).delete()
+
+
+def fan_out(*posts):
+    """Раскладывает записи одного автора по лентам подписчиков."""
+    author = posts[0].author
+    if not is_pushed(author):
+        return
+    followers = list(Follow.objects.filter(
+        author=author).values_list('user_id', flat=True))
+    TimelineEntry.objects.bulk_create([
+        TimelineEntry(user_id=user_id, post=post, pub_date=post.pub_date)
+        for user_id in followers
+        for post in posts
+    ], batch_size=BATCH_SIZE, ignore_conflicts=True)
+    trim(followers)
+
+
+def catch_up(author_id):
+    """Раскладывает свежие записи автора, вернувшегося в ленты.
+
+    Пока автор читался join-ом, его записи в ленты не попадали. Каждому
+    подписчику достаточно первой страницы: более старые записи этого
+    времени в ленте уже не появятся, зато переход стоит не больше
+    POSTS_PER_PAGE строк на подписчика.
+    """
+    posts = list(Post.objects.filter(author_id=author_id).select_related(
+        'author').order_by('-pub_date')[:POSTS_PER_PAGE])
+    if posts:
+        fan_out(*posts)
+
+
+def backfill(user_id, *author_ids):
+    pulled = set(_pull_authors().filter(
+        user_id__in=author_ids).values_list('user_id', flat=True))
+    pushed = [author_id for author_id in author_ids
+              if author_id not in pulled]
+    if not pushed:
+        return
+    # Лента всё равно хранит только TIMELINE_LENGTH новых записей.
+    posts = Post.objects.filter(author_id__in=pushed).order_by(
+        '-pub_date')[:settings.TIMELINE_LENGTH]
+    TimelineEntry.objects.bulk_create([
+        TimelineEntry(user_id=user_id, post_id=pk, pub_date=pub_date)
+        for pk, pub_date in posts.values_list('pk', 'pub_date')
+    ], batch_size=BATCH_SIZE, ignore_conflicts=True)
+    trim([user_id])
+
+
+def prune(user_id, *author_ids):
+    TimelineEntry.objects.filter(user_id=user_id,
+                                 post__author_id__in=author_ids).delete()
+
+
+def feed_for(user):
+    pushed = TimelineEntry.objects.filter(user=user).values('post_id')
+    pulled = Follow.objects.filter(
+        user=user, author_id__in=_pull_authors()).values('author_id')
+    return Post.objects.for_feed().filter(
+        Q(pk__in=pushed) | Q(author_id__in=pulled))
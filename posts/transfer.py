@@ -0,0 +1,244 @@
+"""Потоковые выгрузка и загрузка содержимого в NDJSON.
+
+Одна строка — один объект: {"model": ..., поля}. Связи записываются
+естественными ключами (имя пользователя, slug группы) и исходными pk
+записей и комментариев, которые при загрузке сохраняются. Таблицы
+читаются пачками по pk (keyset), а не одним запросом, поэтому память
+не растёт с размером базы и долгий курсор не держит чтение SQLite.
+
+Загрузка пишет пачками через bulk_create. Строки, уже загруженные
+раньше, пропускаются, поэтому после сбоя можно продолжить с
+контрольной точки; если pk записи или комментария занят другим
+объектом, загрузка останавливается с TransferError. Счётчики, ленты
+подписок и поисковый индекс пересчитываются один раз в конце.
+"""
+import json
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Case, When
+from django.utils.dateparse import parse_datetime
+
+from . import counters, search, timeline
+from .models import Comment, Follow, Group, Post, UserCounter
+from .pagination import forget_count
+
+User = get_user_model()
+
+BATCH_SIZE = 1000
+
+
+class TransferError(Exception):
+    pass
+
+
+EXPORTS = {
+    'group': (Group, ('slug', 'title', 'description')),
+    'user': (User, ('username', 'first_name', 'last_name', 'email',
+                    'date_joined')),
+    'post': (Post, ('text', 'pub_date', 'updated', 'author__username',
+                    'group__slug', 'image', 'image_hash')),
+    'comment': (Comment, ('post_id', 'author__username', 'text',
+                          'created')),
+    'follow': (Follow, ('user__username', 'author__username')),
+}
+
+
+def keyset(queryset, fields, batch_size=BATCH_SIZE):
+    """Строки values() пачками по возрастанию pk."""
+    last = 0
+    while True:
+        rows = list(queryset.filter(pk__gt=last).order_by('pk').values(
+            'pk', *fields)[:batch_size])
+        if not rows:
+            return
+        yield rows
+        last = rows[-1]['pk']
+
+
+def _encode(model, row):
+    data = {'model': model}
+    for name, value in row.items():
+        if hasattr(value, 'isoformat'):
+            value = value.isoformat()
+        data[name.replace('__', '_')] = value
+    return json.dumps(data, ensure_ascii=False)
+
+
+def export(output, batch_size=BATCH_SIZE):
+    """Пишет все объекты в output; возвращает {модель: число строк}."""
+    totals = {}
+    for name, (model, fields) in EXPORTS.items():
+        totals[name] = 0
+        for rows in keyset(model.objects.all(), fields, batch_size):
+            output.write(''.join(_encode(name, row) + '\n' for row in rows))
+            totals[name] += len(rows)
+    return totals
+
+
+def _by_key(model, field, values):
+    return dict(model.objects.filter(**{f'{field}__in': set(values)})
+                .values_list(field, 'pk'))
+
+
+def _fresh(model, rows, fields, row_key):
+    """Строки, pk которых ещё свободен.
+
+    Объект с тем же pk и теми же fields (row_key(row)) загружен прошлым
+    запуском и пропускается. Объект с другими значениями — чужой: молча
+    пропустить строку значит потерять её и повесить на чужую запись её
+    комментарии, поэтому это ошибка.
+    """
+    existing = {pk: tuple(values) for pk, *values in model.objects.filter(
+        pk__in=[row['pk'] for row in rows]).values_list('pk', *fields)}
+    fresh = []
+    for row in rows:
+        if row['pk'] not in existing:
+            fresh.append(row)
+        elif existing[row['pk']] != row_key(row):
+            raise TransferError(
+                f'{model._meta.model_name} pk={row["pk"]} уже занят '
+                f'другим объектом')
+    return fresh
+
+
+def _restore_dates(model, rows, *fields):
+    # bulk_create ставит auto_now_add и auto_now в текущее время;
+    # исходные даты возвращаются одним UPDATE на пачку.
+    model.objects.filter(pk__in=[row['pk'] for row in rows]).update(**{
+        field: Case(*[When(pk=row['pk'], then=parse_datetime(row[field]))
+                      for row in rows])
+        for field in fields
+    })
+
+
+def _load_groups(rows):
+    Group.objects.bulk_create([
+        Group(slug=row['slug'], title=row['title'],
+              description=row['description'])
+        for row in rows
+    ], ignore_conflicts=True)
+
+
+def _load_users(rows):
+    users = [User(username=row['username'], first_name=row['first_name'],
+                  last_name=row['last_name'], email=row['email'],
+                  date_joined=parse_datetime(row['date_joined']))
+             for row in rows]
+    for user in users:
+        user.set_unusable_password()
+    User.objects.bulk_create(users, ignore_conflicts=True)
+
+
+def _load_posts(rows):
+    authors = _by_key(User, 'username',
+                      [row['author_username'] for row in rows])
+    groups = _by_key(Group, 'slug', [row['group_slug'] for row in rows
+                                     if row['group_slug']])
+    rows = _fresh(Post, rows, ('author_id', 'text'), lambda row: (
+        authors[row['author_username']], row['text']))
+    if not rows:
+        return
+    Post.objects.bulk_create([
+        Post(pk=row['pk'], text=row['text'],
+             author_id=authors[row['author_username']],
+             group_id=groups.get(row['group_slug']),
+             image=row['image'] or '', image_hash=row['image_hash'])
+        for row in rows
+    ])
+    _restore_dates(Post, rows, 'pub_date', 'updated')
+
+
+def _load_comments(rows):
+    authors = _by_key(User, 'username',
+                      [row['author_username'] for row in rows])
+    rows = _fresh(Comment, rows, ('post_id', 'author_id', 'text'),
+                  lambda row: (row['post_id'],
+                               authors[row['author_username']], row['text']))
+    if not rows:
+        return
+    Comment.objects.bulk_create([
+        Comment(pk=row['pk'], post_id=row['post_id'],
+                author_id=authors[row['author_username']],
+                text=row['text'])
+        for row in rows
+    ])
+    _restore_dates(Comment, rows, 'created')
+
+
+def _load_follows(rows):
+    users = _by_key(User, 'username', [
+        name for row in rows
+        for name in (row['user_username'], row['author_username'])])
+    Follow.objects.bulk_create([
+        Follow(user_id=users[row['user_username']],
+               author_id=users[row['author_username']])
+        for row in rows
+    ], ignore_conflicts=True)
+
+
+LOADERS = {
+    'group': _load_groups,
+    'user': _load_users,
+    'post': _load_posts,
+    'comment': _load_comments,
+    'follow': _load_follows,
+}
+
+
+def _batches(lines, start, batch_size):
+    """(номер последней строки, модель, строки) пачками одной модели."""
+    model, rows, number = None, [], 0
+    for number, line in enumerate(lines, 1):
+        if number <= start or not line.strip():
+            continue
+        row = json.loads(line)
+        if rows and (row['model'] != model or len(rows) >= batch_size):
+            yield number - 1, model, rows
+            rows = []
+        model = row.pop('model')
+        rows.append(row)
+    if rows:
+        yield number, model, rows
+
+
+def load(lines, start=0, batch_size=BATCH_SIZE, checkpoint=None):
+    """Загружает строки после start-й.
+
+    checkpoint(number) вызывается после каждой записанной пачки с
+    номером её последней строки. Возвращает {модель: число строк}.
+    """
+    totals = dict.fromkeys(LOADERS, 0)
+    for number, model, rows in _batches(lines, start, batch_size):
+        with transaction.atomic():
+            LOADERS[model](rows)
+        totals[model] += len(rows)
+        if checkpoint is not None:
+            checkpoint(number)
+    return totals
+
+
+def rebuild_timelines(batch_size=BATCH_SIZE):
+    """Ленты подписок всех читателей заново по таблице подписок."""
+    readers = User.objects.filter(follower__isnull=False).distinct()
+    for rows in keyset(readers, (), batch_size):
+        for row in rows:
+            author_ids = Follow.objects.filter(
+                user_id=row['pk']).values_list('author_id', flat=True)
+            timeline.backfill(row['pk'], *author_ids)
+
+
+def finish():
+    """Пересчёт всего, что при обычной записи делают сигналы."""
+    for rows in keyset(User.objects.filter(counter__isnull=True), ()):
+        UserCounter.objects.bulk_create(
+            [UserCounter(user_id=row['pk']) for row in rows],
+            ignore_conflicts=True)
+    counters.repair_user_counters()
+    counters.repair_post_counters()
+    timeline.pull_popular()
+    timeline.push_unpopular()
+    rebuild_timelines()
+    search.get_backend().rebuild()
+    forget_count('index', *('group:%d' % pk for pk in
+                            Group.objects.values_list('pk', flat=True)))
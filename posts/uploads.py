@@ -0,0 +1,103 @@
+"""Подготовка загруженных картинок перед сохранением.
+
+Загрузка пишется во временный файл кусками (LimitedUploadHandler), а
+не собирается в памяти; сверх UPLOAD_MAX_BYTES на диск ничего не
+пишется. Картинка больше UPLOAD_MAX_PIXELS отклоняется до
+декодирования. Остальные поворачиваются по тегу EXIF, уменьшаются до
+UPLOAD_MAX_SIDE по длинной стороне и перекодируются без EXIF: в
+хранилище попадает компактный исходник, и миниатюры потом декодируют
+его, а не многомегапиксельный оригинал.
+"""
+import os
+import tempfile
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.files import File
+from django.core.files.uploadhandler import TemporaryFileUploadHandler
+from PIL import Image, ImageOps
+
+MASTER_FORMATS = {
+    'JPEG': {'quality': 85, 'optimize': True, 'progressive': True},
+    'PNG': {'optimize': True},
+    'WEBP': {'quality': 85, 'method': 4},
+    'GIF': {'optimize': True},
+}
+EXTENSIONS = {'JPEG': '.jpg', 'PNG': '.png', 'WEBP': '.webp', 'GIF': '.gif'}
+
+
+class LimitedUploadHandler(TemporaryFileUploadHandler):
+    """Временный файл без данных сверх UPLOAD_MAX_BYTES.
+
+    Лишние куски читаются из запроса и отбрасываются, size у файла —
+    настоящий размер загрузки, по нему check_size и отклоняет файл.
+    """
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.received = 0
+
+    def receive_data_chunk(self, raw_data, start):
+        self.received += len(raw_data)
+        if self.received <= settings.UPLOAD_MAX_BYTES:
+            self.file.write(raw_data)
+
+    def file_complete(self, file_size):
+        self.file.seek(0)
+        self.file.size = file_size
+        return self.file
+
+
+def check_size(upload):
+    if upload.size > settings.UPLOAD_MAX_BYTES:
+        raise ValidationError(
+            'Файл больше %(limit)s МБ.', code='file_too_large',
+            params={'limit': settings.UPLOAD_MAX_BYTES // 2 ** 20})
+
+
+def _master_format(image, source_format):
+    if source_format in MASTER_FORMATS:
+        return source_format
+    has_alpha = (image.mode in ('RGBA', 'LA', 'PA')
+                 or 'transparency' in image.info)
+    return 'PNG' if has_alpha else 'JPEG'
+
+
+def _master_name(upload, master_format, source_format):
+    name = os.path.basename(upload.name)
+    if master_format == source_format:
+        return name
+    return os.path.splitext(name)[0] + EXTENSIONS[master_format]
+
+
+def prepare(upload):
+    """Проверяет число пикселей и возвращает перекодированный исходник."""
+    upload.seek(0)
+    image = Image.open(upload)
+    width, height = image.size
+    if width * height > settings.UPLOAD_MAX_PIXELS:
+        raise ValidationError(
+            'Картинка больше %(limit)s мегапикселей.', code='too_many_pixels',
+            params={'limit': settings.UPLOAD_MAX_PIXELS // 10 ** 6})
+    if getattr(image, 'is_animated', False):
+        # Анимацию не пересобираем: ориентации EXIF у GIF нет.
+        upload.seek(0)
+        return upload
+    source_format = image.format
+    scale = min(1, settings.UPLOAD_MAX_SIDE / max(width, height))
+    # JPEG декодируется сразу в уменьшенном в 2–8 раз виде.
+    image.draft(image.mode, (max(1, int(width * scale)),
+                             max(1, int(height * scale))))
+    image = ImageOps.exif_transpose(image)
+    image.thumbnail((settings.UPLOAD_MAX_SIDE, settings.UPLOAD_MAX_SIDE),
+                    Image.LANCZOS)
+    master_format = _master_format(image, source_format)
+    if master_format == 'JPEG' and image.mode not in ('RGB', 'L'):
+        image = image.convert('RGB')
+    output = tempfile.SpooledTemporaryFile(
+        max_size=settings.FILE_UPLOAD_MAX_MEMORY_SIZE)
+    # exif не передаётся, поэтому в файл он не попадает.
+    image.save(output, master_format, **MASTER_FORMATS[master_format])
+    output.seek(0)
+    return File(output, name=_master_name(upload, master_format,
+                                          source_format))
@@ -12,6 +12,8 @@ urlpatterns = [
     path('group/<slug:slug>/', views.group_posts, name='group'),
     path('follow/', views.follow_index, name='follow_index'),
     path('new/', views.new_post, name='new_post'),
+    path('search/', views.search, name='search'),
+    path('metrics/', views.server_metrics, name='metrics'),
     path('<str:username>/', views.profile, name='profile'),
     path('<str:username>/<int:post_id>/', views.post_view, name='post'),
     path(
@@ -21,6 +23,8 @@ urlpatterns = [
     ),
     path('<str:username>/<int:post_id>/comment/',
          views.add_comment, name='add_comment'),
+    path('<str:username>/<int:post_id>/comments/',
+         views.post_comments, name='comments'),
     path('<str:username>/follow/', views.profile_follow,
          name='profile_follow'),
     path('<str:username>/unfollow/', views.profile_unfollow,
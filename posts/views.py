@@ -1,35 +1,75 @@
+import hmac
+
 from django.contrib.auth import get_user_model
+from django.conf import settings
 from django.contrib.auth.decorators import login_required
 from django.core.paginator import Paginator
+from django.http import Http404, HttpResponse, JsonResponse
 from django.shortcuts import get_object_or_404, redirect, render
+from django.urls import reverse
+from django.utils.http import urlencode
+
+from yatube.replicas import read_from_replica
+from yatube.sqlite import serialize_writes
 
+from . import metrics, timeline
+from .authors import author_card, card_version
+from .conditional import render_page
 from .forms import PostForm, CommentForm
 from .models import Group, Post, Follow
+from .pagination import (POSTS_PER_PAGE, comment_page, feed_count,
+                         page_window, paginate)
+from .search import search as search_posts
 
 User = get_user_model()
 
 
+def _total(paginator):
+    # У курсорных страниц нет общего числа записей.
+    return getattr(paginator, 'count', None)
+
+
+@read_from_replica
 def index(request):
-    post_list = Post.objects.all()
-    paginator = Paginator(post_list, 10)
-    page_number = request.GET.get('page')
-    page = paginator.get_page(page_number)
-    return render(request, 'index.html', {'page': page,
-                                          'paginator': paginator, })
+    post_list = Post.objects.for_feed()
+    paginator, page = paginate(
+        request, post_list, count=lambda: feed_count(post_list, 'index'))
+    return render_page(request, 'index.html', {'page': page,
+                                               'paginator': paginator, },
+                       page.object_list, _total(paginator), max_age=20)
 
 
+@read_from_replica
 def group_posts(request, slug):
     group = get_object_or_404(Group, slug=slug)
-    posts = group.posts.all()
-    paginator = Paginator(posts, 10)
-    page_number = request.GET.get('page')
-    page = paginator.get_page(page_number)
-    return render(request, 'group.html', {'group': group, 'posts': posts,
-                                          'page': page,
-                                          'paginator': paginator, })
+    posts = group.posts.for_feed()
+    paginator, page = paginate(
+        request, posts,
+        count=lambda: feed_count(posts, 'group:%d' % group.pk))
+    return render_page(request, 'group.html', {'group': group,
+                                               'posts': posts,
+                                               'page': page,
+                                               'paginator': paginator, },
+                       page.object_list, _total(paginator), group.title,
+                       group.description, max_age=60)
+
+
+def search(request):
+    query = request.GET.get('q', '').strip()
+    paginator = Paginator(search_posts(query) if query else [],
+                          POSTS_PER_PAGE)
+    page = paginator.get_page(request.GET.get('page'))
+    page.window = page_window(page)
+    return render(request, 'posts/search.html', {
+        'query': query,
+        'page': page,
+        'paginator': paginator,
+        'params': urlencode({'q': query}),
+    })
 
 
 @login_required
+@serialize_writes(methods=('POST',))
 def new_post(request):
     form = PostForm(request.POST or None, files=request.FILES or None)
     if request.method == 'POST' and form.is_valid():
@@ -40,44 +80,74 @@ def new_post(request):
     return render(request, 'posts/new.html', {'form': form})
 
 
+@read_from_replica
 def profile(request, username):
-    user = get_object_or_404(User, username=username)
-    following = request.user.is_authenticated and Follow.objects.filter(
-        user=request.user, author=user).exists()
-    posts = user.posts.all()
-    post_count = user.posts.count()
-    paginator = Paginator(posts, 10)
-    page_number = request.GET.get('page')
-    page = paginator.get_page(page_number)
+    card = author_card(username, request.user)
+    posts = card['user_name'].posts.for_feed()
+    paginator, page = paginate(request, posts, count=card['count'])
     context = {
         'page': page,
-        'count': post_count,
-        'user_name': user,
         'paginator': paginator,
-        'following': following,
+        **card,
     }
-    return render(request, 'posts/profile.html', context)
+    return render_page(request, 'posts/profile.html', context,
+                       page.object_list, card_version(card), max_age=60)
 
 
+@read_from_replica
 def post_view(request, username, post_id):
-    post = get_object_or_404(Post, pk=post_id, author__username=username)
-    following = request.user.is_authenticated and Follow.objects.filter(
-        user=request.user, author=post.author).exists()
-    post_count = post.author.posts.count()
-    comments = post.comments.all()
+    post = get_object_or_404(Post.objects.for_feed(), pk=post_id,
+                             author__username=username)
+    comments = post.comments.select_related('author')
+    order, page = comment_page(post, request.GET)
     form = CommentForm()
+    card = author_card(username, request.user)
     context = {
-        'user_name': post.author,
         'post': post,
-        'count': post_count,
         'comments': comments,
+        'comment_page': page,
+        'comment_order': order,
         'form': form,
-        'following': following,
+        **card,
     }
-    return render(request, 'posts/post.html', context)
+    return render_page(request, 'posts/post.html', context, [post],
+                       card_version(card), max_age=60)
+
+
+@read_from_replica
+def post_comments(request, username, post_id):
+    """Следующая порция комментариев: HTML-фрагмент или ?format=json."""
+    post = get_object_or_404(Post.objects.select_related('author'),
+                             pk=post_id, author__username=username)
+    order, page = comment_page(post, request.GET)
+    as_json = request.GET.get('format') == 'json'
+    next_url = None
+    if page.has_next():
+        params = {'order': order, 'cursor': page.next_cursor}
+        if as_json:
+            params['format'] = 'json'
+        next_url = '%s?%s' % (
+            reverse('posts:comments', args=[username, post_id]),
+            urlencode(params))
+    if as_json:
+        return JsonResponse({
+            'comments': [{
+                'id': comment.pk,
+                'author': comment.author.username,
+                'text': comment.text,
+                'created': comment.created.isoformat(),
+            } for comment in page.object_list],
+            'next': next_url,
+        })
+    return render(request, 'posts/includes/comment_list.html', {
+        'post': post,
+        'comment_page': page,
+        'comment_order': order,
+    })
 
 
 @login_required
+@serialize_writes(methods=('POST',))
 def post_edit(request, username, post_id):
     post = get_object_or_404(Post, pk=post_id, author__username=username)
     if request.user != post.author:
@@ -105,7 +175,28 @@ def server_error(request):
     return render(request, "misc/500.html", status=500)
 
 
+def _has_metrics_token(request):
+    # Адрес клиента за прокси не говорит, откуда пришёл запрос, поэтому
+    # сборщик метрик предъявляет METRICS_TOKEN в заголовке Authorization.
+    token = settings.METRICS_TOKEN
+    if not token:
+        return False
+    return hmac.compare_digest(request.META.get('HTTP_AUTHORIZATION', ''),
+                               f'Bearer {token}')
+
+
+def server_metrics(request):
+    """Гистограммы posts/metrics.py для сборщика метрик."""
+    if not (request.user.is_staff or _has_metrics_token(request)):
+        raise Http404
+    metrics.flush()
+    return HttpResponse(metrics.exposition(metrics.collect()),
+                        content_type='text/plain; version=0.0.4; '
+                                     'charset=utf-8')
+
+
 @login_required
+@serialize_writes(methods=('POST',))
 def add_comment(request, username, post_id):
     post = get_object_or_404(Post, pk=post_id, author__username=username)
     form = CommentForm(request.POST)
@@ -118,16 +209,19 @@ def add_comment(request, username, post_id):
 
 
 @login_required
+@read_from_replica
 def follow_index(request):
-    posts = Post.objects.filter(author__following__user=request.user)
-    paginator = Paginator(posts, 10)
-    page_number = request.GET.get('page')
-    page = paginator.get_page(page_number)
-    return render(request, 'posts/follow.html', {'page': page,
-                                                 'paginator': paginator})
+    posts = timeline.feed_for(request.user)
+    paginator, page = paginate(request, posts)
+    following = list(Follow.objects.filter(
+        user=request.user).values_list('author_id', flat=True))
+    return render_page(request, 'posts/follow.html', {'page': page,
+                                                      'paginator': paginator},
+                       page.object_list, _total(paginator), following)
 
 
 @login_required
+@serialize_writes
 def profile_follow(request, username):
     user = get_object_or_404(User, username=username)
     if request.user != user:
@@ -136,6 +230,7 @@ def profile_follow(request, username):
 
 
 @login_required
+@serialize_writes
 def profile_unfollow(request, username):
     user = get_object_or_404(User, username=username)
     if request.user != user:
@@ -0,0 +1,73 @@
+"""Чтение лент с реплик базы.
+
+Реплики перечислены в REPLICA_DATABASES. На реплику идут только чтения
+внутри view, помеченных read_from_replica; всё остальное, и любая
+запись, — в default. Кто только что что-то записал, несколько секунд
+читает с default (cookie от ReplicaPinningMiddleware), чтобы увидеть
+свою запись, даже если реплика ещё отстаёт.
+"""
+import functools
+import random
+import threading
+
+from django.conf import settings
+
+PIN_COOKIE = 'pin_primary'
+PRIMARY = 'default'
+
+_state = threading.local()
+
+
+def read_from_replica(view):
+    @functools.wraps(view)
+    def wrapper(request, *args, **kwargs):
+        # Пользователь загружается с default до включения реплики:
+        # только что созданного аккаунта на ней может ещё не быть.
+        user = getattr(request, 'user', None)
+        if user is not None:
+            user.is_authenticated
+        _state.replica = True
+        try:
+            return view(request, *args, **kwargs)
+        finally:
+            _state.replica = False
+    return wrapper
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if (getattr(_state, 'replica', False)
+                and not getattr(_state, 'pinned', False)
+                and settings.REPLICA_DATABASES):
+            return random.choice(settings.REPLICA_DATABASES)
+        return None
+
+    def db_for_write(self, model, **hints):
+        _state.wrote = True
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Реплики — копии default, объекты с них можно связывать.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Схему реплики получают копированием с default.
+        return db not in settings.REPLICA_DATABASES
+
+
+class ReplicaPinningMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        _state.pinned = PIN_COOKIE in request.COOKIES
+        _state.wrote = False
+        try:
+            response = self.get_response(request)
+        finally:
+            _state.pinned = False
+        if _state.wrote and settings.REPLICA_DATABASES:
+            response.set_cookie(PIN_COOKIE, '1',
+                                max_age=settings.REPLICA_PIN_SECONDS,
+                                httponly=True, samesite='Lax')
+        return response
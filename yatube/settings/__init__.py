@@ -0,0 +1,11 @@
+"""Профиль настроек выбирается переменной окружения YATUBE_ENV.
+
+dev (по умолчанию) — для разработки, с DEBUG и debug toolbar;
+prod — для сервера.
+"""
+import os
+
+if os.environ.get('YATUBE_ENV', 'dev') == 'prod':
+    from .prod import *  # noqa: F401, F403
+else:
+    from .dev import *  # noqa: F401, F403
@@ -0,0 +1,237 @@
+"""Настройки, общие для профилей dev и prod."""
+import os
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))))
+
+
+SECRET_KEY = os.environ.get(
+    'YATUBE_SECRET_KEY', '1+35b)qbvgpzxecl%2zlrd!^1=5ok9sonkqi_m%zu9ee%*0the')
+
+
+DEBUG = False
+
+
+ALLOWED_HOSTS = [
+    'localhost',
+    '127.0.0.1',
+    '[::1]',
+    'testserver',
+]
+
+
+INSTALLED_APPS = [
+    'users',
+    'posts.apps.PostsConfig',
+    'about',
+    'django.contrib.sites',
+    'django.contrib.flatpages',
+    'django.contrib.admin',
+    'django.contrib.auth',
+    'django.contrib.contenttypes',
+    'django.contrib.sessions',
+    'django.contrib.messages',
+    'django.contrib.staticfiles',
+    'sorl.thumbnail',
+    'rest_framework',
+    'rest_framework.authtoken',
+    'api',
+]
+
+MIDDLEWARE = [
+    'posts.middleware.MetricsMiddleware',
+    'yatube.replicas.ReplicaPinningMiddleware',
+    'django.middleware.security.SecurityMiddleware',
+    'django.contrib.sessions.middleware.SessionMiddleware',
+    'django.middleware.common.CommonMiddleware',
+    'django.middleware.csrf.CsrfViewMiddleware',
+    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'django.contrib.messages.middleware.MessageMiddleware',
+    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+]
+
+ROOT_URLCONF = 'yatube.urls'
+
+TEMPLATES_DIR = os.path.join(BASE_DIR, 'templates')
+TEMPLATES = [
+    {
+        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'DIRS': [TEMPLATES_DIR],
+        'APP_DIRS': True,
+        'OPTIONS': {
+            'context_processors': [
+                'django.template.context_processors.debug',
+                'django.template.context_processors.request',
+                'django.contrib.auth.context_processors.auth',
+                'django.contrib.messages.context_processors.messages',
+            ],
+        },
+    },
+]
+
+WSGI_APPLICATION = 'yatube.wsgi.application'
+
+
+# Обёртка над django.db.backends.sqlite3: транзакции начинаются с
+# BEGIN IMMEDIATE (yatube/sqlite_backend).
+DATABASES = {
+    'default': {
+        'ENGINE': 'yatube.sqlite_backend',
+        'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
+    }
+}
+
+# Реплики только для чтения — копии основной базы, пути к файлам через
+# запятую в YATUBE_REPLICAS. Ленты читаются с них (yatube/replicas.py),
+# а написавший что-то пользователь REPLICA_PIN_SECONDS секунд читает
+# с default.
+REPLICA_DATABASES = []
+for number, path in enumerate(
+        filter(None, os.environ.get('YATUBE_REPLICAS', '').split(',')), 1):
+    DATABASES[f'replica{number}'] = {
+        'ENGINE': 'yatube.sqlite_backend',
+        'NAME': path,
+        'TEST': {'MIRROR': 'default'},
+    }
+    REPLICA_DATABASES.append(f'replica{number}')
+DATABASE_ROUTERS = ['yatube.replicas.ReplicaRouter']
+REPLICA_PIN_SECONDS = 5
+
+# PRAGMA, выполняемые на каждом новом соединении с SQLite
+# (yatube/sqlite.py). WAL не блокирует чтение на время записи;
+# busy_timeout — сколько миллисекунд ждать чужую запись, прежде чем
+# вернуть «database is locked»; synchronous=NORMAL в режиме WAL теряет
+# при сбое питания только последние транзакции, но не портит базу;
+# mmap читает страницы без копирования; cache_size в КиБ со знаком минус.
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'busy_timeout': 5000,
+    'synchronous': 'NORMAL',
+    'mmap_size': 256 * 1024 * 1024,
+    'cache_size': -64 * 1024,
+    'temp_store': 'MEMORY',
+}
+
+# Запись, упавшая с «database is locked», повторяется до
+# WRITE_RETRIES раз с паузой WRITE_RETRY_DELAY секунд, удваивающейся
+# с каждой попыткой.
+WRITE_RETRIES = 5
+WRITE_RETRY_DELAY = 0.05
+
+
+AUTH_PASSWORD_VALIDATORS = [
+    {
+        'NAME': 'django.contrib.auth.password_validation.'
+                'UserAttributeSimilarityValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.'
+                'MinimumLengthValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.'
+                'CommonPasswordValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.'
+                'NumericPasswordValidator',
+    },
+]
+
+
+LANGUAGE_CODE = 'ru'
+
+TIME_ZONE = 'UTC'
+
+USE_I18N = True
+
+USE_L10N = True
+
+USE_TZ = True
+
+SITE_ID = 1
+
+STATIC_URL = '/static/'
+STATIC_ROOT = os.path.join(BASE_DIR, "static")
+
+
+MEDIA_URL = '/media/'
+MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+
+
+LOGIN_URL = '/auth/login/'
+LOGIN_REDIRECT_URL = 'posts:index'
+LOGOUT_REDIRECT_URL = 'posts:index'
+
+
+EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
+EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
+
+# Общий для всех воркеров кэш; backend и расположение меняются через
+# окружение, например YATUBE_CACHE_BACKEND=...memcached.MemcachedCache.
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get(
+            'YATUBE_CACHE_BACKEND',
+            'django.core.cache.backends.filebased.FileBasedCache'),
+        'LOCATION': os.environ.get(
+            'YATUBE_CACHE_LOCATION', os.path.join(BASE_DIR, 'cache')),
+        'OPTIONS': {
+            'MAX_ENTRIES': 10000,
+        },
+    }
+}
+
+# Длина материализованной ленты подписок и порог подписчиков, после
+# которого записи автора не раскладываются по лентам, а читаются join-ом.
+# Обратно автор переходит, только потеряв ещё TIMELINE_FANOUT_MARGIN
+# подписчиков, чтобы не переключаться на каждой подписке у порога.
+TIMELINE_LENGTH = 500
+TIMELINE_FANOUT_LIMIT = 1000
+TIMELINE_FANOUT_MARGIN = 100
+
+# Потоки фоновой нарезки миниатюр; 0 — нарезать сразу в запросе.
+THUMBNAIL_WORKERS = 2
+
+# Загрузки пишутся во временный файл, не больше UPLOAD_MAX_BYTES;
+# картинки больше UPLOAD_MAX_PIXELS не принимаются, остальные ужимаются
+# до UPLOAD_MAX_SIDE по длинной стороне (posts/uploads.py).
+FILE_UPLOAD_HANDLERS = ['posts.uploads.LimitedUploadHandler']
+UPLOAD_MAX_BYTES = 10 * 1024 * 1024
+UPLOAD_MAX_PIXELS = 40 * 10 ** 6
+UPLOAD_MAX_SIDE = 2560
+
+# Полнотекстовый поиск: FtsBackend работает только на SQLite с FTS5,
+# для других СУБД — posts.search.ScanBackend.
+SEARCH_BACKEND = 'posts.search.FtsBackend'
+
+# Сколько объектов можно создать одним пакетным запросом API.
+API_BULK_LIMIT = 100
+
+# Сколько секунд кэшировать карточку автора; 0 — не кэшировать.
+AUTHOR_CARD_TIMEOUT = 0
+
+# Замеры запросов (posts/metrics.py): доля запросов с замером SQL,
+# шаблонов и кэша, порог записи в лог медленного запроса (None —
+# не писать) и как часто процесс сбрасывает гистограммы в общий кэш.
+METRICS_ENABLED = True
+METRICS_SAMPLE_RATE = 0.1
+METRICS_SLOW_REQUEST_MS = 500
+METRICS_FLUSH_INTERVAL = 10
+# Токен сборщика для /metrics/ (Authorization: Bearer <токен>); без него
+# страница доступна только сотрудникам.
+METRICS_TOKEN = None
+
+INTERNAL_IPS = [
+    "127.0.0.1",
+] 
+
+REST_FRAMEWORK = {        
+        'DEFAULT_PERMISSION_CLASSES': [
+            'rest_framework.permissions.IsAuthenticated', 
+        ],
+    
+        'DEFAULT_AUTHENTICATION_CLASSES': [
+            'rest_framework.authentication.TokenAuthentication',
+        ]
+    }
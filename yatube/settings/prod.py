@@ -0,0 +1,34 @@
+import os
+
+from django.core.exceptions import ImproperlyConfigured
+
+from .base import *  # noqa: F401, F403
+from .base import DATABASES, TEMPLATES
+
+DEBUG = False
+
+if 'YATUBE_SECRET_KEY' not in os.environ:
+    raise ImproperlyConfigured('Задайте YATUBE_SECRET_KEY для профиля prod')
+
+ALLOWED_HOSTS = os.environ.get(
+    'YATUBE_ALLOWED_HOSTS', 'localhost,127.0.0.1').split(',')
+
+# Соединения с базой и репликами живут между запросами, а не
+# открываются заново на каждый.
+for database in DATABASES.values():
+    database['CONN_MAX_AGE'] = int(
+        os.environ.get('YATUBE_CONN_MAX_AGE', 600))
+
+# Шаблоны компилируются один раз на процесс. С явными loaders APP_DIRS
+# должен быть выключен, шаблоны приложений ищет app_directories.Loader.
+TEMPLATES[0]['APP_DIRS'] = False
+TEMPLATES[0]['OPTIONS']['loaders'] = [
+    ('django.template.loaders.cached.Loader', [
+        'django.template.loaders.filesystem.Loader',
+        'django.template.loaders.app_directories.Loader',
+    ]),
+]
+
+METRICS_SAMPLE_RATE = float(os.environ.get('YATUBE_METRICS_SAMPLE_RATE',
+                                           0.01))
+METRICS_TOKEN = os.environ.get('YATUBE_METRICS_TOKEN')
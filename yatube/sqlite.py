@@ -0,0 +1,55 @@
+import functools
+import random
+import threading
+import time
+
+from django.conf import settings
+from django.db import OperationalError, transaction
+
+_write_lock = threading.Lock()
+
+
+def set_pragmas(sender, connection, **kwargs):
+    """Обработчик connection_created: PRAGMA из SQLITE_PRAGMAS."""
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for name, value in settings.SQLITE_PRAGMAS.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
+
+
+def is_locked(error):
+    return 'locked' in str(error)
+
+
+def serialize_writes(view=None, *, methods=None):
+    """Выполняет пишущий view по одному на процесс и с повтором.
+
+    SQLite пропускает только одного писателя, поэтому потоки процесса
+    встают в очередь на блокировке, а не соревнуются за базу. Если базу
+    держит другой процесс дольше busy_timeout, view целиком повторяется
+    в новой транзакции после паузы. Декоратор ставится под
+    login_required, чтобы перенаправление анонима не ждало очереди.
+    methods — методы, которые пишут, например ('POST',): остальные,
+    вроде показа формы, идут без блокировки и транзакции.
+    """
+    if view is None:
+        return functools.partial(serialize_writes, methods=methods)
+
+    @functools.wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if methods is not None and request.method not in methods:
+            return view(request, *args, **kwargs)
+        delay = settings.WRITE_RETRY_DELAY
+        with _write_lock:
+            for attempt in range(settings.WRITE_RETRIES + 1):
+                try:
+                    with transaction.atomic():
+                        return view(request, *args, **kwargs)
+                except OperationalError as error:
+                    if (not is_locked(error)
+                            or attempt == settings.WRITE_RETRIES):
+                        raise
+                time.sleep(delay * (1 + random.random()))
+                delay *= 2
+    return wrapper
@@ -0,0 +1,14 @@
+from django.db.backends.sqlite3 import base
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """SQLite, в котором транзакция сразу берёт блокировку на запись.
+
+    При обычном BEGIN транзакция, прочитавшая данные, не может потом
+    дождаться блокировки на запись: SQLite сразу отвечает «database is
+    locked», не глядя на busy_timeout. BEGIN IMMEDIATE ждёт блокировку
+    в начале транзакции, пока она ещё ничего не прочитала.
+    """
+
+    def _start_transaction_under_autocommit(self):
+        self.cursor().execute('BEGIN IMMEDIATE')
@@ -12,6 +12,8 @@ urlpatterns = [
     path('auth/', include('users.urls')),
     path('auth/', include('django.contrib.auth.urls')),
     path('admin/', admin.site.urls),
+    path('api/', include('api.urls', namespace='api')),
+    path('api-token-auth/', views.obtain_auth_token),
     path('', include("posts.urls", namespace='posts')),
     path('about/', include('about.urls', namespace='about')),
 ]
@@ -24,7 +26,3 @@ if settings.DEBUG:
                           document_root=settings.STATIC_ROOT)
     urlpatterns += (path("__debug__/", include(debug_toolbar.urls)),)
 
-urlpatterns += [
-        path('api-token-auth/', views.obtain_auth_token)
-    ] 
-